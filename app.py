@@ -1,18 +1,43 @@
-from flask import Flask, render_template, request, jsonify, redirect, url_for, flash
+import re
+import click
+from datetime import timedelta
+from flask import Flask, Response, render_template, request, jsonify, redirect, url_for, flash
 from flask_cors import CORS
 from flask_login import LoginManager, login_user, logout_user, login_required, current_user
-from services.cached_football_api import CachedFootballAPIService
+from services.cached_football_api import CachedFootballAPIService, TTL_HOURS
 from services.cached_flight_api import CachedFlightAPIService
 from services.cached_hotel_api import CachedHotelAPIService
+from services.async_cached_football_api import AsyncCachedFootballAPIService
+from services.async_cached_flight_api import AsyncCachedFlightAPIService
+from services.async_cached_hotel_api import AsyncCachedHotelAPIService
 from services.calculator import CostCalculator
-from config import Config
+from services.http_client import HTTPClient
+from services.async_http_client import AsyncHTTPClient
+from services.executor import LookupExecutor
+from services.trip_planner import TripPlanner
+from services.fixture_store import FixtureStore, fit_to_quota
+from services.cache_warmer import CacheWarmer
+from services.rate_limiter import RateLimiter
+from services.circuit_breaker import CircuitBreakerRegistry
+from services.single_flight import single_flight
+from services.cache_provenance import CacheProvenance, track_cache_provenance
+from config import Config, parse_by_type
 from auth.users import User
-from models.cache import db, APICache, RequestLog
+from models.cache import db, RequestLog, RequestStat
+from models.memory_cache import memory_cache, encoded_responses
+from models.codecs import codec_registry, json_serializer
+from models.metrics import metrics, instrument_app
+from models.profiler import request_profiler, profile_requests, SORT_KEYS
+from models.responses import JSONProvider, EncodedResponse, response_compressor, compress_responses
+from models.request_log_writer import RequestLogWriter
+from models.schema import upgrade_schema
+from models.sqlite import configure_sqlite
+from models.cache_sweeper import CacheSweeper
+from models.cache_backends import create_cache_backend
 
 app = Flask(__name__)
 app.config.from_object(Config)
 app.config['SECRET_KEY'] = 'your-secret-key-change-this-in-production'
-app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///cache.db'
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 CORS(app, resources={r"/*": {"origins": "*"}})
 
@@ -22,12 +47,160 @@ login_manager.init_app(app)
 login_manager.login_view = 'login'
 
 with app.app_context():
+    configure_sqlite(
+        db.engine,
+        journal_mode=app.config['SQLITE_JOURNAL_MODE'],
+        busy_timeout_ms=app.config['SQLITE_BUSY_TIMEOUT_MS'],
+        synchronous=app.config['SQLITE_SYNCHRONOUS']
+    )
     db.create_all()
+    upgrade_schema(db)
+    RequestStat.backfill()
+
+memory_cache.configure(
+    max_entries=app.config['MEMORY_CACHE_MAX_ENTRIES'],
+    max_ttl_seconds=app.config['MEMORY_CACHE_MAX_TTL_SECONDS']
+)
+# Other workers may refresh an entry without invalidating this worker's
+# stored responses, so they are trusted no longer than memory-tier values
+encoded_responses.configure(max_ttl_seconds=app.config['MEMORY_CACHE_MAX_TTL_SECONDS'])
+codec_registry.configure(
+    default_codec=app.config['CACHE_DEFAULT_CODEC'],
+    codecs_by_type=app.config['CACHE_CODECS'],
+    min_size=app.config['CACHE_COMPRESS_MIN_BYTES']
+)
+json_serializer.configure(app.config['JSON_LIBRARY'])
+app.json = JSONProvider(app)
+metrics.configure(enabled=app.config['METRICS_ENABLED'])
+if app.config['METRICS_ENABLED']:
+    instrument_app(app)
+request_profiler.configure(
+    enabled=app.config['PROFILER_ENABLED'],
+    sample_rate=app.config['PROFILER_SAMPLE_RATE'],
+    header=app.config['PROFILER_HEADER'],
+    max_profiles=app.config['PROFILER_MAX_PROFILES'],
+    stack_interval=app.config['PROFILER_STACK_INTERVAL_MS'] / 1000
+)
+profile_requests(app)
+response_compressor.configure(
+    enabled=app.config['COMPRESS_RESPONSES'],
+    min_size=app.config['COMPRESS_MIN_BYTES'],
+    gzip_level=app.config['GZIP_LEVEL'],
+    brotli_quality=app.config['BROTLI_QUALITY']
+)
+compress_responses(app)
 
-football_service = CachedFootballAPIService(app.config['FOOTBALL_API_KEY'])
-flight_service = CachedFlightAPIService(app.config['AMADEUS_API_KEY'], app.config['AMADEUS_API_SECRET'])
-hotel_service = CachedHotelAPIService(app.config['BOOKING_API_KEY'])
+http_client = HTTPClient.from_config(app.config)
+async_http_client = AsyncHTTPClient.from_config(app.config)
+if app.config['RATE_LIMIT_ENABLED']:
+    http_client.rate_limiter = RateLimiter(
+        {
+            provider: (float(per_minute), app.config['PROVIDER_DAILY_QUOTAS'].get(provider))
+            for provider, per_minute in app.config['PROVIDER_RATE_LIMITS'].items()
+        },
+        background_reserve=app.config['PROVIDER_BACKGROUND_RESERVE'],
+        max_wait=app.config['PROVIDER_MAX_WAIT_SECONDS']
+    )
+if app.config['CIRCUIT_BREAKER_ENABLED']:
+    http_client.circuit_breakers = CircuitBreakerRegistry(
+        failure_threshold=app.config['CIRCUIT_FAILURE_THRESHOLD'],
+        reset_timeout=app.config['CIRCUIT_RESET_SECONDS']
+    )
+async_http_client.rate_limiter = http_client.rate_limiter
+async_http_client.circuit_breakers = http_client.circuit_breakers
+football_service = CachedFootballAPIService(app.config['FOOTBALL_API_KEY'], http_client, base_url=app.config['FOOTBALL_API_URL'])
+flight_service = CachedFlightAPIService(
+    app.config['AMADEUS_API_KEY'],
+    app.config['AMADEUS_API_SECRET'],
+    http_client,
+    base_url=app.config['AMADEUS_API_URL']
+)
+hotel_service = CachedHotelAPIService(app.config['BOOKING_API_KEY'], http_client, base_url=app.config['BOOKING_API_URL'])
+async_football_service = AsyncCachedFootballAPIService(
+    app.config['FOOTBALL_API_KEY'],
+    async_http_client,
+    base_url=app.config['FOOTBALL_API_URL']
+)
+async_flight_service = AsyncCachedFlightAPIService(
+    app.config['AMADEUS_API_KEY'],
+    app.config['AMADEUS_API_SECRET'],
+    async_http_client,
+    token_manager=flight_service.token_manager,
+    base_url=app.config['AMADEUS_API_URL']
+)
+async_hotel_service = AsyncCachedHotelAPIService(
+    app.config['BOOKING_API_KEY'],
+    async_http_client,
+    dest_ids=hotel_service.dest_ids,
+    base_url=app.config['BOOKING_API_URL']
+)
 calculator = CostCalculator()
+lookup_executor = LookupExecutor(
+    app,
+    max_workers=app.config['TRIP_LOOKUP_WORKERS'],
+    parallel=app.config['PARALLEL_TRIP_LOOKUPS']
+)
+refresh_executor = LookupExecutor(app, max_workers=app.config['CACHE_REFRESH_WORKERS'])
+cache_backend = create_cache_backend(app.config)
+
+for service in (football_service, flight_service, hotel_service,
+                async_football_service, async_flight_service, async_hotel_service):
+    service.cache_backend = cache_backend
+    service.refresh_executor = refresh_executor
+    service.stale_grace_hours = app.config['CACHE_STALE_GRACE_HOURS']
+    service.degraded_grace_hours = app.config['CACHE_DEGRADED_GRACE_HOURS']
+
+with app.app_context():
+    hotel_service.load_dest_ids()
+
+fixture_store = None
+if app.config['FIXTURE_STORE_ENABLED']:
+    fixture_leagues = app.config['FIXTURE_LEAGUES'] or list(football_service.top_leagues)
+    fixture_refresh_minutes = app.config['FIXTURE_REFRESH_MINUTES']
+    football_quota = app.config['PROVIDER_DAILY_QUOTAS'].get('football')
+    if app.config['RATE_LIMIT_ENABLED'] and football_quota:
+        fixture_leagues, fixture_refresh_minutes = fit_to_quota(
+            fixture_leagues,
+            app.config['FIXTURE_FULL_REFRESH_HOURS'],
+            fixture_refresh_minutes,
+            football_quota * app.config['FIXTURE_QUOTA_SHARE']
+        )
+    fixture_store = FixtureStore(
+        football_service.get_league_fixtures,
+        fixture_leagues,
+        football_service.upcoming_window,
+        full_refresh_hours=app.config['FIXTURE_FULL_REFRESH_HOURS'],
+        refresh_minutes=fixture_refresh_minutes,
+        app=app
+    )
+    for service in (football_service, async_football_service):
+        service.fixture_store = fixture_store
+        service.fixture_window_ttl_hours = fixture_refresh_minutes / 60
+
+request_log_writer = RequestLogWriter(
+    app,
+    enabled=app.config['REQUEST_LOG_ASYNC'],
+    max_queue=app.config['REQUEST_LOG_QUEUE_SIZE'],
+    batch_size=app.config['REQUEST_LOG_BATCH_SIZE'],
+    flush_interval=app.config['REQUEST_LOG_FLUSH_SECONDS'],
+    minute_retention=timedelta(hours=app.config['REQUEST_STATS_MINUTE_RETENTION_HOURS']),
+    hour_retention=timedelta(days=app.config['REQUEST_STATS_HOUR_RETENTION_DAYS'])
+)
+cache_sweeper = CacheSweeper(
+    app,
+    cache_backend,
+    enabled=app.config['CACHE_SWEEP_ENABLED'],
+    interval=app.config['CACHE_SWEEP_INTERVAL_SECONDS'],
+    chunk_size=app.config['CACHE_SWEEP_CHUNK_SIZE'],
+    stale_grace_hours=app.config['CACHE_STALE_GRACE_HOURS'],
+    degraded_grace_hours=app.config['CACHE_DEGRADED_GRACE_HOURS']
+)
+
+@app.before_request
+def start_background_tasks():
+    cache_sweeper.ensure_started()
+    if fixture_store:
+        fixture_store.ensure_started()
 
 @login_manager.user_loader
 def load_user(username):
@@ -63,80 +236,162 @@ def logout():
 def index():
     return render_template('index.html')
 
+def parse_window(value):
+    if not value:
+        return None
+    match = re.fullmatch(r'(\d+)([mhd])', value)
+    if not match:
+        raise ValueError(value)
+    units = {'m': 'minutes', 'h': 'hours', 'd': 'days'}
+    return timedelta(**{units[match.group(2)]: int(match.group(1))})
+
+def log_request(endpoint, provenance, response):
+    request_log_writer.log(endpoint, current_user.username, provenance=provenance)
+    response.headers['X-Cache'] = provenance.summary
+    return response
+
+def conditional_json(cache_key, endpoint, max_age, produce):
+    # The encoded response last sent for cache_key answers If-None-Match with
+    # a 304 and, with RESPONSE_PASSTHROUGH, plain requests with its stored
+    # bytes, in both cases without calling the service or serializing
+    stored = encoded_responses.get(cache_key)
+    if stored is not None:
+        not_modified = request.method == 'GET' and request.if_none_match.contains_weak(stored.etag)
+        if not_modified or app.config['RESPONSE_PASSTHROUGH']:
+            provenance = CacheProvenance()
+            provenance.record(cache_key, 'revalidated' if not_modified else 'hit')
+            response = stored.make_response(app.response_class, response_compressor, request.accept_encodings,
+                                            not_modified=not_modified)
+            response.cache_control.private = True
+            response.cache_control.max_age = max_age
+            return log_request(endpoint, provenance, response)
+    
+    with track_cache_provenance() as provenance:
+        value = produce()
+    response = jsonify(value)
+    
+    # Stale, degraded and empty (possibly failed) results are not stored
+    # and must be revalidated before reuse
+    if value and all(status in ('hit', 'miss', 'static', 'index') for _, status in provenance.lookups):
+        response.add_etag()
+        stored = EncodedResponse(response.get_data(), response.get_etag()[0])
+        encoded_responses.set(cache_key, stored, max_age)
+        response = stored.make_response(app.response_class, response_compressor, request.accept_encodings)
+        response.cache_control.private = True
+        response.cache_control.max_age = max_age
+    else:
+        response.cache_control.no_cache = True
+    return log_request(endpoint, provenance, response.make_conditional(request))
+
 @app.route('/api/leagues', methods=['GET'])
 @login_required
 def get_leagues():
-    RequestLog.log_request('/api/leagues', current_user.username)
-    leagues = football_service.get_top_leagues()
-    return jsonify(leagues)
+    return conditional_json('leagues', '/api/leagues', TTL_HOURS['leagues'] * 3600, football_service.get_top_leagues)
 
 @app.route('/api/teams/<int:league_id>', methods=['GET'])
 @login_required
 def get_teams(league_id):
-    cache_key = f"teams_league_{league_id}"
-    cache_hit = APICache.get_cached(cache_key) is not None
-    RequestLog.log_request(f'/api/teams/{league_id}', current_user.username, cache_hit)
-    
-    teams = football_service.get_teams_by_league(league_id)
-    return jsonify(teams)
+    return conditional_json(
+        f"teams_league_{league_id}",
+        f'/api/teams/{league_id}',
+        TTL_HOURS['teams'] * 3600,
+        lambda: football_service.get_teams_by_league(league_id)
+    )
 
-@app.route('/api/matches', methods=['POST'])
+@app.route('/api/matches', methods=['GET', 'POST'])
 @login_required
 def get_matches():
-    data = request.json
+    # GET (cacheable, conditional) takes query parameters; POST a JSON body
+    data = request.args if request.method == 'GET' else request.json
     team_id = data.get('team_id')
     match_type = data.get('match_type')
     
-    cache_key = f"matches_{team_id}_{match_type}"
-    cache_hit = APICache.get_cached(cache_key) is not None
-    RequestLog.log_request('/api/matches', current_user.username, cache_hit)
-    
-    matches = football_service.get_upcoming_matches(team_id, match_type)
-    return jsonify(matches)
+    return conditional_json(
+        f"matches_{team_id}_{match_type}",
+        '/api/matches',
+        TTL_HOURS['matches'] * 3600,
+        lambda: football_service.get_upcoming_matches(team_id, match_type)
+    )
 
-@app.route('/api/calculate-trip', methods=['POST'])
-@login_required
 def calculate_trip():
     data = request.json
     match_id = data.get('match_id')
     origin_city = data.get('origin_city')
     
-    RequestLog.log_request('/api/calculate-trip', current_user.username)
+    with track_cache_provenance() as provenance:
+        match_details = football_service.get_match_details(match_id)
+        if not match_details:
+            return jsonify({'error': 'Match not found'}), 404
+        
+        planner = TripPlanner(football_service, flight_service, hotel_service, calculator, lookup_executor)
+        quote = planner.calculate_trip(match_details, origin_city)
     
-    match_details = football_service.get_match_details(match_id)
+    quote['cache'] = provenance.statuses()
+    return log_request('/api/calculate-trip', provenance, jsonify(quote))
+
+async def calculate_trip_async():
+    data = request.json
+    match_id = data.get('match_id')
+    origin_city = data.get('origin_city')
     
-    flight_data = flight_service.get_flight_price(
-        origin_city,
-        match_details['city'],
-        match_details['date']
-    )
+    with track_cache_provenance() as provenance:
+        match_details = await async_football_service.get_match_details(match_id)
+        if not match_details:
+            return jsonify({'error': 'Match not found'}), 404
+        
+        planner = TripPlanner(async_football_service, async_flight_service, async_hotel_service, calculator, None)
+        quote = await planner.calculate_trip_async(match_details, origin_city)
     
-    hotel_data = hotel_service.get_hotel_price(
-        match_details['city'],
-        match_details['date']
-    )
+    quote['cache'] = provenance.statuses()
+    return log_request('/api/calculate-trip', provenance, jsonify(quote))
+
+def batch_error(data):
+    trips = data.get('trips')
+    if not isinstance(trips, list) or not trips:
+        return 'trips must be a non-empty list'
+    if len(trips) > app.config['MAX_BATCH_TRIPS']:
+        return f"At most {app.config['MAX_BATCH_TRIPS']} trips per request"
+    if not all(isinstance(trip, dict) for trip in trips):
+        return 'Each trip must be an object with match_id and origin_city'
+    return None
+
+def calculate_trips():
+    data = request.json or {}
+    error = batch_error(data)
+    if error:
+        return jsonify({'error': error}), 400
     
-    ticket_cost = calculator.estimate_ticket_price(
-        match_details['league'],
-        match_details['home_team'],
-        match_details['away_team']
-    )
+    with track_cache_provenance() as provenance:
+        planner = TripPlanner(football_service, flight_service, hotel_service, calculator, lookup_executor)
+        result = planner.calculate_trips(data['trips'])
     
-    total_cost = calculator.calculate_total(flight_data['price'], hotel_data['price'], ticket_cost)
+    result['cache'] = provenance.statuses()
+    return log_request('/api/calculate-trips', provenance, jsonify(result))
+
+async def calculate_trips_async():
+    data = request.json or {}
+    error = batch_error(data)
+    if error:
+        return jsonify({'error': error}), 400
     
-    return jsonify({
-        'match': match_details,
-        'costs': {
-            'flight': flight_data['price'],
-            'hotel': hotel_data['price'],
-            'ticket': ticket_cost,
-            'total': total_cost
-        },
-        'links': {
-            'flight': flight_data['link'],
-            'hotel': hotel_data['link']
-        }
-    })
+    with track_cache_provenance() as provenance:
+        planner = TripPlanner(async_football_service, async_flight_service, async_hotel_service, calculator, None)
+        result = await planner.calculate_trips_async(data['trips'])
+    
+    result['cache'] = provenance.statuses()
+    return log_request('/api/calculate-trips', provenance, jsonify(result))
+
+def trip_views(async_lookups):
+    # Endpoint -> view for the trip endpoints. The async views only pay off
+    # with ASYNC_TRIP_LOOKUPS: otherwise asgiref would start an event loop
+    # and a thread per request just to run blocking code.
+    if async_lookups:
+        return {'calculate_trip': login_required(calculate_trip_async),
+                'calculate_trips': login_required(calculate_trips_async)}
+    return {'calculate_trip': login_required(calculate_trip), 'calculate_trips': login_required(calculate_trips)}
+
+for endpoint, view in trip_views(app.config['ASYNC_TRIP_LOOKUPS']).items():
+    app.add_url_rule(f"/api/{endpoint.replace('_', '-')}", endpoint, view, methods=['POST'])
 
 @app.route('/api/admin/cache/stats', methods=['GET'])
 @login_required
@@ -144,12 +399,30 @@ def cache_stats():
     if current_user.username != 'admin':
         return jsonify({'error': 'Unauthorized'}), 403
     
-    request_stats = RequestLog.get_stats()
-    cache_count = APICache.query.count()
+    group_by = request.args.get('group_by')
+    if group_by and group_by not in RequestStat.GROUP_COLUMNS:
+        return jsonify({'error': f"group_by must be one of {', '.join(RequestStat.GROUP_COLUMNS)}"}), 400
+    
+    try:
+        window = parse_window(request.args.get('window'))
+    except ValueError:
+        return jsonify({'error': 'window must look like 30m, 24h or 7d'}), 400
+    
+    request_stats = RequestLog.get_stats(window, group_by)
+    cache_count = cache_backend.count()
     
     return jsonify({
+        'cache_backend': cache_backend.name,
+        'cache_backend_available': cache_count is not None,
         'cache_entries': cache_count,
-        'request_stats': request_stats
+        'memory_cache': memory_cache.stats(),
+        'codecs': codec_registry.stats(),
+        'single_flight': single_flight.stats(),
+        'request_stats': request_stats,
+        'request_log_writer': request_log_writer.stats(),
+        'cache_sweeper': cache_sweeper.stats(),
+        'fixture_store': fixture_store.stats() if fixture_store else None,
+        'rate_limits': http_client.rate_limiter.stats() if http_client.rate_limiter else None
     })
 
 @app.route('/api/admin/cache/clear', methods=['POST'])
@@ -158,7 +431,9 @@ def clear_cache():
     if current_user.username != 'admin':
         return jsonify({'error': 'Unauthorized'}), 403
     
-    count = APICache.clear_all()
+    count = cache_backend.clear()
+    if count is None:
+        return jsonify({'error': f'Cache backend {cache_backend.name} is unavailable'}), 503
     return jsonify({'message': f'Cleared {count} cache entries'})
 
 @app.route('/api/admin/cache/clear-expired', methods=['POST'])
@@ -167,8 +442,108 @@ def clear_expired_cache():
     if current_user.username != 'admin':
         return jsonify({'error': 'Unauthorized'}), 403
     
-    count = APICache.clear_expired()
+    count = cache_sweeper.sweep()
     return jsonify({'message': f'Cleared {count} expired cache entries'})
 
+@app.route('/api/admin/circuit-breakers')
+@login_required
+def circuit_breakers():
+    if current_user.username != 'admin':
+        return jsonify({'error': 'Unauthorized'}), 403
+    
+    if http_client.circuit_breakers is None:
+        return jsonify({'enabled': False, 'breakers': {}})
+    return jsonify({'enabled': True, 'breakers': http_client.circuit_breakers.stats()})
+
+@app.route('/api/admin/metrics')
+@login_required
+def admin_metrics():
+    if current_user.username != 'admin':
+        return jsonify({'error': 'Unauthorized'}), 403
+    
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
+@app.route('/api/admin/profiler', methods=['GET', 'POST'])
+@login_required
+def profiler_settings():
+    if current_user.username != 'admin':
+        return jsonify({'error': 'Unauthorized'}), 403
+    
+    if request.method == 'POST':
+        data = request.get_json(silent=True) or {}
+        enabled = data.get('enabled')
+        sample_rate = data.get('sample_rate')
+        if enabled is not None and not isinstance(enabled, bool):
+            return jsonify({'error': 'enabled must be true or false'}), 400
+        try:
+            request_profiler.configure(enabled=enabled, sample_rate=None if sample_rate is None else float(sample_rate))
+        except (TypeError, ValueError):
+            return jsonify({'error': 'sample_rate must be a number between 0 and 1'}), 400
+        if data.get('clear'):
+            request_profiler.clear()
+    
+    return jsonify(request_profiler.stats())
+
+@app.route('/api/admin/profiles/<profile_id>')
+@login_required
+def profile_detail(profile_id):
+    if current_user.username != 'admin':
+        return jsonify({'error': 'Unauthorized'}), 403
+    
+    profile = request_profiler.get(profile_id)
+    if profile is None:
+        return jsonify({'error': 'Profile not found'}), 404
+    
+    output = request.args.get('format', 'stats')
+    if output == 'stats':
+        sort = request.args.get('sort', 'cumulative')
+        if sort not in SORT_KEYS:
+            return jsonify({'error': f"sort must be one of {', '.join(SORT_KEYS)}"}), 400
+        limit = request.args.get('limit', 50, type=int)
+        return Response(profile.format_stats(sort, limit), mimetype='text/plain')
+    if output == 'collapsed':
+        return Response(profile.collapsed(), mimetype='text/plain')
+    if output == 'pstats':
+        return Response(profile.dump(), mimetype='application/octet-stream', headers={
+            'Content-Disposition': f"attachment; filename=profile-{profile.id}.pstats"
+        })
+    return jsonify({'error': 'format must be stats, collapsed or pstats'}), 400
+
+@app.cli.command('warm-cache')
+@click.option('--origin', 'origin_cities', multiple=True, help='Origin city for flight quotes (repeatable).')
+@click.option('--workers', type=int, help='Concurrent lookups.')
+@click.option('--budget', 'budgets', multiple=True, help='Upstream lookup budget per provider, e.g. flight:50 (repeatable).')
+def warm_cache(origin_cities, workers, budgets):
+    budgets_by_provider = dict(app.config['WARM_CACHE_BUDGETS'])
+    budgets_by_provider.update({
+        provider: int(budget) for provider, budget in parse_by_type(','.join(budgets)).items()
+    })
+    
+    def progress(phase, done, total):
+        if done == total or done % max(1, total // 10) == 0:
+            click.echo(f"[{phase}] {done}/{total}")
+    
+    warmer = CacheWarmer(
+        app,
+        football_service,
+        flight_service,
+        hotel_service,
+        origin_cities or app.config['WARM_CACHE_ORIGIN_CITIES'],
+        max_workers=workers or app.config['WARM_CACHE_WORKERS'],
+        budgets=budgets_by_provider,
+        progress=progress
+    )
+    report = warmer.run()
+    
+    click.echo(
+        f"Filled {report['filled']} cache entries in {report['duration_seconds']}s "
+        f"({report['hits']} already cached, {report['skipped']} skipped over budget, {report['failed']} failed)"
+    )
+    click.echo('Upstream lookups: ' + ', '.join(
+        f"{provider} {spent}/{budgets_by_provider.get(provider, 'unlimited')}"
+        for provider, spent in sorted(report['upstream_lookups'].items())
+    ))
+    click.echo(f"Cache entries: {report['cache_entries_before']} -> {report['cache_entries_after']}")
+
 if __name__ == '__main__':
     app.run(debug=True)
\ No newline at end of file
@@ -0,0 +1,52 @@
+# Compares two benchmark reports scenario by scenario:
+#
+#     python -m benchmarks.compare benchmarks/results/before.json benchmarks/results/after.json
+#
+# Prints each metric for the baseline and the candidate with the relative
+# change; --fail-over 10 exits non-zero when any p95 got more than 10% slower.
+import argparse
+import json
+import sys
+from benchmarks.report import METRICS, result_key
+
+
+def change(before, after):
+    if not before:
+        return ''
+    return f"{(after - before) / before * 100:+.1f}%"
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare two benchmark reports')
+    parser.add_argument('baseline')
+    parser.add_argument('candidate')
+    parser.add_argument('--fail-over', type=float, help='Exit 1 if any p95 regresses by more than this many percent')
+    args = parser.parse_args()
+    
+    with open(args.baseline) as f:
+        baseline = {result_key(result): result for result in json.load(f)['results']}
+    with open(args.candidate) as f:
+        candidate = {result_key(result): result for result in json.load(f)['results']}
+    
+    regressions = []
+    for key in sorted(baseline.keys() & candidate.keys(), key=lambda key: (key[0], key[2], key[1])):
+        before, after = baseline[key], candidate[key]
+        print(f"{key[0]} ({key[1]}, concurrency {key[2]})")
+        for metric in METRICS:
+            old, new = before.get(metric, 0), after.get(metric, 0)
+            print(f"  {metric:<15} {old:>10} -> {new:>10} {change(old, new):>9}")
+        if args.fail_over is not None and before.get('p95_ms') and \
+                (after.get('p95_ms', 0) - before['p95_ms']) / before['p95_ms'] * 100 > args.fail_over:
+            regressions.append(key)
+    
+    for key in sorted(baseline.keys() ^ candidate.keys()):
+        print(f"{key[0]} ({key[1]}, concurrency {key[2]}): only in {'baseline' if key in baseline else 'candidate'}")
+    
+    if regressions:
+        print(f"\np95 regressed by more than {args.fail_over}%: " +
+              ', '.join(f"{name} ({phase}, {concurrency})" for name, phase, concurrency in regressions))
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,61 @@
+import statistics
+
+METRICS = ('p50_ms', 'p95_ms', 'p99_ms', 'throughput_rps', 'cpu_ms_per_request', 'upstream_calls')
+
+
+def percentile(values, fraction):
+    # Nearest-rank percentile of sorted values
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def summarize(samples, elapsed):
+    # samples: [(latency_seconds, status_code, x_cache)]
+    latencies = sorted(latency for latency, _, _ in samples)
+    cache = {}
+    for _, _, x_cache in samples:
+        cache[x_cache or 'NONE'] = cache.get(x_cache or 'NONE', 0) + 1
+    
+    summary = {
+        'requests': len(samples),
+        'errors': sum(1 for _, status, _ in samples if status != 200),
+        'elapsed_seconds': round(elapsed, 3),
+        'throughput_rps': round(len(samples) / elapsed, 1) if elapsed else 0,
+        'cache': cache
+    }
+    if latencies:
+        summary.update({
+            'p50_ms': round(percentile(latencies, 0.50) * 1000, 2),
+            'p95_ms': round(percentile(latencies, 0.95) * 1000, 2),
+            'p99_ms': round(percentile(latencies, 0.99) * 1000, 2),
+            'mean_ms': round(statistics.mean(latencies) * 1000, 2),
+            'max_ms': round(latencies[-1] * 1000, 2)
+        })
+    return summary
+
+
+def upstream_delta(before, after):
+    # Requests and errors per stub endpoint between two StubUpstream.stats()
+    calls = {}
+    for endpoint, counts in after.items():
+        previous = before.get(endpoint, {'requests': 0, 'errors': 0})
+        requests = counts['requests'] - previous['requests']
+        if requests:
+            calls[endpoint] = {'requests': requests, 'errors': counts['errors'] - previous['errors']}
+    return calls
+
+
+def result_key(result):
+    return (result['scenario'], result['phase'], result['concurrency'])
+
+
+def format_table(results):
+    lines = [f"{'scenario':<16} {'phase':<5} {'conc':>4} {'reqs':>5} {'err':>4} {'p50 ms':>8} {'p95 ms':>8} "
+             f"{'p99 ms':>8} {'req/s':>8} {'cpu ms':>7} {'upstream':>8}"]
+    for result in results:
+        lines.append(
+            f"{result['scenario']:<16} {result['phase']:<5} {result['concurrency']:>4} {result['requests']:>5} "
+            f"{result['errors']:>4} {result.get('p50_ms', 0):>8.1f} {result.get('p95_ms', 0):>8.1f} "
+            f"{result.get('p99_ms', 0):>8.1f} {result['throughput_rps']:>8.1f} {result.get('cpu_ms_per_request', 0):>7.2f} "
+            f"{result['upstream_calls']:>8}"
+        )
+    return '\n'.join(lines)
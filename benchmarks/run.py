@@ -0,0 +1,251 @@
+# Runs every Flask endpoint against the stub upstream, cold and warm, at each
+# concurrency level, and writes a JSON report:
+#
+#     python -m benchmarks.run --concurrency 1,8,32 --requests 200 --latency 50
+#     python -m benchmarks.run --scenario calculate-trip --env ASYNC_TRIP_LOOKUPS=true
+#
+# For every concurrency level a fresh Gunicorn (gunicorn.conf.py) is started
+# on an empty SQLite database in a temporary directory. Each scenario then
+# runs its request list once on the cold cache and once more warm. Scenarios
+# run in order on the same server, so later ones may find entries earlier
+# ones shared (e.g. league fixture lists).
+import argparse
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+import requests
+from benchmarks.report import summarize, upstream_delta, format_table
+from benchmarks.scenarios import build_scenarios
+from benchmarks.stub_upstream import add_stub_arguments, stub_from_args
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# Real upstream budgets would throttle a cold run within seconds
+DEFAULT_ENV = {
+    'FOOTBALL_API_KEY': 'bench',
+    'AMADEUS_API_KEY': 'bench',
+    'AMADEUS_API_SECRET': 'bench',
+    'BOOKING_API_KEY': 'bench',
+    'RATE_LIMIT_ENABLED': 'false',
+    'WARM_CACHE_ON_STARTUP': 'false',
+    'CACHE_BACKEND': 'sqlite',
+    'GUNICORN_ACCESS_LOG': ''
+}
+
+
+def process_tree_cpu_seconds(pid):
+    # User plus system CPU time of a process and its children (the Gunicorn
+    # workers) from /proc; None where /proc is not available
+    try:
+        pids = [pid]
+        for entry in os.listdir('/proc'):
+            if entry.isdigit() and entry != str(pid):
+                with open(f"/proc/{entry}/stat") as f:
+                    fields = f.read().rsplit(')', 1)[1].split()
+                if int(fields[1]) == pid:
+                    pids.append(int(entry))
+        ticks = 0
+        for process in pids:
+            with open(f"/proc/{process}/stat") as f:
+                fields = f.read().rsplit(')', 1)[1].split()
+            ticks += int(fields[11]) + int(fields[12])
+    except (OSError, ValueError):
+        return None
+    return ticks / os.sysconf('SC_CLK_TCK')
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+class AppServer:
+    def __init__(self, env, workers, threads):
+        self.port = free_port()
+        self.url = f"http://127.0.0.1:{self.port}"
+        self.directory = tempfile.TemporaryDirectory(prefix='bench-')
+        self.env = dict(os.environ, **env)
+        self.env.update({
+            'GUNICORN_BIND': f"127.0.0.1:{self.port}",
+            'WEB_CONCURRENCY': str(workers),
+            'GUNICORN_THREADS': str(threads),
+            'DATABASE_URL': f"sqlite:///{os.path.join(self.directory.name, 'bench.db')}"
+        })
+        self.process = None
+    
+    def start(self, timeout=60):
+        self.process = subprocess.Popen(
+            [sys.executable, '-m', 'gunicorn', 'wsgi:app'],
+            cwd=ROOT,
+            env=self.env,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE
+        )
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if self.process.poll() is not None:
+                raise RuntimeError(f"Server exited: {self.process.stderr.read().decode()[-2000:]}")
+            try:
+                if requests.get(f"{self.url}/login", timeout=1).status_code == 200:
+                    return self
+            except requests.RequestException:
+                pass
+            time.sleep(0.2)
+        self.stop()
+        raise RuntimeError('Server did not become ready')
+    
+    def cpu_seconds(self):
+        return process_tree_cpu_seconds(self.process.pid)
+    
+    def stop(self):
+        if self.process is not None and self.process.poll() is None:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=30)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+        self.directory.cleanup()
+
+
+def login(url, username, password):
+    session = requests.Session()
+    response = session.post(f"{url}/login", data={'username': username, 'password': password}, timeout=30)
+    response.raise_for_status()
+    return session
+
+
+def run_pass(url, sessions, request_list):
+    # Closed loop: every client sends its next request as soon as the
+    # previous one is answered. Returns (samples, elapsed seconds).
+    samples = []
+    lock = threading.Lock()
+    position = iter(range(len(request_list)))
+    
+    def client(session):
+        local = []
+        while True:
+            with lock:
+                index = next(position, None)
+            if index is None:
+                break
+            method, path, body = request_list[index]
+            start = time.perf_counter()
+            try:
+                response = session.request(method, f"{url}{path}", json=body, timeout=60)
+                local.append((time.perf_counter() - start, response.status_code, response.headers.get('X-Cache')))
+            except requests.RequestException:
+                local.append((time.perf_counter() - start, 0, None))
+        with lock:
+            samples.extend(local)
+    
+    threads = [threading.Thread(target=client, args=(session,)) for session in sessions]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return samples, time.perf_counter() - start
+
+
+def parse_env(values):
+    env = {}
+    for value in values or []:
+        name, _, setting = value.partition('=')
+        env[name] = setting
+    return env
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the Flask endpoints against a stub upstream')
+    parser.add_argument('--concurrency', default='1,8,32', help='Comma-separated client counts (default 1,8,32)')
+    parser.add_argument('--requests', type=int, default=200, help='Requests per scenario and pass (default 200)')
+    parser.add_argument('--scenario', action='append', help='Only run these scenarios (repeatable)')
+    parser.add_argument('--workers', type=int, default=2, help='Gunicorn worker processes (default 2)')
+    parser.add_argument('--threads', type=int, default=8, help='Threads per worker (default 8)')
+    parser.add_argument('--env', action='append', metavar='NAME=VALUE', help='App setting for the server (repeatable)')
+    parser.add_argument('--output', help='Report path (default benchmarks/results/<timestamp>.json)')
+    parser.add_argument('--username', default='admin')
+    parser.add_argument('--password', default='admin123')
+    add_stub_arguments(parser)
+    args = parser.parse_args()
+    
+    levels = [int(level) for level in args.concurrency.split(',')]
+    scenarios = build_scenarios(args.requests)
+    names = args.scenario or list(scenarios)
+    unknown = set(names) - set(scenarios)
+    if unknown:
+        parser.error(f"unknown scenario(s) {', '.join(sorted(unknown))}; choose from {', '.join(scenarios)}")
+    
+    stub = stub_from_args(args).start()
+    env = dict(DEFAULT_ENV, **stub.env())
+    env.update(parse_env(args.env))
+    
+    results = []
+    try:
+        for concurrency in levels:
+            server = AppServer(env, args.workers, args.threads).start()
+            try:
+                sessions = [login(server.url, args.username, args.password) for _ in range(concurrency)]
+                for name in names:
+                    for phase in ('cold', 'warm'):
+                        before = stub.stats()
+                        cpu_before = server.cpu_seconds()
+                        samples, elapsed = run_pass(server.url, sessions, scenarios[name])
+                        cpu_after = server.cpu_seconds()
+                        upstream = upstream_delta(before, stub.stats())
+                        result = {'scenario': name, 'phase': phase, 'concurrency': concurrency}
+                        result.update(summarize(samples, elapsed))
+                        if cpu_before is not None and cpu_after is not None and samples:
+                            result['cpu_ms_per_request'] = round((cpu_after - cpu_before) * 1000 / len(samples), 2)
+                        result['upstream'] = upstream
+                        result['upstream_calls'] = sum(counts['requests'] for counts in upstream.values())
+                        results.append(result)
+                        print(format_table([result]).splitlines()[1], flush=True)
+            finally:
+                server.stop()
+    finally:
+        stub.stop()
+    
+    report = {
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'commit': git_commit(),
+        'settings': {
+            'concurrency': levels,
+            'requests': args.requests,
+            'workers': args.workers,
+            'threads': args.threads,
+            'latency_ms': args.latency,
+            'jitter_ms': args.jitter,
+            'error_rate': args.error_rate,
+            'endpoint_latency': args.endpoint_latency or [],
+            'endpoint_error_rate': args.endpoint_error_rate or [],
+            'env': parse_env(args.env)
+        },
+        'results': results
+    }
+    output = args.output or os.path.join(ROOT, 'benchmarks', 'results', f"{datetime.now():%Y%m%d-%H%M%S}.json")
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    
+    print()
+    print(format_table(results))
+    print(f"\nReport written to {output}")
+
+
+if __name__ == '__main__':
+    main()
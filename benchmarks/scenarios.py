@@ -0,0 +1,48 @@
+import itertools
+from benchmarks.stub_upstream import LEAGUES, TEAMS_PER_LEAGUE, all_fixtures
+
+ORIGINS = ['London', 'Madrid', 'Paris', 'Berlin', 'Rome', 'Kraków']
+BATCH_SIZE = 5
+
+
+def trip_pairs():
+    # Every (match_id, origin_city) pair, interleaved so consecutive pairs use
+    # different matches, routes and hotel nights
+    fixtures = sorted(all_fixtures(), key=lambda fixture: fixture['id'])
+    return [(fixture['id'], origin) for origin, fixture in itertools.product(ORIGINS, fixtures)]
+
+
+def build_scenarios(count):
+    # {name: [(method, path, json_body), ...]} with `count` requests each.
+    # Requests walk through distinct cache keys where the endpoint has them,
+    # so the cold pass misses as much as the stub data allows.
+    team_ids = [league_id * 100 + i for league_id in LEAGUES for i in range(TEAMS_PER_LEAGUE)]
+    match_queries = list(itertools.product(team_ids, ['all', 'home', 'away']))
+    pairs = trip_pairs()
+    # Batches take their pairs from the other end so they do not reuse the
+    # single-trip scenario's cache entries
+    batch_pairs = pairs[::-1]
+    
+    def cycle(values):
+        return [values[i % len(values)] for i in range(count)]
+    
+    return {
+        'leagues': [('GET', '/api/leagues', None)] * count,
+        'teams': [('GET', f"/api/teams/{league_id}", None) for league_id in cycle(list(LEAGUES))],
+        'matches': [
+            ('POST', '/api/matches', {'team_id': team_id, 'match_type': match_type})
+            for team_id, match_type in cycle(match_queries)
+        ],
+        'calculate-trip': [
+            ('POST', '/api/calculate-trip', {'match_id': match_id, 'origin_city': origin})
+            for match_id, origin in cycle(pairs)
+        ],
+        'calculate-trips': [
+            ('POST', '/api/calculate-trips', {'trips': [
+                {'match_id': match_id, 'origin_city': origin}
+                for match_id, origin in batch_pairs[i * BATCH_SIZE:(i + 1) * BATCH_SIZE]
+            ]})
+            for i in cycle(list(range(len(batch_pairs) // BATCH_SIZE)))
+        ],
+        'cache-stats': [('GET', '/api/admin/cache/stats', None)] * count
+    }
@@ -0,0 +1,308 @@
+# Local stand-in for the three upstream APIs, for benchmarks:
+#
+#     python -m benchmarks.stub_upstream --port 8600 --latency 50 --error-rate 0.01
+#
+# Serves API-Sports /teams and /fixtures under /football, the Amadeus OAuth
+# token and flight offers under /amadeus, and the Booking.com locations and
+# search endpoints under /booking/v1, with deterministic generated data.
+# Every endpoint sleeps latency +- jitter ms and answers 503 with the given
+# probability; both can be set per endpoint. GET /__stats returns request and
+# error counts per endpoint, POST /__reset clears them.
+import argparse
+import json
+import random
+import threading
+import time
+import zlib
+from datetime import date, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+LEAGUES = {
+    39: ('Premier League', ['London', 'Manchester', 'Liverpool']),
+    140: ('La Liga', ['Madrid', 'Barcelona']),
+    135: ('Serie A', ['Rome', 'Milan']),
+    78: ('Bundesliga', ['Munich', 'Berlin']),
+    61: ('Ligue 1', ['Paris'])
+}
+TEAMS_PER_LEAGUE = 20
+SEASON_START = date(2023, 8, 12)
+
+ENDPOINTS = ('teams', 'fixtures', 'token', 'flight-offers', 'locations', 'search')
+
+
+def league_teams(league_id):
+    name, cities = LEAGUES[league_id]
+    return [{
+        'id': league_id * 100 + i,
+        'name': f"{name} Team {i + 1}",
+        'logo': f"https://media.api-sports.io/football/teams/{league_id * 100 + i}.png",
+        'city': cities[i % len(cities)]
+    } for i in range(TEAMS_PER_LEAGUE)]
+
+
+def league_fixtures(league_id):
+    # Double round robin (circle method): 38 weekly rounds of 10 matches,
+    # all finished ('FT') so they match the app's upcoming-match filter
+    teams = league_teams(league_id)
+    rotation = list(range(TEAMS_PER_LEAGUE))
+    fixtures = []
+    for round_number in range(2 * (TEAMS_PER_LEAGUE - 1)):
+        kickoff = SEASON_START + timedelta(days=7 * round_number)
+        for i in range(TEAMS_PER_LEAGUE // 2):
+            home, away = teams[rotation[i]], teams[rotation[-1 - i]]
+            if round_number >= TEAMS_PER_LEAGUE - 1:
+                home, away = away, home
+            fixtures.append({
+                'id': league_id * 10000 + len(fixtures),
+                'date': f"{kickoff.isoformat()}T{15 + i % 4}:00:00+00:00",
+                'home': home,
+                'away': away,
+                'league': LEAGUES[league_id][0]
+            })
+        rotation = [rotation[0], rotation[-1]] + rotation[1:-1]
+    return fixtures
+
+
+def all_fixtures():
+    return [fixture for league_id in LEAGUES for fixture in league_fixtures(league_id)]
+
+
+def fixture_json(fixture):
+    return {
+        'fixture': {
+            'id': fixture['id'],
+            'date': fixture['date'],
+            'status': {'short': 'FT'},
+            'venue': {'name': f"{fixture['home']['name']} Stadium", 'city': fixture['home']['city']}
+        },
+        'league': {'name': fixture['league']},
+        'teams': {
+            'home': {'id': fixture['home']['id'], 'name': fixture['home']['name']},
+            'away': {'id': fixture['away']['id'], 'name': fixture['away']['name']}
+        }
+    }
+
+
+def stable_price(key, low, high):
+    return low + zlib.crc32(key.encode()) % (high - low)
+
+
+class StubUpstream:
+    def __init__(self, host='127.0.0.1', port=0, latency_ms=0, jitter_ms=0, error_rate=0.0,
+                 endpoint_latency_ms=None, endpoint_error_rates=None, seed=None):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.endpoint_latency_ms = endpoint_latency_ms or {}
+        self.endpoint_error_rates = endpoint_error_rates or {}
+        self.random = random.Random(seed)
+        self.fixtures = {league_id: league_fixtures(league_id) for league_id in LEAGUES}
+        self.fixtures_by_id = {fixture['id']: fixture for fixtures in self.fixtures.values() for fixture in fixtures}
+        self._counts = {}
+        self._lock = threading.Lock()
+        self.server = ThreadingHTTPServer((host, port), self._handler_class())
+        self.server.daemon_threads = True
+        self._thread = None
+    
+    @property
+    def url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+    
+    def env(self):
+        # Settings pointing the app at this server
+        return {
+            'FOOTBALL_API_URL': f"{self.url}/football",
+            'AMADEUS_API_URL': f"{self.url}/amadeus",
+            'BOOKING_API_URL': f"{self.url}/booking/v1"
+        }
+    
+    def start(self):
+        self._thread = threading.Thread(target=self.server.serve_forever, name='stub-upstream', daemon=True)
+        self._thread.start()
+        return self
+    
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+    
+    def stats(self):
+        with self._lock:
+            return {endpoint: dict(counts) for endpoint, counts in self._counts.items()}
+    
+    def reset(self):
+        with self._lock:
+            self._counts = {}
+    
+    def handle(self, method, path, query):
+        # (status, body) for one request, after the simulated latency
+        route = self._route(method, path)
+        if route is None:
+            return 404, {'message': f"No stub for {method} {path}"}
+        
+        endpoint, respond = route
+        failed = self.random.random() < self.endpoint_error_rates.get(endpoint, self.error_rate)
+        with self._lock:
+            counts = self._counts.setdefault(endpoint, {'requests': 0, 'errors': 0})
+            counts['requests'] += 1
+            counts['errors'] += failed
+        
+        latency = self.endpoint_latency_ms.get(endpoint, self.latency_ms)
+        if self.jitter_ms:
+            latency += self.random.uniform(-self.jitter_ms, self.jitter_ms)
+        if latency > 0:
+            time.sleep(latency / 1000)
+        
+        if failed:
+            return 503, {'message': 'Service unavailable (stub)'}
+        return 200, respond(query)
+    
+    def _route(self, method, path):
+        routes = {
+            ('GET', '/football/teams'): ('teams', self._teams),
+            ('GET', '/football/fixtures'): ('fixtures', self._fixtures),
+            ('POST', '/amadeus/v1/security/oauth2/token'): ('token', self._token),
+            ('GET', '/amadeus/v2/shopping/flight-offers'): ('flight-offers', self._flight_offers),
+            ('GET', '/booking/v1/hotels/locations'): ('locations', self._locations),
+            ('GET', '/booking/v1/hotels/search'): ('search', self._search)
+        }
+        return routes.get((method, path))
+    
+    def _teams(self, query):
+        league_id = int(query.get('league', 0))
+        if league_id not in LEAGUES:
+            return {'response': []}
+        return {'response': [
+            {'team': {'id': team['id'], 'name': team['name'], 'logo': team['logo']}, 'venue': {'city': team['city']}}
+            for team in league_teams(league_id)
+        ]}
+    
+    def _fixtures(self, query):
+        if 'id' in query:
+            fixture = self.fixtures_by_id.get(int(query['id']))
+            return {'response': [fixture_json(fixture)] if fixture else []}
+        
+        if 'league' in query:
+            fixtures = self.fixtures.get(int(query['league']), [])
+        elif 'team' in query:
+            team_id = int(query['team'])
+            fixtures = self.fixtures.get(team_id // 100, [])
+            fixtures = [fixture for fixture in fixtures if team_id in (fixture['home']['id'], fixture['away']['id'])]
+        else:
+            fixtures = []
+        
+        if 'from' in query and 'to' in query:
+            fixtures = [fixture for fixture in fixtures if query['from'] <= fixture['date'][:10] <= query['to']]
+        return {'response': [fixture_json(fixture) for fixture in fixtures]}
+    
+    def _token(self, query):
+        return {'access_token': 'stub-token', 'token_type': 'Bearer', 'expires_in': 1799}
+    
+    def _flight_offers(self, query):
+        key = f"{query.get('originLocationCode')}-{query.get('destinationLocationCode')}-{query.get('departureDate')}"
+        cheapest = stable_price(key, 60, 400)
+        return {'data': [{'price': {'total': f"{cheapest + step * 17}.00"}} for step in range(3)]}
+    
+    def _locations(self, query):
+        return [{'dest_id': str(-(zlib.crc32(query.get('name', '').encode()) % 10000000)), 'dest_type': 'city'}]
+    
+    def _search(self, query):
+        key = f"{query.get('dest_id')}-{query.get('checkin_date')}"
+        cheapest = stable_price(key, 120, 600)
+        return {'result': [{'min_total_price': cheapest + step * 23} for step in range(5)]}
+    
+    def _handler_class(self):
+        stub = self
+        
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            
+            def do_GET(self):
+                self._dispatch('GET')
+            
+            def do_POST(self):
+                self._dispatch('POST')
+            
+            def _dispatch(self, method):
+                url = urlparse(self.path)
+                query = {name: values[0] for name, values in parse_qs(url.query).items()}
+                length = int(self.headers.get('Content-Length') or 0)
+                if length:
+                    self.rfile.read(length)
+                
+                if url.path == '/__stats':
+                    status, body = 200, stub.stats()
+                elif url.path == '/__reset' and method == 'POST':
+                    stub.reset()
+                    status, body = 200, {'reset': True}
+                else:
+                    status, body = stub.handle(method, url.path, query)
+                
+                payload = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+            
+            def log_message(self, format, *args):
+                pass
+        
+        return Handler
+
+
+def parse_per_endpoint(values, cast):
+    # ["search:200", "token:0"] -> {'search': 200.0, 'token': 0.0}
+    settings = {}
+    for value in values or []:
+        endpoint, setting = value.split(':', 1)
+        if endpoint not in ENDPOINTS:
+            raise argparse.ArgumentTypeError(f"unknown endpoint {endpoint}, expected one of {', '.join(ENDPOINTS)}")
+        settings[endpoint] = cast(setting)
+    return settings
+
+
+def add_stub_arguments(parser):
+    parser.add_argument('--latency', type=float, default=50, help='Upstream latency in ms (default 50)')
+    parser.add_argument('--jitter', type=float, default=10, help='Latency jitter in ms (default 10)')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of upstream requests answered with 503')
+    parser.add_argument('--endpoint-latency', action='append', metavar='ENDPOINT:MS',
+                        help=f"Per-endpoint latency (repeatable), endpoints: {', '.join(ENDPOINTS)}")
+    parser.add_argument('--endpoint-error-rate', action='append', metavar='ENDPOINT:RATE',
+                        help='Per-endpoint error rate (repeatable)')
+    parser.add_argument('--seed', type=int, default=1)
+
+
+def stub_from_args(args, host='127.0.0.1', port=0):
+    return StubUpstream(
+        host=host,
+        port=port,
+        latency_ms=args.latency,
+        jitter_ms=args.jitter,
+        error_rate=args.error_rate,
+        endpoint_latency_ms=parse_per_endpoint(args.endpoint_latency, float),
+        endpoint_error_rates=parse_per_endpoint(args.endpoint_error_rate, float),
+        seed=args.seed
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Stub upstream APIs for benchmarks')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8600)
+    add_stub_arguments(parser)
+    args = parser.parse_args()
+    
+    stub = stub_from_args(args, args.host, args.port)
+    print(f"Stub upstream on {stub.url}; point the app at it with:")
+    for name, value in stub.env().items():
+        print(f"  {name}={value}")
+    try:
+        stub.server.serve_forever()
+    except KeyboardInterrupt:
+        stub.server.server_close()
+
+
+if __name__ == '__main__':
+    main()
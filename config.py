@@ -3,9 +3,170 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
+
+def parse_by_type(value):
+    # "teams:zlib-json,flight:json" -> {'teams': 'zlib-json', 'flight': 'json'}
+    values = {}
+    for item in (value or '').split(','):
+        if ':' in item:
+            cache_type, setting = item.split(':', 1)
+            values[cache_type.strip()] = setting.strip()
+    return values
+
+
+def parse_list(value):
+    # "London, Madrid" -> ['London', 'Madrid']
+    return [item.strip() for item in (value or '').split(',') if item.strip()]
+
+
+def parse_hours_by_type(value):
+    # "flight:6,hotel:6" -> {'flight': 6.0, 'hotel': 6.0}
+    hours = {}
+    for item in (value or '').split(','):
+        if ':' in item:
+            cache_type, grace = item.split(':', 1)
+            hours[cache_type.strip()] = float(grace)
+    return hours
+
+
 class Config:
     SECRET_KEY = os.getenv('SECRET_KEY', 'dev-secret-key')
     FOOTBALL_API_KEY = os.getenv('FOOTBALL_API_KEY')
     AMADEUS_API_KEY = os.getenv('AMADEUS_API_KEY')
     AMADEUS_API_SECRET = os.getenv('AMADEUS_API_SECRET')
-    BOOKING_API_KEY = os.getenv('BOOKING_API_KEY')
\ No newline at end of file
+    BOOKING_API_KEY = os.getenv('BOOKING_API_KEY')
+    # Upstream base URLs (e.g. the benchmark stub server); Amadeus is the host
+    FOOTBALL_API_URL = os.getenv('FOOTBALL_API_URL', 'https://v3.football.api-sports.io')
+    AMADEUS_API_URL = os.getenv('AMADEUS_API_URL', 'https://test.api.amadeus.com')
+    BOOKING_API_URL = os.getenv('BOOKING_API_URL', 'https://booking-com.p.rapidapi.com/v1')
+    # Relative SQLite paths live in the Flask instance folder
+    SQLALCHEMY_DATABASE_URI = os.getenv('DATABASE_URL', 'sqlite:///cache.db')
+
+    # Independent trip lookups (flight, hotel, ticket) run on a bounded worker pool
+    PARALLEL_TRIP_LOOKUPS = os.getenv('PARALLEL_TRIP_LOOKUPS', 'true').lower() == 'true'
+    TRIP_LOOKUP_WORKERS = int(os.getenv('TRIP_LOOKUP_WORKERS', 8))
+    MAX_BATCH_TRIPS = int(os.getenv('MAX_BATCH_TRIPS', 50))
+    # Trip endpoints await coroutine services instead of using the worker pool;
+    # off by default, as they were slower than the pool on a cold cache
+    ASYNC_TRIP_LOOKUPS = os.getenv('ASYNC_TRIP_LOOKUPS', 'false').lower() == 'true'
+
+    # In-process memory tier in front of the APICache table
+    MEMORY_CACHE_MAX_ENTRIES = int(os.getenv('MEMORY_CACHE_MAX_ENTRIES', 1024))
+    MEMORY_CACHE_MAX_TTL_SECONDS = int(os.getenv('MEMORY_CACHE_MAX_TTL_SECONDS', 3600))
+
+    # Stale-while-revalidate grace per cache_type, e.g. "flight:6,hotel:6"
+    CACHE_STALE_GRACE_HOURS = parse_hours_by_type(os.getenv('CACHE_STALE_GRACE_HOURS', ''))
+    CACHE_REFRESH_WORKERS = int(os.getenv('CACHE_REFRESH_WORKERS', 2))
+    # Hours past expiry an entry is kept (sweeper, Redis TTL) and served when
+    # the provider's rate limit or daily quota is exhausted
+    CACHE_DEGRADED_GRACE_HOURS = float(os.getenv('CACHE_DEGRADED_GRACE_HOURS', 24 * 7))
+
+    # Shared upstream HTTP transport (connection pools, timeouts in seconds, GET retries)
+    HTTP_POOL_CONNECTIONS = int(os.getenv('HTTP_POOL_CONNECTIONS', 10))
+    HTTP_POOL_MAXSIZE = int(os.getenv('HTTP_POOL_MAXSIZE', 20))
+    HTTP_CONNECT_TIMEOUT = float(os.getenv('HTTP_CONNECT_TIMEOUT', 3.05))
+    HTTP_READ_TIMEOUT = float(os.getenv('HTTP_READ_TIMEOUT', 10))
+    HTTP_MAX_RETRIES = int(os.getenv('HTTP_MAX_RETRIES', 2))
+    HTTP_RETRY_BACKOFF = float(os.getenv('HTTP_RETRY_BACKOFF', 0.3))
+    ASYNC_HTTP_MAX_CONNECTIONS = int(os.getenv('ASYNC_HTTP_MAX_CONNECTIONS', 50))
+
+    # Request logs are queued and bulk-inserted by a background writer
+    REQUEST_LOG_ASYNC = os.getenv('REQUEST_LOG_ASYNC', 'true').lower() == 'true'
+    REQUEST_LOG_QUEUE_SIZE = int(os.getenv('REQUEST_LOG_QUEUE_SIZE', 10000))
+    REQUEST_LOG_BATCH_SIZE = int(os.getenv('REQUEST_LOG_BATCH_SIZE', 200))
+    REQUEST_LOG_FLUSH_SECONDS = float(os.getenv('REQUEST_LOG_FLUSH_SECONDS', 2))
+
+    # In-process latency histograms and counters (routes, upstream calls,
+    # cache backend, JSON), served at /api/admin/metrics
+    METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'true').lower() == 'true'
+
+    # Request profiling (cProfile plus stack samples): off by default, can be
+    # switched on per worker at /api/admin/profiler. Sampled fraction of
+    # requests, header that profiles an admin's request, slowest profiles kept
+    PROFILER_ENABLED = os.getenv('PROFILER_ENABLED', 'false').lower() == 'true'
+    PROFILER_SAMPLE_RATE = float(os.getenv('PROFILER_SAMPLE_RATE', 0))
+    PROFILER_HEADER = os.getenv('PROFILER_HEADER', 'X-Profile')
+    PROFILER_MAX_PROFILES = int(os.getenv('PROFILER_MAX_PROFILES', 20))
+    PROFILER_STACK_INTERVAL_MS = float(os.getenv('PROFILER_STACK_INTERVAL_MS', 5))
+
+    # JSON library for cache payloads and API responses: auto (orjson when
+    # installed), orjson or json. Leagues, teams and matches hits are sent
+    # from the worker's stored response bytes unless passthrough is off.
+    JSON_LIBRARY = os.getenv('JSON_LIBRARY', 'auto')
+    RESPONSE_PASSTHROUGH = os.getenv('RESPONSE_PASSTHROUGH', 'true').lower() == 'true'
+
+    # gzip/br Content-Encoding for JSON and text responses of at least
+    # COMPRESS_MIN_BYTES (br needs the brotli package)
+    COMPRESS_RESPONSES = os.getenv('COMPRESS_RESPONSES', 'true').lower() == 'true'
+    COMPRESS_MIN_BYTES = int(os.getenv('COMPRESS_MIN_BYTES', 1024))
+    GZIP_LEVEL = int(os.getenv('GZIP_LEVEL', 6))
+    BROTLI_QUALITY = int(os.getenv('BROTLI_QUALITY', 5))
+
+    # Retention of the per-minute and per-hour request stats rollups
+    REQUEST_STATS_MINUTE_RETENTION_HOURS = int(os.getenv('REQUEST_STATS_MINUTE_RETENTION_HOURS', 48))
+    REQUEST_STATS_HOUR_RETENTION_DAYS = int(os.getenv('REQUEST_STATS_HOUR_RETENTION_DAYS', 90))
+
+    # Background removal of expired APICache rows
+    CACHE_SWEEP_ENABLED = os.getenv('CACHE_SWEEP_ENABLED', 'true').lower() == 'true'
+    CACHE_SWEEP_INTERVAL_SECONDS = int(os.getenv('CACHE_SWEEP_INTERVAL_SECONDS', 300))
+    CACHE_SWEEP_CHUNK_SIZE = int(os.getenv('CACHE_SWEEP_CHUNK_SIZE', 500))
+
+    # Payload codec for APICache rows: default, per cache_type overrides
+    # ("teams:zlib-json,flight:json") and the size below which JSON is kept plain
+    CACHE_DEFAULT_CODEC = os.getenv('CACHE_DEFAULT_CODEC', 'zlib-json')
+    CACHE_CODECS = parse_by_type(os.getenv('CACHE_CODECS', ''))
+    CACHE_COMPRESS_MIN_BYTES = int(os.getenv('CACHE_COMPRESS_MIN_BYTES', 512))
+
+    # Cache backend: sqlite (APICache table), memory (per process) or redis
+    CACHE_BACKEND = os.getenv('CACHE_BACKEND', 'sqlite')
+    CACHE_REDIS_URL = os.getenv('CACHE_REDIS_URL', 'redis://localhost:6379/0')
+    CACHE_REDIS_PREFIX = os.getenv('CACHE_REDIS_PREFIX', 'football-trip-planner:cache:')
+    CACHE_REDIS_MAX_CONNECTIONS = int(os.getenv('CACHE_REDIS_MAX_CONNECTIONS', 20))
+
+    # League-wide fixture index answering upcoming matches and match details,
+    # refreshed in the background. Leagues (default: all top leagues) and the
+    # refresh interval are cut to fit FIXTURE_QUOTA_SHARE of the football
+    # daily quota.
+    FIXTURE_STORE_ENABLED = os.getenv('FIXTURE_STORE_ENABLED', 'true').lower() == 'true'
+    FIXTURE_LEAGUES = [int(league_id) for league_id in parse_list(os.getenv('FIXTURE_LEAGUES', ''))]
+    FIXTURE_FULL_REFRESH_HOURS = float(os.getenv('FIXTURE_FULL_REFRESH_HOURS', 24))
+    FIXTURE_REFRESH_MINUTES = float(os.getenv('FIXTURE_REFRESH_MINUTES', 360))
+    FIXTURE_QUOTA_SHARE = float(os.getenv('FIXTURE_QUOTA_SHARE', 0.25))
+
+    # Upstream rate limits shared by all workers: requests per minute and per
+    # day by provider; background work leaves a reserve for interactive requests
+    RATE_LIMIT_ENABLED = os.getenv('RATE_LIMIT_ENABLED', 'true').lower() == 'true'
+    PROVIDER_RATE_LIMITS = parse_by_type(os.getenv('PROVIDER_RATE_LIMITS', 'football:10,flight:600,hotel:300'))
+    PROVIDER_DAILY_QUOTAS = {
+        provider: int(quota)
+        for provider, quota in parse_by_type(os.getenv('PROVIDER_DAILY_QUOTAS', 'football:100,flight:2000,hotel:500')).items()
+    }
+    PROVIDER_BACKGROUND_RESERVE = float(os.getenv('PROVIDER_BACKGROUND_RESERVE', 0.2))
+    PROVIDER_MAX_WAIT_SECONDS = float(os.getenv('PROVIDER_MAX_WAIT_SECONDS', 2))
+
+    # Circuit breaker per upstream endpoint: consecutive failures before it
+    # opens and seconds before a trial call is let through
+    CIRCUIT_BREAKER_ENABLED = os.getenv('CIRCUIT_BREAKER_ENABLED', 'true').lower() == 'true'
+    CIRCUIT_FAILURE_THRESHOLD = int(os.getenv('CIRCUIT_FAILURE_THRESHOLD', 5))
+    CIRCUIT_RESET_SECONDS = float(os.getenv('CIRCUIT_RESET_SECONDS', 30))
+
+    # Cache warm-up (`flask warm-cache`): origin cities for flight quotes, pool
+    # size and per-provider budgets of upstream lookups
+    WARM_CACHE_ON_STARTUP = os.getenv('WARM_CACHE_ON_STARTUP', 'false').lower() == 'true'
+    WARM_CACHE_ORIGIN_CITIES = parse_list(os.getenv('WARM_CACHE_ORIGIN_CITIES', 'London,Manchester,Madrid'))
+    WARM_CACHE_WORKERS = int(os.getenv('WARM_CACHE_WORKERS', 4))
+    WARM_CACHE_BUDGETS = {
+        provider: int(budget)
+        for provider, budget in parse_by_type(os.getenv('WARM_CACHE_BUDGETS', 'football:100,flight:100,hotel:100')).items()
+    }
+
+    # SQLite connection settings and SQLAlchemy pool (shared by request threads,
+    # lookup executors and background writers within a worker)
+    SQLITE_JOURNAL_MODE = os.getenv('SQLITE_JOURNAL_MODE', 'WAL')
+    SQLITE_BUSY_TIMEOUT_MS = int(os.getenv('SQLITE_BUSY_TIMEOUT_MS', 5000))
+    SQLITE_SYNCHRONOUS = os.getenv('SQLITE_SYNCHRONOUS', 'NORMAL')
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        'pool_size': int(os.getenv('DB_POOL_SIZE', 20)),
+        'max_overflow': int(os.getenv('DB_MAX_OVERFLOW', 10)),
+        'pool_timeout': int(os.getenv('DB_POOL_TIMEOUT', 10))
+    }
@@ -0,0 +1,33 @@
+import os
+import subprocess
+import sys
+
+# Production serving profile: `gunicorn wsgi:app` picks this file up from the
+# working directory. Every setting can be overridden with an env var.
+bind = os.getenv('GUNICORN_BIND', '0.0.0.0:5000')
+workers = int(os.getenv('WEB_CONCURRENCY', 4))
+worker_class = 'gthread'
+threads = int(os.getenv('GUNICORN_THREADS', 8))
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 60))
+keepalive = 5
+accesslog = os.getenv('GUNICORN_ACCESS_LOG', '-') or None
+
+# Import the app once in the master so create_all() and schema upgrades run
+# before any worker starts. Background threads (request log writer, cache
+# sweeper, executors' pools) start lazily inside each worker.
+preload_app = True
+
+
+def post_fork(server, worker):
+    # Pooled SQLite connections must not be shared with the master process
+    from app import app
+    from models.cache import db
+    with app.app_context():
+        db.engine.dispose(close=False)
+
+
+def when_ready(server):
+    # Warm the cache from a separate process so workers start serving at once
+    from config import Config
+    if Config.WARM_CACHE_ON_STARTUP:
+        subprocess.Popen([sys.executable, '-m', 'flask', '--app', 'wsgi', 'warm-cache'])
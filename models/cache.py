@@ -1,5 +1,9 @@
 from datetime import datetime, timedelta
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import IntegrityError
+from models.memory_cache import memory_cache
+from models.codecs import codec_registry
 
 db = SQLAlchemy()
 
@@ -11,47 +15,116 @@ class APICache(db.Model):
     cache_type = db.Column(db.String(50), nullable=False)
     response_data = db.Column(db.Text, nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    expires_at = db.Column(db.DateTime, nullable=False)
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
+    # Rows written by set_value with a compressing codec keep their bytes in
+    # payload; plain JSON rows (codec NULL) keep using response_data
+    codec = db.Column(db.String(20))
+    payload = db.Column(db.LargeBinary)
     
     @staticmethod
     def get_cached(cache_key):
+        entry = APICache.get_entry(cache_key)
+        return entry.get_text() if entry else None
+    
+    @staticmethod
+    def get_entry(cache_key, stale_grace_hours=0):
+        # Expired rows are left for the background sweeper (purge_expired)
+        # so the read path never writes
         cached = APICache.query.filter_by(cache_key=cache_key).first()
-        if cached and cached.expires_at > datetime.utcnow():
-            return cached.response_data
-        elif cached:
-            db.session.delete(cached)
-            db.session.commit()
+        if cached and cached.expires_at + timedelta(hours=stale_grace_hours) > datetime.utcnow():
+            return cached
         return None
     
+    def is_stale(self):
+        return self.expires_at <= datetime.utcnow()
+    
+    def get_value(self):
+        if self.codec:
+            return codec_registry.decode(self.codec, self.payload)
+        return codec_registry.decode('json', self.response_data)
+    
+    def get_text(self):
+        if self.codec:
+            return codec_registry.decode_text(self.codec, self.payload)
+        return self.response_data
+    
     @staticmethod
     def set_cache(cache_key, cache_type, response_data, ttl_hours=24):
+        APICache._store(cache_key, cache_type, {'response_data': response_data, 'codec': None, 'payload': None}, ttl_hours)
+    
+    @staticmethod
+    def set_value(cache_key, cache_type, value, ttl_hours=24):
+        codec_name, data = codec_registry.encode(cache_type, value)
+        if codec_name == 'json':
+            fields = {'response_data': data.decode('utf-8'), 'codec': None, 'payload': None}
+        else:
+            fields = {'response_data': '', 'codec': codec_name, 'payload': data}
+        APICache._store(cache_key, cache_type, fields, ttl_hours)
+    
+    @staticmethod
+    def _store(cache_key, cache_type, fields, ttl_hours):
+        try:
+            APICache._upsert(cache_key, cache_type, fields, ttl_hours)
+        except IntegrityError:
+            # Another worker inserted the same key between our select and insert
+            db.session.rollback()
+            APICache._upsert(cache_key, cache_type, fields, ttl_hours)
+        memory_cache.invalidate(cache_key)
+    
+    @staticmethod
+    def _upsert(cache_key, cache_type, fields, ttl_hours):
         existing = APICache.query.filter_by(cache_key=cache_key).first()
         if existing:
-            existing.response_data = response_data
+            for name, value in fields.items():
+                setattr(existing, name, value)
             existing.expires_at = datetime.utcnow() + timedelta(hours=ttl_hours)
             existing.created_at = datetime.utcnow()
         else:
             cache_entry = APICache(
                 cache_key=cache_key,
                 cache_type=cache_type,
-                response_data=response_data,
-                expires_at=datetime.utcnow() + timedelta(hours=ttl_hours)
+                expires_at=datetime.utcnow() + timedelta(hours=ttl_hours),
+                **fields
             )
             db.session.add(cache_entry)
         db.session.commit()
     
     @staticmethod
     def clear_expired():
-        expired = APICache.query.filter(APICache.expires_at < datetime.utcnow()).all()
-        for entry in expired:
-            db.session.delete(entry)
-        db.session.commit()
-        return len(expired)
+        return APICache.purge_expired()
+    
+    @staticmethod
+    def purge_expired(chunk_size=500, stale_grace_hours=None, degraded_grace_hours=0):
+        # Set-based deletes in bounded chunks using the expires_at index;
+        # rows are kept until their type's stale grace period ends, and at
+        # least degraded_grace_hours so they can be served while upstream
+        # quota is exhausted
+        now = datetime.utcnow()
+        stale_grace_hours = stale_grace_hours or {}
+        conditions = [
+            db.and_(APICache.cache_type == cache_type,
+                    APICache.expires_at < now - timedelta(hours=max(hours, degraded_grace_hours)))
+            for cache_type, hours in stale_grace_hours.items()
+        ]
+        conditions.append(db.and_(APICache.cache_type.notin_(list(stale_grace_hours)),
+                                  APICache.expires_at < now - timedelta(hours=degraded_grace_hours)))
+        
+        deleted = 0
+        for condition in conditions:
+            while True:
+                ids = db.select(APICache.id).where(condition).limit(chunk_size).scalar_subquery()
+                result = db.session.execute(db.delete(APICache).where(APICache.id.in_(ids)))
+                db.session.commit()
+                deleted += result.rowcount
+                if result.rowcount < chunk_size:
+                    break
+        return deleted
     
     @staticmethod
     def clear_all():
         count = APICache.query.delete()
         db.session.commit()
+        memory_cache.clear()
         return count
 
 
@@ -63,21 +136,195 @@ class RequestLog(db.Model):
     username = db.Column(db.String(100))
     cache_hit = db.Column(db.Boolean, default=False)
     timestamp = db.Column(db.DateTime, default=datetime.utcnow)
+    cache_detail = db.Column(db.String(500))
+    lookups = db.Column(db.Integer, default=0)
+    lookup_hits = db.Column(db.Integer, default=0)
+    
+    @staticmethod
+    def build_record(endpoint, username=None, cache_hit=False, provenance=None):
+        record = {
+            'endpoint': endpoint,
+            'username': username,
+            'cache_hit': cache_hit,
+            'timestamp': datetime.utcnow(),
+            'cache_detail': None,
+            'lookups': 0,
+            'lookup_hits': 0
+        }
+        if provenance is not None:
+            record['cache_hit'] = provenance.cache_hit
+            record['cache_detail'] = provenance.detail[:500] or None
+            record['lookups'] = len(provenance.lookups)
+            record['lookup_hits'] = provenance.hits
+        return record
+    
+    @staticmethod
+    def log_request(endpoint, username=None, cache_hit=False, provenance=None):
+        RequestLog.write_batch([RequestLog.build_record(endpoint, username, cache_hit, provenance)])
+    
+    @staticmethod
+    def write_batch(records):
+        db.session.execute(db.insert(RequestLog), records)
+        RequestStat.record(records)
+        db.session.commit()
+    
+    @staticmethod
+    def get_stats(window=None, group_by=None):
+        return RequestStat.get_stats(window, group_by)
+
+
+class RequestStat(db.Model):
+    # Rollup counters kept up to date by RequestLog.write_batch, so stats
+    # queries never scan request_log. Anonymous requests use username ''.
+    __tablename__ = 'request_stat'
+    __table_args__ = (
+        db.UniqueConstraint('granularity', 'bucket_start', 'endpoint', 'username', name='uq_request_stat_bucket'),
+    )
+    
+    GRANULARITIES = {
+        'minute': timedelta(minutes=1),
+        'hour': timedelta(hours=1),
+        'total': None
+    }
+    TOTAL_BUCKET = datetime(1970, 1, 1)
+    GROUP_COLUMNS = ('endpoint', 'username', 'bucket')
+    
+    id = db.Column(db.Integer, primary_key=True)
+    granularity = db.Column(db.String(10), nullable=False)
+    bucket_start = db.Column(db.DateTime, nullable=False)
+    endpoint = db.Column(db.String(200), nullable=False)
+    username = db.Column(db.String(100), nullable=False, default='')
+    requests = db.Column(db.Integer, nullable=False, default=0)
+    cache_hits = db.Column(db.Integer, nullable=False, default=0)
+    lookups = db.Column(db.Integer, nullable=False, default=0)
+    lookup_hits = db.Column(db.Integer, nullable=False, default=0)
+    
+    @staticmethod
+    def bucket_for(timestamp, granularity):
+        if granularity == 'minute':
+            return timestamp.replace(second=0, microsecond=0)
+        if granularity == 'hour':
+            return timestamp.replace(minute=0, second=0, microsecond=0)
+        return RequestStat.TOTAL_BUCKET
+    
+    @staticmethod
+    def record(records):
+        counters = {}
+        for record in records:
+            timestamp = record.get('timestamp') or datetime.utcnow()
+            for granularity in RequestStat.GRANULARITIES:
+                key = (granularity, RequestStat.bucket_for(timestamp, granularity), record['endpoint'], record.get('username') or '')
+                counter = counters.setdefault(key, [0, 0, 0, 0])
+                counter[0] += 1
+                counter[1] += 1 if record.get('cache_hit') else 0
+                counter[2] += record.get('lookups') or 0
+                counter[3] += record.get('lookup_hits') or 0
+        
+        if not counters:
+            return
+        
+        rows = [
+            {
+                'granularity': granularity,
+                'bucket_start': bucket_start,
+                'endpoint': endpoint,
+                'username': username,
+                'requests': counter[0],
+                'cache_hits': counter[1],
+                'lookups': counter[2],
+                'lookup_hits': counter[3]
+            }
+            for (granularity, bucket_start, endpoint, username), counter in counters.items()
+        ]
+        statement = sqlite_insert(RequestStat)
+        statement = statement.on_conflict_do_update(
+            index_elements=['granularity', 'bucket_start', 'endpoint', 'username'],
+            set_={
+                'requests': RequestStat.requests + statement.excluded.requests,
+                'cache_hits': RequestStat.cache_hits + statement.excluded.cache_hits,
+                'lookups': RequestStat.lookups + statement.excluded.lookups,
+                'lookup_hits': RequestStat.lookup_hits + statement.excluded.lookup_hits
+            }
+        )
+        db.session.execute(statement, rows)
+    
+    @staticmethod
+    def get_stats(window=None, group_by=None):
+        if window is None:
+            granularity = 'total'
+            query = RequestStat.query.filter_by(granularity=granularity)
+        else:
+            # Minute buckets for short windows, hour buckets otherwise; the
+            # oldest bucket is included whole
+            granularity = 'minute' if window <= timedelta(hours=2) else 'hour'
+            since = RequestStat.bucket_for(datetime.utcnow() - window, granularity)
+            query = RequestStat.query.filter(
+                RequestStat.granularity == granularity,
+                RequestStat.bucket_start >= since
+            )
+        
+        totals = (
+            db.func.sum(RequestStat.requests),
+            db.func.sum(RequestStat.cache_hits),
+            db.func.sum(RequestStat.lookups),
+            db.func.sum(RequestStat.lookup_hits)
+        )
+        stats = RequestStat._summarize(*query.with_entities(*totals).one())
+        
+        if group_by:
+            group_column = RequestStat.bucket_start if group_by == 'bucket' else getattr(RequestStat, group_by)
+            rows = query.with_entities(group_column, *totals).group_by(group_column).order_by(group_column).all()
+            stats['groups'] = [
+                dict(RequestStat._summarize(*row[1:]), **{group_by: row[0].isoformat() if group_by == 'bucket' else row[0]})
+                for row in rows
+            ]
+        
+        if window is not None:
+            stats['window_seconds'] = int(window.total_seconds())
+            stats['granularity'] = granularity
+        return stats
+    
+    @staticmethod
+    def prune(granularity, before):
+        count = RequestStat.query.filter(
+            RequestStat.granularity == granularity,
+            RequestStat.bucket_start < before
+        ).delete(synchronize_session=False)
+        db.session.commit()
+        return count
     
     @staticmethod
-    def log_request(endpoint, username=None, cache_hit=False):
-        log = RequestLog(endpoint=endpoint, username=username, cache_hit=cache_hit)
-        db.session.add(log)
+    def backfill():
+        # One-time rollup of request_log rows written before rollups existed
+        if RequestStat.query.first() is not None or RequestLog.query.first() is None:
+            return 0
+        
+        count = 0
+        batch = []
+        columns = (RequestLog.endpoint, RequestLog.username, RequestLog.cache_hit,
+                   RequestLog.timestamp, RequestLog.lookups, RequestLog.lookup_hits)
+        for row in db.session.query(*columns).yield_per(1000):
+            batch.append(row._asdict())
+            if len(batch) >= 1000:
+                RequestStat.record(batch)
+                count += len(batch)
+                batch = []
+        RequestStat.record(batch)
         db.session.commit()
+        return count + len(batch)
     
     @staticmethod
-    def get_stats():
-        total = RequestLog.query.count()
-        cache_hits = RequestLog.query.filter_by(cache_hit=True).count()
-        cache_rate = (cache_hits / total * 100) if total > 0 else 0
+    def _summarize(requests, cache_hits, lookups, lookup_hits):
+        requests = requests or 0
+        cache_hits = cache_hits or 0
+        lookups = lookups or 0
+        lookup_hits = lookup_hits or 0
         return {
-            'total_requests': total,
+            'total_requests': requests,
             'cache_hits': cache_hits,
-            'cache_misses': total - cache_hits,
-            'cache_hit_rate': round(cache_rate, 2)
-        }
\ No newline at end of file
+            'cache_misses': requests - cache_hits,
+            'cache_hit_rate': round(cache_hits / requests * 100, 2) if requests > 0 else 0,
+            'lookups': lookups,
+            'lookup_hits': lookup_hits,
+            'lookup_hit_rate': round(lookup_hits / lookups * 100, 2) if lookups > 0 else 0
+        }
@@ -0,0 +1,230 @@
+import json
+import threading
+import time
+from datetime import datetime, timedelta
+from models.cache import APICache
+from models.codecs import codec_registry
+from models.memory_cache import memory_cache, encoded_responses
+from models.metrics import cache_duration, cache_reads
+from models.resp_client import RESPClient, RESPError
+
+
+class CacheEntry:
+    def __init__(self, cache_type, codec, data, created_at, expires_at):
+        self.cache_type = cache_type
+        self.codec = codec
+        self.data = data
+        self.created_at = created_at
+        self.expires_at = expires_at
+    
+    def is_stale(self):
+        return self.expires_at <= datetime.utcnow()
+    
+    def get_value(self):
+        return codec_registry.decode(self.codec, self.data)
+    
+    def get_text(self):
+        return codec_registry.decode_text(self.codec, self.data)
+
+
+class CacheBackend:
+    # Entries returned by get_entry expose get_value(), get_text(),
+    # is_stale(), created_at and expires_at (APICache rows do too)
+    name = None
+    
+    def get_entry(self, cache_key, stale_grace_hours=0):
+        start = time.perf_counter()
+        entry = self._get_entry(cache_key, stale_grace_hours)
+        cache_duration.observe(time.perf_counter() - start, self.name, 'get')
+        cache_reads.inc(self.name, 'miss' if entry is None else 'hit')
+        return entry
+    
+    def set_value(self, cache_key, cache_type, value, ttl_hours=24):
+        start = time.perf_counter()
+        self._set(cache_key, cache_type, value, ttl_hours)
+        cache_duration.observe(time.perf_counter() - start, self.name, 'set')
+        memory_cache.invalidate(cache_key)
+        encoded_responses.invalidate(cache_key)
+    
+    def clear(self):
+        count = self._clear()
+        memory_cache.clear()
+        encoded_responses.clear()
+        return count
+    
+    def count(self):
+        raise NotImplementedError
+    
+    def purge_expired(self, chunk_size=500, stale_grace_hours=None, degraded_grace_hours=0):
+        return 0
+    
+    def _get_entry(self, cache_key, stale_grace_hours):
+        raise NotImplementedError
+    
+    def _set(self, cache_key, cache_type, value, ttl_hours):
+        raise NotImplementedError
+    
+    def _clear(self):
+        raise NotImplementedError
+
+
+class SQLiteCacheBackend(CacheBackend):
+    name = 'sqlite'
+    
+    def _get_entry(self, cache_key, stale_grace_hours):
+        return APICache.get_entry(cache_key, stale_grace_hours)
+    
+    def count(self):
+        return APICache.query.count()
+    
+    def purge_expired(self, chunk_size=500, stale_grace_hours=None, degraded_grace_hours=0):
+        return APICache.purge_expired(chunk_size, stale_grace_hours, degraded_grace_hours)
+    
+    def _set(self, cache_key, cache_type, value, ttl_hours):
+        APICache.set_value(cache_key, cache_type, value, ttl_hours=ttl_hours)
+    
+    def _clear(self):
+        return APICache.clear_all()
+
+
+class MemoryCacheBackend(CacheBackend):
+    name = 'memory'
+    
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+    
+    def _get_entry(self, cache_key, stale_grace_hours):
+        entry = self._entries.get(cache_key)
+        if entry and entry.expires_at + timedelta(hours=stale_grace_hours) > datetime.utcnow():
+            return entry
+        return None
+    
+    def count(self):
+        return len(self._entries)
+    
+    def purge_expired(self, chunk_size=500, stale_grace_hours=None, degraded_grace_hours=0):
+        stale_grace_hours = stale_grace_hours or {}
+        now = datetime.utcnow()
+        with self._lock:
+            expired = [
+                cache_key for cache_key, entry in self._entries.items()
+                if entry.expires_at + timedelta(
+                    hours=max(stale_grace_hours.get(entry.cache_type, 0), degraded_grace_hours)) < now
+            ]
+            for cache_key in expired:
+                del self._entries[cache_key]
+        return len(expired)
+    
+    def _set(self, cache_key, cache_type, value, ttl_hours):
+        codec_name, data = codec_registry.encode(cache_type, value)
+        now = datetime.utcnow()
+        with self._lock:
+            self._entries[cache_key] = CacheEntry(cache_type, codec_name, data, now, now + timedelta(hours=ttl_hours))
+    
+    def _clear(self):
+        with self._lock:
+            count = len(self._entries)
+            self._entries.clear()
+            return count
+
+
+class RedisCacheBackend(CacheBackend):
+    # Entries are stored as "<json header>\n<payload>" with a native TTL of
+    # ttl_hours plus the longer of their cache type's stale grace period and
+    # degraded_grace_hours, so no sweep is needed. Connection errors degrade
+    # to cache misses.
+    name = 'redis'
+    
+    def __init__(self, client, prefix='football-trip-planner:cache:', stale_grace_hours=None, degraded_grace_hours=0):
+        self.client = client
+        self.prefix = prefix
+        self.stale_grace_hours = stale_grace_hours or {}
+        self.degraded_grace_hours = degraded_grace_hours
+    
+    def _get_entry(self, cache_key, stale_grace_hours):
+        try:
+            blob = self.client.execute('GET', self.prefix + cache_key)
+        except (OSError, ConnectionError, RESPError) as e:
+            print(f"Error reading cache entry from Redis: {e}")
+            return None
+        if blob is None:
+            return None
+        
+        try:
+            header, data = blob.split(b'\n', 1)
+            header = json.loads(header)
+            entry = CacheEntry(
+                header['type'],
+                header['codec'],
+                data,
+                datetime.fromisoformat(header['created_at']),
+                datetime.fromisoformat(header['expires_at'])
+            )
+            if entry.codec not in codec_registry.codecs:
+                raise ValueError(f"unknown codec {entry.codec!r}")
+        except (ValueError, KeyError, TypeError) as e:
+            # Not written by this backend (or truncated): treat as a miss
+            print(f"Malformed cache entry in Redis for {cache_key}: {e}")
+            return None
+        if entry.expires_at + timedelta(hours=stale_grace_hours) > datetime.utcnow():
+            return entry
+        return None
+    
+    def count(self):
+        # None when Redis is unreachable
+        try:
+            return sum(len(keys) for keys in self._scan())
+        except (OSError, ConnectionError, RESPError) as e:
+            print(f"Error counting cache entries in Redis: {e}")
+            return None
+    
+    def _set(self, cache_key, cache_type, value, ttl_hours):
+        codec_name, data = codec_registry.encode(cache_type, value)
+        now = datetime.utcnow()
+        header = json.dumps({
+            'type': cache_type,
+            'codec': codec_name,
+            'created_at': now.isoformat(),
+            'expires_at': (now + timedelta(hours=ttl_hours)).isoformat()
+        }).encode('utf-8')
+        grace_hours = max(self.stale_grace_hours.get(cache_type, 0), self.degraded_grace_hours)
+        ttl_ms = int((ttl_hours + grace_hours) * 3600 * 1000)
+        
+        try:
+            self.client.execute('SET', self.prefix + cache_key, header + b'\n' + data, 'PX', max(ttl_ms, 1))
+        except (OSError, ConnectionError, RESPError) as e:
+            print(f"Error writing cache entry to Redis: {e}")
+    
+    def _clear(self):
+        # None when Redis is unreachable
+        count = 0
+        try:
+            for keys in self._scan():
+                if keys:
+                    count += self.client.execute('DEL', *keys)
+        except (OSError, ConnectionError, RESPError) as e:
+            print(f"Error clearing cache entries in Redis: {e}")
+            return None
+        return count
+    
+    def _scan(self):
+        cursor = b'0'
+        while True:
+            cursor, keys = self.client.execute('SCAN', cursor, 'MATCH', self.prefix + '*', 'COUNT', 1000)
+            yield keys
+            if cursor in (b'0', '0'):
+                return
+
+
+def create_cache_backend(config):
+    backend = config['CACHE_BACKEND']
+    if backend == 'sqlite':
+        return SQLiteCacheBackend()
+    if backend == 'memory':
+        return MemoryCacheBackend()
+    if backend == 'redis':
+        client = RESPClient.from_url(config['CACHE_REDIS_URL'], max_connections=config['CACHE_REDIS_MAX_CONNECTIONS'])
+        return RedisCacheBackend(client, config['CACHE_REDIS_PREFIX'], config['CACHE_STALE_GRACE_HOURS'],
+                                 config['CACHE_DEGRADED_GRACE_HOURS'])
+    raise ValueError(f"Unknown cache backend: {backend}")
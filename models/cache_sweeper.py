@@ -0,0 +1,82 @@
+import threading
+import time
+from datetime import datetime
+from models.cache import db
+
+
+class CacheSweeper:
+    def __init__(self, app, backend, enabled=True, interval=300, chunk_size=500, stale_grace_hours=None,
+                 degraded_grace_hours=0):
+        self.app = app
+        self.backend = backend
+        self.enabled = enabled
+        self.interval = interval
+        self.chunk_size = chunk_size
+        self.stale_grace_hours = stale_grace_hours or {}
+        self.degraded_grace_hours = degraded_grace_hours
+        self.runs = 0
+        self.total_deleted = 0
+        self.total_duration = 0.0
+        self.last_run_at = None
+        self.last_deleted = 0
+        self.last_duration = 0.0
+        self._thread = None
+        self._stop = threading.Event()
+        self._start_lock = threading.Lock()
+        self._sweep_lock = threading.Lock()
+    
+    def ensure_started(self):
+        # Started from the first request so pre-forking servers get the
+        # thread in each worker
+        if self._thread is None and self.enabled and not self.app.testing:
+            self.start()
+    
+    def start(self):
+        with self._start_lock:
+            if self._thread is not None:
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='cache-sweeper', daemon=True)
+            self._thread.start()
+    
+    def stop(self, timeout=5):
+        with self._start_lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._stop.set()
+            thread.join(timeout)
+    
+    def sweep(self):
+        with self._sweep_lock, self.app.app_context():
+            start = time.perf_counter()
+            try:
+                deleted = self.backend.purge_expired(self.chunk_size, self.stale_grace_hours, self.degraded_grace_hours)
+            except Exception as e:
+                print(f"Error sweeping expired cache entries: {e}")
+                db.session.rollback()
+                deleted = 0
+            duration = time.perf_counter() - start
+            
+            self.runs += 1
+            self.last_run_at = datetime.utcnow()
+            self.last_deleted = deleted
+            self.last_duration = duration
+            self.total_deleted += deleted
+            self.total_duration += duration
+            return deleted
+    
+    def stats(self):
+        return {
+            'running': self._thread is not None,
+            'interval_seconds': self.interval,
+            'runs': self.runs,
+            'total_deleted': self.total_deleted,
+            'last_run_at': self.last_run_at.isoformat() if self.last_run_at else None,
+            'last_deleted': self.last_deleted,
+            'last_duration_ms': round(self.last_duration * 1000, 2),
+            'avg_duration_ms': round(self.total_duration / self.runs * 1000, 2) if self.runs else 0
+        }
+    
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.sweep()
@@ -0,0 +1,144 @@
+import json
+import threading
+import time
+import zlib
+from models.metrics import json_duration
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class JSONSerializer:
+    # Compact UTF-8 JSON bytes from orjson when it is installed, else from
+    # the json module. Cached payloads and API responses both go through it,
+    # so stored bytes can be sent as response bodies unchanged.
+    def __init__(self, library='auto'):
+        self.configure(library)
+    
+    def configure(self, library):
+        if library == 'auto':
+            library = 'orjson' if orjson is not None else 'json'
+        if library not in ('orjson', 'json'):
+            raise ValueError(f"Unknown JSON library: {library}")
+        if library == 'orjson' and orjson is None:
+            raise ValueError('orjson is not installed')
+        self.library = library
+    
+    def dumps(self, value, default=None, sort_keys=False):
+        if self.library == 'orjson':
+            # Datetimes go to `default` as they do with json, and int keys
+            # are stringified
+            option = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+            if sort_keys:
+                option |= orjson.OPT_SORT_KEYS
+            return orjson.dumps(value, default=default, option=option)
+        return json.dumps(value, default=default, sort_keys=sort_keys, separators=(',', ':'),
+                          ensure_ascii=False).encode('utf-8')
+    
+    def loads(self, data):
+        if self.library == 'orjson':
+            return orjson.loads(data)
+        return json.loads(data)
+
+
+json_serializer = JSONSerializer()
+
+
+class JSONCodec:
+    name = 'json'
+    
+    def encode(self, raw):
+        return raw
+    
+    def decode(self, data):
+        return data
+
+
+class ZlibCodec:
+    name = 'zlib-json'
+    
+    def __init__(self, level=6):
+        self.level = level
+    
+    def encode(self, raw):
+        return zlib.compress(raw, self.level)
+    
+    def decode(self, data):
+        return zlib.decompress(data)
+
+
+class CodecRegistry:
+    def __init__(self, default_codec='zlib-json', codecs_by_type=None, min_size=512):
+        self.codecs = {codec.name: codec for codec in (JSONCodec(), ZlibCodec())}
+        self.default_codec = default_codec
+        self.codecs_by_type = codecs_by_type or {}
+        self.min_size = min_size
+        self._stats = {}
+        self._lock = threading.Lock()
+    
+    def configure(self, default_codec=None, codecs_by_type=None, min_size=None):
+        for name in [default_codec, *(codecs_by_type or {}).values()]:
+            if name is not None and name not in self.codecs:
+                raise ValueError(f"Unknown cache codec: {name}")
+        if default_codec is not None:
+            self.default_codec = default_codec
+        if codecs_by_type is not None:
+            self.codecs_by_type = codecs_by_type
+        if min_size is not None:
+            self.min_size = min_size
+    
+    def encode(self, cache_type, value):
+        # Returns (codec_name, bytes); payloads below min_size stay plain JSON
+        start = time.perf_counter()
+        raw = json_serializer.dumps(value)
+        codec = self.codecs[self.codecs_by_type.get(cache_type, self.default_codec)]
+        if len(raw) < self.min_size:
+            codec = self.codecs['json']
+        data = codec.encode(raw)
+        seconds = time.perf_counter() - start
+        self._record(codec.name, 'encode', len(raw), len(data), seconds)
+        json_duration.observe(seconds, 'cache', 'encode')
+        return codec.name, data
+    
+    def decode(self, codec_name, data):
+        start = time.perf_counter()
+        raw = self.codecs[codec_name].decode(data)
+        value = json_serializer.loads(raw)
+        seconds = time.perf_counter() - start
+        self._record(codec_name, 'decode', len(raw), len(data), seconds)
+        json_duration.observe(seconds, 'cache', 'decode')
+        return value
+    
+    def decode_text(self, codec_name, data):
+        return self.codecs[codec_name].decode(data).decode('utf-8')
+    
+    def stats(self):
+        with self._lock:
+            stats = {}
+            for name, counters in self._stats.items():
+                stats[name] = dict(counters)
+                stats[name]['bytes_saved'] = counters['raw_bytes'] - counters['stored_bytes']
+                stats[name]['avg_encode_us'] = round(counters['encode_seconds'] / counters['encodes'] * 1e6, 1) if counters['encodes'] else 0
+                stats[name]['avg_decode_us'] = round(counters['decode_seconds'] / counters['decodes'] * 1e6, 1) if counters['decodes'] else 0
+            return stats
+    
+    def _record(self, codec_name, operation, raw_bytes, stored_bytes, seconds):
+        with self._lock:
+            counters = self._stats.setdefault(codec_name, {
+                'encodes': 0,
+                'decodes': 0,
+                'raw_bytes': 0,
+                'stored_bytes': 0,
+                'encode_seconds': 0.0,
+                'decode_seconds': 0.0
+            })
+            counters[operation + 's'] += 1
+            counters[operation + '_seconds'] += seconds
+            if operation == 'encode':
+                counters['raw_bytes'] += raw_bytes
+                counters['stored_bytes'] += stored_bytes
+
+
+codec_registry = CodecRegistry()
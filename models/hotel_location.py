@@ -0,0 +1,29 @@
+from datetime import datetime
+from sqlalchemy.exc import IntegrityError
+from models.cache import db
+
+class HotelLocation(db.Model):
+    __tablename__ = 'hotel_location'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    city = db.Column(db.String(200), unique=True, nullable=False, index=True)
+    dest_id = db.Column(db.String(50), nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    @staticmethod
+    def get_all():
+        return {location.city: location.dest_id for location in HotelLocation.query.all()}
+    
+    @staticmethod
+    def save(city, dest_id):
+        existing = HotelLocation.query.filter_by(city=city).first()
+        if existing:
+            existing.dest_id = dest_id
+        else:
+            db.session.add(HotelLocation(city=city, dest_id=dest_id))
+        
+        try:
+            db.session.commit()
+        except IntegrityError:
+            # Resolved concurrently by another worker; the mapping is the same
+            db.session.rollback()
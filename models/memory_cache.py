@@ -0,0 +1,90 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class MemoryCache:
+    def __init__(self, max_entries=1024, max_ttl_seconds=3600):
+        self.max_entries = max_entries
+        self.max_ttl_seconds = max_ttl_seconds
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+    
+    def configure(self, max_entries=None, max_ttl_seconds=None):
+        with self._lock:
+            if max_entries is not None:
+                self.max_entries = max_entries
+            if max_ttl_seconds is not None:
+                self.max_ttl_seconds = max_ttl_seconds
+            self._evict()
+    
+    def get(self, key):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            
+            value, expires_at = entry
+            if expires_at <= now:
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+    
+    def set(self, key, value, ttl_seconds):
+        # The TTL is capped so that entries written by other workers to the
+        # shared database tier are picked up within max_ttl_seconds
+        ttl_seconds = min(ttl_seconds, self.max_ttl_seconds)
+        if ttl_seconds <= 0 or self.max_entries <= 0:
+            self.invalidate(key)
+            return
+        
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + ttl_seconds)
+            self._entries.move_to_end(key)
+            self._evict()
+    
+    def invalidate(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+    
+    def clear(self):
+        with self._lock:
+            count = len(self._entries)
+            self._entries.clear()
+            return count
+    
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'hit_rate': round(self.hits / lookups * 100, 2) if lookups > 0 else 0
+            }
+    
+    def _evict(self):
+        while len(self._entries) > max(self.max_entries, 0):
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+
+memory_cache = MemoryCache()
+# Serialized API responses (models.responses.EncodedResponse) by cache key,
+# answering hits and If-None-Match without calling the service; invalidated
+# with the entries they were built from
+encoded_responses = MemoryCache(max_entries=4096)
@@ -0,0 +1,218 @@
+import bisect
+import threading
+import time
+from flask import g, request
+
+# Upper bounds in seconds, from a memory-tier cache read to a slow upstream call
+DEFAULT_BUCKETS = (0.0001, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+
+def escape_label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def format_labels(names, values):
+    if not names:
+        return ''
+    return '{' + ','.join(f'{name}="{escape_label(value)}"' for name, value in zip(names, values)) + '}'
+
+
+def format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value)
+
+
+class Counter:
+    type = 'counter'
+    
+    def __init__(self, registry, name, documentation, labels=()):
+        self.registry = registry
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+    
+    def inc(self, *label_values, amount=1):
+        if not self.registry.enabled:
+            return
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+    
+    def value(self, *label_values):
+        with self._lock:
+            return self._values.get(label_values, 0)
+    
+    def reset(self):
+        with self._lock:
+            self._values = {}
+    
+    def render(self):
+        with self._lock:
+            values = sorted(self._values.items())
+        return [f"{self.name}{format_labels(self.labels, label_values)} {format_value(value)}" for label_values, value in values]
+
+
+class Histogram:
+    type = 'histogram'
+    
+    def __init__(self, registry, name, documentation, labels=(), buckets=DEFAULT_BUCKETS):
+        self.registry = registry
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> [count per bucket..., count above the last bucket, sum]
+        self._series = {}
+        self._lock = threading.Lock()
+    
+    def observe(self, seconds, *label_values):
+        if not self.registry.enabled:
+            return
+        # Prometheus buckets are inclusive upper bounds
+        index = bisect.bisect_left(self.buckets, seconds)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [0] * (len(self.buckets) + 2)
+            series[index] += 1
+            series[-1] += seconds
+    
+    def snapshot(self, *label_values):
+        # {'count': n, 'sum': seconds, 'buckets': {upper bound: cumulative count}}
+        with self._lock:
+            series = list(self._series.get(label_values) or [0] * (len(self.buckets) + 2))
+        cumulative, buckets = 0, {}
+        for bound, count in zip(self.buckets + (float('inf'),), series[:-1]):
+            cumulative += count
+            buckets[bound] = cumulative
+        return {'count': cumulative, 'sum': series[-1], 'buckets': buckets}
+    
+    def reset(self):
+        with self._lock:
+            self._series = {}
+    
+    def render(self):
+        with self._lock:
+            series = sorted((label_values, list(values)) for label_values, values in self._series.items())
+        names = self.labels + ('le',)
+        lines = []
+        for label_values, values in series:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), values[:-1]):
+                cumulative += count
+                lines.append(f"{self.name}_bucket{format_labels(names, label_values + (format_value(bound),))} {cumulative}")
+            labels = format_labels(self.labels, label_values)
+            lines.append(f"{self.name}_sum{labels} {format_value(values[-1])}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    # In-process counters and latency histograms rendered in the Prometheus
+    # text format. Every worker process keeps its own, so a scrape through a
+    # load balancer sees one worker at a time.
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self._metrics = {}
+        self._lock = threading.Lock()
+    
+    def configure(self, enabled=None):
+        if enabled is not None:
+            self.enabled = enabled
+    
+    def counter(self, name, documentation, labels=()):
+        return self._register(Counter, name, documentation, labels)
+    
+    def histogram(self, name, documentation, labels=(), buckets=DEFAULT_BUCKETS):
+        return self._register(Histogram, name, documentation, labels, buckets=buckets)
+    
+    def get(self, name):
+        return self._metrics.get(name)
+    
+    def reset(self):
+        for metric in list(self._metrics.values()):
+            metric.reset()
+    
+    def render(self):
+        lines = []
+        for name, metric in sorted(self._metrics.items()):
+            lines.append(f"# HELP {name} {metric.documentation}")
+            lines.append(f"# TYPE {name} {metric.type}")
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+    
+    def _register(self, metric_class, name, documentation, labels, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = metric_class(self, name, documentation, labels, **kwargs)
+            return metric
+
+
+metrics = MetricsRegistry()
+
+upstream_duration = metrics.histogram(
+    'upstream_request_duration_seconds',
+    'Upstream HTTP request latency including retries, by provider and endpoint path',
+    ('provider', 'endpoint')
+)
+upstream_requests = metrics.counter(
+    'upstream_requests_total',
+    'Upstream HTTP requests by provider, endpoint path and outcome',
+    ('provider', 'endpoint', 'outcome')
+)
+cache_duration = metrics.histogram(
+    'cache_operation_duration_seconds',
+    'Cache backend reads and writes; writes include encoding the value, reads exclude decoding it',
+    ('backend', 'operation')
+)
+cache_reads = metrics.counter(
+    'cache_reads_total',
+    'Cache backend reads by result (hit includes stale entries)',
+    ('backend', 'result')
+)
+json_duration = metrics.histogram(
+    'json_duration_seconds',
+    'JSON encoding and decoding of cache values (including compression) and of API requests and responses',
+    ('source', 'operation')
+)
+route_duration = metrics.histogram(
+    'http_request_duration_seconds',
+    'Flask request latency by route and method',
+    ('route', 'method')
+)
+route_requests = metrics.counter(
+    'http_requests_total',
+    'Flask requests by route, method and status code',
+    ('route', 'method', 'status')
+)
+
+
+def observe_upstream(provider, endpoint, outcome, seconds=None):
+    # outcome is the status code, error, circuit_open or rate_limited;
+    # rejected calls never reached the network, so they have no duration
+    labels = (provider or 'none', endpoint)
+    if seconds is not None:
+        upstream_duration.observe(seconds, *labels)
+    upstream_requests.inc(*labels, outcome)
+
+
+def instrument_app(app):
+    # Route timings are labelled with the URL rule (/api/teams/<int:league_id>)
+    # rather than the path, so the number of series stays bounded
+    @app.before_request
+    def start_request_timer():
+        g.request_started = time.perf_counter()
+    
+    @app.after_request
+    def record_request_metrics(response):
+        started = g.pop('request_started', None)
+        if started is not None:
+            route = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+            route_duration.observe(time.perf_counter() - started, route, request.method)
+            route_requests.inc(route, request.method, str(response.status_code))
+        return response
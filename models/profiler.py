@@ -0,0 +1,301 @@
+import cProfile
+import heapq
+import io
+import itertools
+import marshal
+import pstats
+import random
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+from flask import g, request
+from flask_login import current_user
+
+SORT_KEYS = ('cumulative', 'tottime', 'ncalls', 'pcalls', 'filename', 'name')
+
+
+def frame_name(frame):
+    code = frame.f_code
+    return f"{frame.f_globals.get('__name__', '?')}:{code.co_name}"
+
+
+def collapse(frame):
+    # Root-first "module:function;module:function" as used by flamegraph.pl
+    names = []
+    while frame is not None:
+        names.append(frame_name(frame))
+        frame = frame.f_back
+    return ';'.join(reversed(names))
+
+
+class StackSampler:
+    # One daemon thread that snapshots the stacks of the threads attached by
+    # profiled requests every `interval` seconds; it sleeps while none are
+    def __init__(self, interval=0.005):
+        self.interval = interval
+        self._targets = {}
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+    
+    def add(self, thread_id, stacks):
+        with self._lock:
+            self._targets[thread_id] = stacks
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='stack-sampler', daemon=True)
+                self._thread.start()
+        self._wakeup.set()
+    
+    def remove(self, thread_id):
+        # Holding the lock guarantees no sample lands after this returns
+        with self._lock:
+            self._targets.pop(thread_id, None)
+    
+    def _run(self):
+        while True:
+            with self._lock:
+                if not self._targets:
+                    self._wakeup.clear()
+                else:
+                    frames = sys._current_frames()
+                    for thread_id, stacks in self._targets.items():
+                        frame = frames.get(thread_id)
+                        if frame is not None:
+                            stacks[collapse(frame)] += 1
+                    del frames
+            if not self._wakeup.is_set():
+                self._wakeup.wait()
+            time.sleep(self.interval)
+
+
+class ProfileSession:
+    # Profiles every thread that works on one request: the request thread and,
+    # for async views, the event loop thread asgiref runs the view on
+    def __init__(self, sampler, reason):
+        self.sampler = sampler
+        self.reason = reason
+        self.profiles = []
+        self.stacks = Counter()
+        self.request_profile = None
+        self.started_at = datetime.utcnow()
+        self.start = time.perf_counter()
+        self._lock = threading.Lock()
+    
+    @contextmanager
+    def thread(self):
+        profile = self.attach()
+        try:
+            yield
+        finally:
+            self.detach(profile)
+    
+    def attach(self):
+        profile = cProfile.Profile()
+        with self._lock:
+            self.profiles.append(profile)
+        self.sampler.add(threading.get_ident(), self.stacks)
+        profile.enable()
+        return profile
+    
+    def detach(self, profile):
+        profile.disable()
+        self.sampler.remove(threading.get_ident())
+
+
+class RequestProfile:
+    def __init__(self, session, method, path, route, status, duration):
+        self.id = uuid.uuid4().hex[:12]
+        self.method = method
+        self.path = path
+        self.route = route
+        self.status = status
+        self.duration = duration
+        self.reason = session.reason
+        self.started_at = session.started_at
+        self.threads = len(session.profiles)
+        self.stacks = session.stacks
+        self._stats = pstats.Stats(*session.profiles, stream=io.StringIO())
+        self._lock = threading.Lock()
+    
+    def summary(self):
+        return {
+            'id': self.id,
+            'method': self.method,
+            'path': self.path,
+            'route': self.route,
+            'status': self.status,
+            'duration_ms': round(self.duration * 1000, 2),
+            'started_at': self.started_at.isoformat(),
+            'reason': self.reason,
+            'threads': self.threads,
+            'stack_samples': sum(self.stacks.values())
+        }
+    
+    def format_stats(self, sort='cumulative', limit=50):
+        # pstats report; sorting mutates the Stats object, hence the lock
+        with self._lock:
+            self._stats.stream = io.StringIO()
+            self._stats.sort_stats(sort).print_stats(limit)
+            return self._stats.stream.getvalue()
+    
+    def collapsed(self):
+        return ''.join(f"{stack} {count}\n" for stack, count in sorted(self.stacks.items()))
+    
+    def dump(self):
+        # Same bytes as Stats.dump_stats(), loadable with pstats or snakeviz
+        with self._lock:
+            return marshal.dumps(self._stats.stats)
+
+
+class RequestProfiler:
+    # Runs a sampled fraction of requests, or admin requests carrying
+    # `header`, under cProfile plus a stack sampler and keeps the
+    # `max_profiles` slowest. Settings and profiles are per worker process.
+    def __init__(self, enabled=False, sample_rate=0.0, header='X-Profile', max_profiles=20,
+                 stack_interval=0.005, exclude_prefixes=('/api/admin/profile', '/static/')):
+        self.enabled = enabled
+        self.sample_rate = sample_rate
+        self.header = header
+        self.max_profiles = max_profiles
+        self.exclude_prefixes = exclude_prefixes
+        self.sampler = StackSampler(stack_interval)
+        self._profiles = []
+        self._sequence = itertools.count()
+        self._lock = threading.Lock()
+        # In-flight sessions; while zero the request hooks skip `g` entirely
+        self.active = 0
+        self.profiled = 0
+        self.discarded = 0
+    
+    def configure(self, enabled=None, sample_rate=None, header=None, max_profiles=None, stack_interval=None):
+        if sample_rate is not None and not 0 <= sample_rate <= 1:
+            raise ValueError('sample_rate must be between 0 and 1')
+        with self._lock:
+            if enabled is not None:
+                self.enabled = enabled
+            if sample_rate is not None:
+                self.sample_rate = sample_rate
+            if header is not None:
+                self.header = header
+            if stack_interval is not None:
+                self.sampler.interval = stack_interval
+            if max_profiles is not None:
+                self.max_profiles = max_profiles
+                while len(self._profiles) > max_profiles:
+                    heapq.heappop(self._profiles)
+    
+    def start(self):
+        # A ProfileSession for the current request, or None
+        if request.path.startswith(self.exclude_prefixes):
+            return None
+        if self.header and request.headers.get(self.header) and current_user.is_authenticated \
+                and current_user.username == 'admin':
+            reason = 'header'
+        elif self.sample_rate and random.random() < self.sample_rate:
+            reason = 'sampled'
+        else:
+            return None
+        
+        session = ProfileSession(self.sampler, reason)
+        with self._lock:
+            self.active += 1
+        session.request_profile = session.attach()
+        return session
+    
+    def finish(self, session, response):
+        duration = time.perf_counter() - session.start
+        session.detach(session.request_profile)
+        route = request.url_rule.rule if request.url_rule is not None else None
+        profile = RequestProfile(session, request.method, request.full_path.rstrip('?'), route,
+                                 response.status_code, duration)
+        
+        with self._lock:
+            self.active -= 1
+            self.profiled += 1
+            entry = (duration, next(self._sequence), profile)
+            if len(self._profiles) < self.max_profiles:
+                heapq.heappush(self._profiles, entry)
+            elif self.max_profiles and duration > self._profiles[0][0]:
+                heapq.heapreplace(self._profiles, entry)
+                self.discarded += 1
+            else:
+                self.discarded += 1
+        return profile
+    
+    def abort(self, session):
+        session.detach(session.request_profile)
+        with self._lock:
+            self.active -= 1
+    
+    def get(self, profile_id):
+        with self._lock:
+            for _, _, profile in self._profiles:
+                if profile.id == profile_id:
+                    return profile
+        return None
+    
+    def profiles(self):
+        # Slowest first
+        with self._lock:
+            entries = sorted(self._profiles, reverse=True)
+        return [profile for _, _, profile in entries]
+    
+    def clear(self):
+        with self._lock:
+            count = len(self._profiles)
+            self._profiles = []
+            return count
+    
+    def stats(self):
+        return {
+            'enabled': self.enabled,
+            'sample_rate': self.sample_rate,
+            'header': self.header,
+            'max_profiles': self.max_profiles,
+            'profiled': self.profiled,
+            'discarded': self.discarded,
+            'profiles': [profile.summary() for profile in self.profiles()]
+        }
+
+
+request_profiler = RequestProfiler()
+
+
+def profile_requests(app, profiler=request_profiler):
+    # While the profiler is disabled and idle the hooks only read attributes
+    @app.before_request
+    def start_profile():
+        if profiler.enabled:
+            session = profiler.start()
+            if session is not None:
+                g.profile_session = session
+    
+    @app.after_request
+    def finish_profile(response):
+        session = g.pop('profile_session', None) if profiler.active else None
+        if session is not None:
+            profiler.finish(session, response)
+        return response
+    
+    @app.teardown_request
+    def abort_profile(error=None):
+        session = g.pop('profile_session', None) if profiler.active else None
+        if session is not None:
+            profiler.abort(session)
+    
+    async_to_sync = app.async_to_sync
+    
+    def profiled_async_to_sync(func):
+        async def view(*args, **kwargs):
+            session = g.get('profile_session') if profiler.active else None
+            if session is None:
+                return await func(*args, **kwargs)
+            with session.thread():
+                return await func(*args, **kwargs)
+        return async_to_sync(view)
+    
+    app.async_to_sync = profiled_async_to_sync
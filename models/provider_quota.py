@@ -0,0 +1,76 @@
+import time
+from datetime import datetime
+from sqlalchemy import case, func, or_, update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from models.cache import db
+
+class ProviderQuota(db.Model):
+    # One token bucket and daily counter per upstream provider, shared by
+    # every thread and worker process. All changes are single UPDATE
+    # statements, so concurrent acquires never over-spend.
+    __tablename__ = 'provider_quota'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    provider = db.Column(db.String(50), unique=True, nullable=False)
+    tokens = db.Column(db.Float, nullable=False)
+    updated_at = db.Column(db.Float, nullable=False)
+    day = db.Column(db.String(10), nullable=False)
+    day_count = db.Column(db.Integer, nullable=False, default=0)
+    
+    @staticmethod
+    def try_acquire(provider, capacity, rate, min_tokens, daily_limit):
+        # Takes one token if, after refilling at `rate` tokens per second,
+        # at least min_tokens are available and fewer than daily_limit
+        # requests were made today
+        now = time.time()
+        today = datetime.utcnow().strftime('%Y-%m-%d')
+        refilled = func.min(capacity, ProviderQuota.tokens + (now - ProviderQuota.updated_at) * rate)
+        
+        statement = update(ProviderQuota).where(
+            ProviderQuota.provider == provider,
+            refilled >= min_tokens,
+            or_(ProviderQuota.day != today, ProviderQuota.day_count < daily_limit)
+        ).values(
+            tokens=refilled - 1,
+            updated_at=now,
+            day_count=case((ProviderQuota.day == today, ProviderQuota.day_count + 1), else_=1),
+            day=today
+        )
+        
+        acquired = db.session.execute(statement).rowcount == 1
+        db.session.commit()
+        return acquired
+    
+    @staticmethod
+    def penalize(provider, seconds, rate):
+        # Upstream rejected us (429): empty the bucket so it takes `seconds`
+        # to get the next token
+        statement = update(ProviderQuota).where(ProviderQuota.provider == provider).values(
+            tokens=func.min(ProviderQuota.tokens, 1 - seconds * rate),
+            updated_at=time.time()
+        )
+        db.session.execute(statement)
+        db.session.commit()
+    
+    @staticmethod
+    def snapshot(provider, capacity, rate):
+        # (tokens available now, requests made today)
+        quota = ProviderQuota.query.filter_by(provider=provider).first()
+        if quota is None:
+            return capacity, 0
+        
+        tokens = min(capacity, quota.tokens + (time.time() - quota.updated_at) * rate)
+        day_count = quota.day_count if quota.day == datetime.utcnow().strftime('%Y-%m-%d') else 0
+        return tokens, day_count
+    
+    @staticmethod
+    def ensure(provider, capacity):
+        statement = sqlite_insert(ProviderQuota).values(
+            provider=provider,
+            tokens=capacity,
+            updated_at=time.time(),
+            day=datetime.utcnow().strftime('%Y-%m-%d'),
+            day_count=0
+        ).on_conflict_do_nothing(index_elements=['provider'])
+        db.session.execute(statement)
+        db.session.commit()
@@ -0,0 +1,133 @@
+import atexit
+import queue
+import threading
+import time
+from datetime import datetime, timedelta
+from models.cache import db, RequestLog, RequestStat
+
+
+class RequestLogWriter:
+    def __init__(self, app, enabled=True, max_queue=10000, batch_size=200, flush_interval=2.0,
+                 minute_retention=timedelta(hours=48), hour_retention=timedelta(days=90), prune_interval=3600):
+        self.app = app
+        self.enabled = enabled
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.queue = queue.Queue(maxsize=max_queue)
+        self.minute_retention = minute_retention
+        self.hour_retention = hour_retention
+        self.prune_interval = prune_interval
+        self._next_prune = 0
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+        self.batches = 0
+        self._thread = None
+        self._stop = threading.Event()
+        self._start_lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._dropped_lock = threading.Lock()
+    
+    def log(self, endpoint, username=None, cache_hit=False, provenance=None):
+        if not self.enabled or self.app.testing:
+            RequestLog.log_request(endpoint, username, cache_hit, provenance)
+            return
+        
+        # Started lazily so pre-forking servers get the thread in each worker
+        if self._thread is None:
+            self.start()
+        
+        record = RequestLog.build_record(endpoint, username, cache_hit, provenance)
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            with self._dropped_lock:
+                self.dropped += 1
+    
+    def start(self):
+        with self._start_lock:
+            if self._thread is not None:
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='request-log-writer', daemon=True)
+            self._thread.start()
+            atexit.register(self.stop)
+    
+    def stop(self, timeout=5):
+        with self._start_lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._stop.set()
+            thread.join(timeout)
+        self.flush()
+    
+    def flush(self):
+        batch = []
+        while True:
+            try:
+                batch.append(self.queue.get_nowait())
+            except queue.Empty:
+                break
+            if len(batch) >= self.batch_size:
+                self._write(batch)
+                batch = []
+        if batch:
+            self._write(batch)
+    
+    def stats(self):
+        return {
+            'queued': self.queue.qsize(),
+            'written': self.written,
+            'batches': self.batches,
+            'dropped': self.dropped,
+            'failed': self.failed
+        }
+    
+    def _run(self):
+        while not self._stop.is_set():
+            batch = self._collect_batch()
+            if batch:
+                self._write(batch)
+            if time.monotonic() >= self._next_prune:
+                self._prune()
+    
+    def _collect_batch(self):
+        # Waits for the first record, then flushes once the batch is full or
+        # flush_interval has passed since that record arrived
+        try:
+            batch = [self.queue.get(timeout=self.flush_interval)]
+        except queue.Empty:
+            return []
+        
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size and not self._stop.is_set():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self.queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+    
+    def _write(self, batch):
+        with self._write_lock, self.app.app_context():
+            try:
+                RequestLog.write_batch(batch)
+                self.written += len(batch)
+                self.batches += 1
+            except Exception as e:
+                print(f"Error writing request logs: {e}")
+                db.session.rollback()
+                self.failed += len(batch)
+    
+    def _prune(self):
+        self._next_prune = time.monotonic() + self.prune_interval
+        with self.app.app_context():
+            try:
+                now = datetime.utcnow()
+                RequestStat.prune('minute', now - self.minute_retention)
+                RequestStat.prune('hour', now - self.hour_retention)
+            except Exception as e:
+                print(f"Error pruning request stats: {e}")
+                db.session.rollback()
@@ -0,0 +1,147 @@
+import queue
+import socket
+import ssl
+from urllib.parse import urlparse, unquote
+
+
+class RESPError(Exception):
+    pass
+
+
+class RESPConnection:
+    def __init__(self, host, port, password=None, db=0, timeout=2.0, username=None, ssl_context=None):
+        self.sock = socket.create_connection((host, port), timeout=timeout)
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        if ssl_context is not None:
+            self.sock = ssl_context.wrap_socket(self.sock, server_hostname=host)
+        self.reader = self.sock.makefile('rb')
+        try:
+            if username:
+                # ACL user (Redis 6+)
+                self.execute('AUTH', username, password or '')
+            elif password:
+                self.execute('AUTH', password)
+            if db:
+                self.execute('SELECT', db)
+        except Exception:
+            self.close()
+            raise
+    
+    def execute(self, *args):
+        self.sock.sendall(self._encode(args))
+        return self._read_reply()
+    
+    def close(self):
+        try:
+            self.reader.close()
+            self.sock.close()
+        except OSError:
+            pass
+    
+    def _encode(self, args):
+        parts = [b'*%d\r\n' % len(args)]
+        for arg in args:
+            if isinstance(arg, bytes):
+                data = arg
+            else:
+                data = str(arg).encode('utf-8')
+            parts.append(b'$%d\r\n%s\r\n' % (len(data), data))
+        return b''.join(parts)
+    
+    def _read_reply(self):
+        line = self.reader.readline()
+        if not line:
+            raise ConnectionError('Connection closed by server')
+        prefix, rest = line[:1], line[1:-2]
+        
+        if prefix == b'+':
+            return rest.decode('utf-8')
+        if prefix == b'-':
+            raise RESPError(rest.decode('utf-8'))
+        if prefix == b':':
+            return int(rest)
+        if prefix == b'$':
+            length = int(rest)
+            if length == -1:
+                return None
+            data = self.reader.read(length + 2)
+            return data[:-2]
+        if prefix == b'*':
+            length = int(rest)
+            if length == -1:
+                return None
+            return [self._read_reply() for _ in range(length)]
+        raise RESPError(f"Unexpected reply: {line!r}")
+
+
+class RESPClient:
+    # Minimal thread-safe client for Redis-protocol servers: a small pool of
+    # connections, each used by one thread at a time. ssl_context enables TLS.
+    def __init__(self, host='localhost', port=6379, password=None, db=0, timeout=2.0, max_connections=10,
+                 username=None, ssl_context=None):
+        self.host = host
+        self.port = port
+        self.password = password
+        self.username = username
+        self.db = db
+        self.timeout = timeout
+        self.ssl_context = ssl_context
+        self._pool = queue.LifoQueue(maxsize=max_connections)
+    
+    @classmethod
+    def from_url(cls, url, **kwargs):
+        # redis://[user:password@]host[:port][/db], or rediss:// for TLS
+        parsed = urlparse(url)
+        if parsed.scheme not in ('redis', 'rediss'):
+            raise ValueError(f"Unsupported Redis URL scheme: {parsed.scheme!r}")
+        db = int(parsed.path.lstrip('/') or 0)
+        password = unquote(parsed.password) if parsed.password else None
+        username = unquote(parsed.username) if parsed.username else None
+        if parsed.scheme == 'rediss':
+            kwargs.setdefault('ssl_context', ssl.create_default_context())
+        return cls(parsed.hostname or 'localhost', parsed.port or 6379, password, db, username=username, **kwargs)
+    
+    def execute(self, *args):
+        connection = self._acquire()
+        try:
+            reply = connection.execute(*args)
+        except RESPError:
+            self._release(connection)
+            raise
+        except (OSError, ConnectionError):
+            # Broken connection: drop it and retry once on a fresh one
+            connection.close()
+            connection = self._connect()
+            try:
+                reply = connection.execute(*args)
+            except RESPError:
+                self._release(connection)
+                raise
+            except Exception:
+                connection.close()
+                raise
+        self._release(connection)
+        return reply
+    
+    def close(self):
+        while True:
+            try:
+                self._pool.get_nowait().close()
+            except queue.Empty:
+                return
+    
+    def _acquire(self):
+        try:
+            return self._pool.get_nowait()
+        except queue.Empty:
+            return self._connect()
+    
+    def _release(self, connection):
+        try:
+            self._pool.put_nowait(connection)
+        except queue.Full:
+            connection.close()
+    
+    def _connect(self):
+        return RESPConnection(self.host, self.port, self.password, self.db, self.timeout, self.username,
+                              self.ssl_context)
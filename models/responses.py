@@ -0,0 +1,143 @@
+import gzip
+import time
+from flask import request
+from flask.json.provider import DefaultJSONProvider
+from models.codecs import json_serializer
+from models.metrics import json_duration
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE_MIMETYPES = ('application/json', 'application/javascript', 'image/svg+xml')
+
+
+class JSONProvider(DefaultJSONProvider):
+    # jsonify() and request.get_json() through json_serializer, timed into
+    # json_duration_seconds. Debug mode and explicit dumps() arguments (e.g.
+    # indent) fall back to the json module.
+    def dumps(self, obj, **kwargs):
+        start = time.perf_counter()
+        if kwargs:
+            text = super().dumps(obj, **kwargs)
+        else:
+            text = json_serializer.dumps(obj, default=self.default, sort_keys=self.sort_keys).decode('utf-8')
+        json_duration.observe(time.perf_counter() - start, 'response', 'encode')
+        return text
+    
+    def loads(self, s, **kwargs):
+        start = time.perf_counter()
+        value = super().loads(s, **kwargs) if kwargs else json_serializer.loads(s)
+        json_duration.observe(time.perf_counter() - start, 'request', 'decode')
+        return value
+    
+    def response(self, *args, **kwargs):
+        # Builds the body as bytes directly, without the str round trip
+        obj = self._prepare_response_obj(args, kwargs)
+        if (self.compact is None and self._app.debug) or self.compact is False:
+            return super().response(obj)
+        start = time.perf_counter()
+        body = json_serializer.dumps(obj, default=self.default, sort_keys=self.sort_keys)
+        json_duration.observe(time.perf_counter() - start, 'response', 'encode')
+        return self._app.response_class(body, mimetype=self.mimetype)
+
+
+class ResponseCompressor:
+    # Content-Encoding negotiation for response bodies of at least `min_size`
+    # bytes: br when the brotli package is installed and the client accepts
+    # it, else gzip
+    def __init__(self, enabled=True, min_size=1024, gzip_level=6, brotli_quality=5):
+        self.enabled = enabled
+        self.min_size = min_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+    
+    def configure(self, enabled=None, min_size=None, gzip_level=None, brotli_quality=None):
+        if enabled is not None:
+            self.enabled = enabled
+        if min_size is not None:
+            self.min_size = min_size
+        if gzip_level is not None:
+            self.gzip_level = gzip_level
+        if brotli_quality is not None:
+            self.brotli_quality = brotli_quality
+    
+    def negotiate(self, accept_encodings, size):
+        # 'br', 'gzip' or None for identity
+        if not self.enabled or size < self.min_size:
+            return None
+        if brotli is not None and accept_encodings.quality('br') > 0:
+            return 'br'
+        if accept_encodings.quality('gzip') > 0:
+            return 'gzip'
+        return None
+    
+    def compress(self, data, encoding):
+        if encoding == 'br':
+            return brotli.compress(data, quality=self.brotli_quality)
+        # mtime=0 keeps the output, and so the stored variants, deterministic
+        return gzip.compress(data, compresslevel=self.gzip_level, mtime=0)
+    
+    def compressible(self, response):
+        return response.mimetype.startswith('text/') or response.mimetype in COMPRESSIBLE_MIMETYPES
+    
+    def compress_response(self, response):
+        # after_request hook; responses that are already encoded (stored
+        # responses, see EncodedResponse) only get the Vary header
+        if not self.enabled or response.status_code not in (200, 304) or response.direct_passthrough \
+                or response.is_streamed or not self.compressible(response):
+            return response
+        response.vary.add('Accept-Encoding')
+        if response.status_code != 200 or 'Content-Encoding' in response.headers:
+            return response
+        
+        data = response.get_data()
+        encoding = self.negotiate(request.accept_encodings, len(data))
+        if encoding is not None:
+            response.set_data(self.compress(data, encoding))
+            response.headers['Content-Encoding'] = encoding
+            # The encoded bytes differ from the identity ones the ETag hashed
+            etag, weak = response.get_etag()
+            if etag is not None and not weak:
+                response.set_etag(etag, weak=True)
+        return response
+
+
+class EncodedResponse:
+    # A serialized API response kept by cache key so memory hits are answered
+    # with the stored bytes, without calling the service or an encoder. Each
+    # compressed variant is built on first use and kept with it.
+    def __init__(self, body, etag, mimetype='application/json'):
+        self.body = body
+        self.etag = etag
+        self.mimetype = mimetype
+        self._variants = {}
+    
+    def variant(self, encoding, compressor):
+        data = self._variants.get(encoding)
+        if data is None:
+            data = self._variants[encoding] = compressor.compress(self.body, encoding)
+        return data
+    
+    def make_response(self, response_class, compressor, accept_encodings, not_modified=False):
+        # A 304 carries the ETag the 200 would have had for these headers
+        encoding = compressor.negotiate(accept_encodings, len(self.body))
+        if not_modified:
+            response = response_class(status=304, mimetype=self.mimetype)
+        elif encoding is not None:
+            response = response_class(self.variant(encoding, compressor), mimetype=self.mimetype)
+            response.headers['Content-Encoding'] = encoding
+        else:
+            response = response_class(self.body, mimetype=self.mimetype)
+        response.set_etag(self.etag, weak=encoding is not None)
+        return response
+
+
+response_compressor = ResponseCompressor()
+
+
+def compress_responses(app, compressor=response_compressor):
+    # Registered after the metrics and profiler hooks so that, with Flask
+    # running after_request hooks in reverse, their timings include it
+    app.after_request(compressor.compress_response)
@@ -0,0 +1,21 @@
+from sqlalchemy import inspect, text
+
+
+def upgrade_schema(db):
+    # create_all() only creates missing tables. Columns and indexes added to
+    # a model after its table was first created are added here; new columns
+    # must therefore be nullable or have a server default.
+    inspector = inspect(db.engine)
+    with db.engine.begin() as connection:
+        for table in db.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            
+            existing = {column['name'] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name not in existing:
+                    column_type = column.type.compile(dialect=db.engine.dialect)
+                    connection.execute(text(f'ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}'))
+            
+            for index in table.indexes:
+                index.create(connection, checkfirst=True)
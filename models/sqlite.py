@@ -0,0 +1,18 @@
+from sqlalchemy import event
+
+
+def configure_sqlite(engine, journal_mode='WAL', busy_timeout_ms=5000, synchronous='NORMAL'):
+    # Applied to every new pooled connection. In WAL mode readers no longer
+    # block on (or block) the single writer, and busy_timeout makes writers
+    # from other threads and workers wait for the lock instead of failing
+    # with "database is locked".
+    if engine.dialect.name != 'sqlite':
+        return
+    
+    @event.listens_for(engine, 'connect')
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute(f'PRAGMA busy_timeout={int(busy_timeout_ms)}')
+        cursor.execute(f'PRAGMA journal_mode={journal_mode}')
+        cursor.execute(f'PRAGMA synchronous={synchronous}')
+        cursor.close()
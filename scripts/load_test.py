@@ -0,0 +1,81 @@
+# Closed-loop HTTP load test against a running instance:
+#
+#     python scripts/load_test.py --url http://localhost:5000 --concurrency 32 --duration 20
+#
+# Logs in once per client thread, then requests the given paths round-robin
+# for the duration and prints throughput, latency percentiles and errors.
+import argparse
+import statistics
+import threading
+import time
+import requests
+
+
+def run_client(args, deadline, latencies, errors, lock):
+    session = requests.Session()
+    try:
+        session.post(f"{args.url}/login", data={'username': args.username, 'password': args.password}, timeout=30)
+    except requests.RequestException as e:
+        print(f"Login failed: {e}")
+        return
+    
+    local_latencies = []
+    local_errors = 0
+    i = 0
+    while time.monotonic() < deadline:
+        path = args.paths[i % len(args.paths)]
+        i += 1
+        start = time.perf_counter()
+        try:
+            response = session.get(f"{args.url}{path}", timeout=30)
+            if response.status_code != 200:
+                local_errors += 1
+        except requests.RequestException:
+            local_errors += 1
+        local_latencies.append(time.perf_counter() - start)
+    
+    with lock:
+        latencies.extend(local_latencies)
+        errors.append(local_errors)
+
+
+def percentile(values, fraction):
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Closed-loop HTTP load test')
+    parser.add_argument('--url', default='http://localhost:5000')
+    parser.add_argument('--concurrency', type=int, default=32)
+    parser.add_argument('--duration', type=float, default=20)
+    parser.add_argument('--username', default='admin')
+    parser.add_argument('--password', default='admin123')
+    parser.add_argument('paths', nargs='*', default=['/api/leagues', '/api/admin/cache/stats'])
+    args = parser.parse_args()
+    
+    latencies, errors, lock = [], [], threading.Lock()
+    deadline = time.monotonic() + args.duration
+    threads = [
+        threading.Thread(target=run_client, args=(args, deadline, latencies, errors, lock))
+        for _ in range(args.concurrency)
+    ]
+    start = time.monotonic()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.monotonic() - start
+    
+    latencies.sort()
+    print(f"requests:    {len(latencies)}")
+    print(f"errors:      {sum(errors)}")
+    print(f"throughput:  {len(latencies) / elapsed:.1f} req/s")
+    if latencies:
+        print(f"latency p50: {percentile(latencies, 0.50) * 1000:.1f} ms")
+        print(f"latency p95: {percentile(latencies, 0.95) * 1000:.1f} ms")
+        print(f"latency p99: {percentile(latencies, 0.99) * 1000:.1f} ms")
+        print(f"latency avg: {statistics.mean(latencies) * 1000:.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
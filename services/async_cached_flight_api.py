@@ -0,0 +1,11 @@
+from services.async_flight_api import AsyncFlightAPIService
+from services.async_cached_service import AsyncCachedServiceMixin
+
+class AsyncCachedFlightAPIService(AsyncCachedServiceMixin, AsyncFlightAPIService):
+    def __init__(self, api_key, api_secret, http_client=None, token_manager=None, base_url=None):
+        super().__init__(api_key, api_secret, http_client, token_manager, base_url)
+        self.cache_enabled = True
+    
+    async def get_flight_price(self, origin, destination, date):
+        cache_key = f"flight_{origin}_{destination}_{date}"
+        return await self._cached_call(cache_key, 'flight', 6, super().get_flight_price, origin, destination, date)
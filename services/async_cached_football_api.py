@@ -0,0 +1,40 @@
+from services.async_football_api import AsyncFootballAPIService
+from services.async_cached_service import AsyncCachedServiceMixin
+from services.cached_football_api import FixtureIndexMixin, TTL_HOURS
+from services.cache_provenance import record_lookup
+
+class AsyncCachedFootballAPIService(FixtureIndexMixin, AsyncCachedServiceMixin, AsyncFootballAPIService):
+    # Same cache keys as CachedFootballAPIService, so both share entries
+    def __init__(self, api_key, http_client=None, base_url=None):
+        super().__init__(api_key, http_client, base_url)
+        self.cache_enabled = True
+    
+    def get_top_leagues(self):
+        record_lookup('leagues', 'static')
+        return super().get_top_leagues()
+    
+    async def get_teams_by_league(self, league_id):
+        cache_key = f"teams_league_{league_id}"
+        return await self._cached_call(cache_key, 'teams', TTL_HOURS['teams'], super().get_teams_by_league, league_id)
+    
+    async def get_league_fixtures(self, league_id, date_from=None, date_to=None):
+        if date_from or date_to:
+            cache_key = f"league_fixtures_{league_id}_{date_from}_{date_to}"
+            return await self._cached_call(cache_key, 'fixtures', self.fixture_window_ttl_hours,
+                                           super().get_league_fixtures, league_id, date_from, date_to)
+        cache_key = f"league_fixtures_{league_id}"
+        return await self._cached_call(cache_key, 'fixtures', TTL_HOURS['fixtures'], super().get_league_fixtures, league_id)
+    
+    async def get_upcoming_matches(self, team_id, match_type='all'):
+        cache_key = f"matches_{team_id}_{match_type}"
+        matches = self._indexed_upcoming_matches(cache_key, team_id, match_type)
+        if matches is not None:
+            return matches
+        return await self._cached_call(cache_key, 'matches', TTL_HOURS['matches'], super().get_upcoming_matches, team_id, match_type)
+    
+    async def get_match_details(self, match_id):
+        cache_key = f"match_details_{match_id}"
+        match = self._indexed_match_details(cache_key, match_id)
+        if match is not None:
+            return match
+        return await self._cached_call(cache_key, 'match_details', TTL_HOURS['match_details'], super().get_match_details, match_id)
@@ -0,0 +1,27 @@
+from services.async_hotel_api import AsyncHotelAPIService
+from services.async_cached_service import AsyncCachedServiceMixin
+from models.hotel_location import HotelLocation
+from services.blocking import run_blocking
+
+class AsyncCachedHotelAPIService(AsyncCachedServiceMixin, AsyncHotelAPIService):
+    # dest_ids: pass CachedHotelAPIService.dest_ids so both services share
+    # one city to dest_id map
+    def __init__(self, api_key, http_client=None, dest_ids=None, base_url=None):
+        super().__init__(api_key, http_client, base_url)
+        self.cache_enabled = True
+        self.dest_ids = dest_ids if dest_ids is not None else {}
+    
+    async def get_hotel_price(self, city, date):
+        cache_key = f"hotel_{city}_{date}"
+        return await self._cached_call(cache_key, 'hotel', 6, super().get_hotel_price, city, date)
+    
+    async def _resolve_dest_id(self, city, headers):
+        dest_id = self.dest_ids.get(city)
+        if dest_id:
+            return dest_id
+        
+        dest_id = await super()._resolve_dest_id(city, headers)
+        if dest_id:
+            await run_blocking(HotelLocation.save, city, str(dest_id))
+            self.dest_ids[city] = str(dest_id)
+        return dest_id
@@ -0,0 +1,49 @@
+import asyncio
+from services.cached_service import CachedServiceMixin
+from services.cache_provenance import record_lookup
+from services.blocking import run_blocking
+
+
+class AsyncCachedServiceMixin(CachedServiceMixin):
+    # CachedServiceMixin for coroutine services. Memory tier hits are
+    # answered on the event loop; cache backend reads and writes (SQLite or
+    # Redis) and the rate limiter's quota check run on worker threads, and
+    # the upstream fetch is awaited.
+    async def _cached_call(self, cache_key, cache_type, ttl_hours, fetch, *args):
+        if not self.cache_enabled:
+            record_lookup(cache_key, 'bypass')
+            return await fetch(*args)
+        
+        value = self.memory_cache.get(cache_key)
+        if value is not None:
+            record_lookup(cache_key, 'hit')
+            return value
+        
+        found, value = await run_blocking(self._lookup, cache_key, cache_type, ttl_hours, fetch, args)
+        if found:
+            return value
+        
+        if not await run_blocking(self._has_capacity):
+            value = await run_blocking(self._degraded_value, cache_key)
+            if value is not None:
+                return value
+            record_lookup(cache_key, 'degraded')
+            return await fetch(*args)
+        
+        record_lookup(cache_key, 'miss')
+        # Concurrent misses for the same key, from any request, share one fetch
+        return await self.single_flight.do_async(cache_key, self._fetch_and_store_async, cache_key, cache_type, ttl_hours, fetch, args)
+    
+    async def _fetch_and_store_async(self, cache_key, cache_type, ttl_hours, fetch, args):
+        value = self.memory_cache.get(cache_key)
+        if value is not None:
+            return value
+        
+        value = await fetch(*args)
+        await run_blocking(self._store, cache_key, cache_type, ttl_hours, value)
+        return value
+    
+    def _schedule_refresh(self, cache_key, cache_type, ttl_hours, fetch, args):
+        # Background refreshes run on refresh_executor threads, which have no
+        # event loop of their own
+        super()._schedule_refresh(cache_key, cache_type, ttl_hours, lambda *args: asyncio.run(fetch(*args)), args)
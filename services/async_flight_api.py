@@ -0,0 +1,40 @@
+from services.flight_api import FlightAPIService
+from services.async_http_client import AsyncHTTPClient
+
+
+class AsyncFlightAPIService(FlightAPIService):
+    # Coroutine version of get_flight_price. OAuth tokens are refreshed
+    # rarely and stay on the blocking client, off the event loop: pass the
+    # sync service's token_manager so both share one token.
+    def __init__(self, api_key, api_secret, http_client=None, token_manager=None, base_url=None):
+        super().__init__(api_key, api_secret, base_url=base_url)
+        self.http = http_client or AsyncHTTPClient()
+        if token_manager is not None:
+            self.token_manager = token_manager
+    
+    async def get_flight_price(self, origin_city, destination_city, match_date):
+        url = f"{self.base_url}/shopping/flight-offers"
+        params, link = self._flight_query(origin_city, destination_city, match_date)
+        
+        try:
+            response = await self._get_with_token(url, params)
+            response.raise_for_status()
+            result = self._parse_offers(response.json(), link)
+            if result:
+                return result
+        except Exception as e:
+            print(f"Error fetching flight prices: {e}")
+        
+        return self._estimated_flight(origin_city, destination_city, link)
+    
+    async def _get_with_token(self, url, params):
+        token = await self.token_manager.get_token_async()
+        response = await self.http.get(url, provider=self.provider, headers={'Authorization': f'Bearer {token}'}, params=params)
+        
+        if response.status_code == 401:
+            # Token revoked or expired early: retry once with a fresh one
+            self.token_manager.invalidate(token)
+            token = await self.token_manager.get_token_async()
+            response = await self.http.get(url, provider=self.provider, headers={'Authorization': f'Bearer {token}'}, params=params)
+        
+        return response
@@ -0,0 +1,57 @@
+from services.football_api import FootballAPIService
+from services.async_http_client import AsyncHTTPClient
+
+
+class AsyncFootballAPIService(FootballAPIService):
+    # Coroutine versions of the upstream lookups; requests and parsing are
+    # shared with FootballAPIService
+    def __init__(self, api_key, http_client=None, base_url=None):
+        super().__init__(api_key, http_client or AsyncHTTPClient(), base_url)
+    
+    async def get_teams_by_league(self, league_id):
+        url = f"{self.base_url}/teams"
+        
+        try:
+            response = await self.http.get(url, provider=self.provider, headers=self.headers, params=self._teams_params(league_id))
+            response.raise_for_status()
+            return self._parse_teams(response.json())
+        except Exception as e:
+            print(f"Error fetching teams: {e}")
+            return []
+    
+    async def get_upcoming_matches(self, team_id, match_type='all'):
+        url = f"{self.base_url}/fixtures"
+        team_id = int(team_id)
+        
+        try:
+            response = await self.http.get(url, provider=self.provider, headers=self.headers, params=self._upcoming_params(team_id))
+            response.raise_for_status()
+            return self._parse_upcoming(response.json(), team_id, match_type)
+        except Exception as e:
+            print(f"Error fetching matches: {e}")
+            return []
+    
+    async def get_league_fixtures(self, league_id, date_from=None, date_to=None):
+        url = f"{self.base_url}/fixtures"
+        params = self._league_fixtures_params(league_id, date_from, date_to)
+        
+        try:
+            response = await self.http.get(url, provider=self.provider, headers=self.headers, params=params)
+            response.raise_for_status()
+            return self._parse_league_fixtures(response.json())
+        except Exception as e:
+            print(f"Error fetching league fixtures: {e}")
+            return None
+    
+    async def get_match_details(self, match_id):
+        url = f"{self.base_url}/fixtures"
+        params = {'id': match_id}
+        
+        try:
+            response = await self.http.get(url, provider=self.provider, headers=self.headers, params=params)
+            response.raise_for_status()
+            return self._parse_match_details(response.json())
+        except Exception as e:
+            print(f"Error fetching match details: {e}")
+        
+        return None
@@ -0,0 +1,37 @@
+from services.hotel_api import HotelAPIService
+from services.async_http_client import AsyncHTTPClient
+
+
+class AsyncHotelAPIService(HotelAPIService):
+    # Coroutine version of get_hotel_price; requests and parsing are shared
+    # with HotelAPIService
+    def __init__(self, api_key, http_client=None, base_url=None):
+        super().__init__(api_key, http_client or AsyncHTTPClient(), base_url)
+    
+    async def get_hotel_price(self, city, match_date, nights=2):
+        checkin, checkout = self._stay_dates(match_date)
+        headers = self._headers()
+        
+        try:
+            dest_id = await self._resolve_dest_id(city, headers)
+            
+            if not dest_id:
+                return self._estimated_hotel(city, nights, checkin, checkout)
+            
+            search_url = f"{self.base_url}/hotels/search"
+            params = self._search_params(dest_id, checkin, checkout)
+            response = await self.http.get(search_url, provider=self.provider, headers=headers, params=params)
+            response.raise_for_status()
+            result = self._parse_search(response.json(), city, checkin, checkout)
+            if result:
+                return result
+        except Exception as e:
+            print(f"Error fetching hotel prices: {e}")
+        
+        return self._estimated_hotel(city, nights, checkin, checkout)
+    
+    async def _resolve_dest_id(self, city, headers):
+        locations_url = f"{self.base_url}/hotels/locations"
+        location_response = await self.http.get(locations_url, provider=self.provider, headers=headers, params=self._location_params(city))
+        location_response.raise_for_status()
+        return self._parse_dest_id(location_response.json())
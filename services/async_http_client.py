@@ -0,0 +1,147 @@
+import asyncio
+import threading
+import time
+from urllib.parse import urlparse
+import httpx
+from models.metrics import observe_upstream
+from services.circuit_breaker import CircuitOpen
+
+
+class AsyncHTTPClient:
+    # Coroutine counterpart of HTTPClient. Flask runs every async view on its
+    # own short-lived event loop, so the httpx client lives on one long-lived
+    # loop thread per process and requests hop onto it; its connection pool
+    # is then shared by all requests instead of rebuilt per view.
+    def __init__(self, max_connections=50, max_keepalive_connections=20, connect_timeout=3.05, read_timeout=10,
+                 max_retries=2, backoff_factor=0.3, transport=None):
+        self.limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_keepalive_connections)
+        self.timeout = httpx.Timeout(read_timeout, connect=connect_timeout)
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.transport = transport
+        # Same optional RateLimiter and CircuitBreakerRegistry as HTTPClient;
+        # share them so both clients count against one budget per provider
+        self.rate_limiter = None
+        self.circuit_breakers = None
+        self._loop = None
+        self._client = None
+        self._lock = threading.Lock()
+    
+    @classmethod
+    def from_config(cls, config):
+        return cls(
+            max_connections=config['ASYNC_HTTP_MAX_CONNECTIONS'],
+            max_keepalive_connections=config['HTTP_POOL_MAXSIZE'],
+            connect_timeout=config['HTTP_CONNECT_TIMEOUT'],
+            read_timeout=config['HTTP_READ_TIMEOUT'],
+            max_retries=config['HTTP_MAX_RETRIES'],
+            backoff_factor=config['HTTP_RETRY_BACKOFF']
+        )
+    
+    async def get(self, url, provider=None, **kwargs):
+        return await self._request('GET', url, provider, kwargs)
+    
+    async def post(self, url, provider=None, **kwargs):
+        return await self._request('POST', url, provider, kwargs)
+    
+    async def _request(self, method, url, provider, kwargs):
+        if kwargs.get('headers'):
+            # requests drops headers set to None (e.g. an unset API key),
+            # httpx rejects them
+            kwargs['headers'] = {name: value for name, value in kwargs['headers'].items() if value is not None}
+        
+        endpoint = urlparse(url).path
+        limiter = self.rate_limiter if provider else None
+        breaker = None
+        if provider and self.circuit_breakers is not None:
+            breaker = self.circuit_breakers.get(f"{provider}:{endpoint}")
+            # Raises CircuitOpen before any quota is spent
+            try:
+                breaker.before_call()
+            except CircuitOpen:
+                observe_upstream(provider, endpoint, 'circuit_open')
+                raise
+        
+        # Read errors and 502/503/504 responses to GETs are retried here, with
+        # a rate limiter token per attempt; _send() only retries failed connects
+        attempt = 0
+        response = None
+        while True:
+            if limiter is not None:
+                try:
+                    await limiter.acquire_async(provider)
+                except Exception:
+                    observe_upstream(provider, endpoint, 'rate_limited')
+                    if response is not None:
+                        # No token for a retry: answer with the last response
+                        break
+                    if breaker is not None:
+                        breaker.cancel()
+                    raise
+            
+            start = time.perf_counter()
+            try:
+                future = asyncio.run_coroutine_threadsafe(self._send(method, url, kwargs), self._ensure_loop())
+                response = await asyncio.wrap_future(future)
+            except Exception as e:
+                observe_upstream(provider, endpoint, 'error', time.perf_counter() - start)
+                if method != 'GET' or attempt >= self.max_retries \
+                        or not isinstance(e, (httpx.ReadError, httpx.ReadTimeout, httpx.RemoteProtocolError)):
+                    if breaker is not None:
+                        breaker.record_failure()
+                    raise
+                response = None
+            else:
+                observe_upstream(provider, endpoint, str(response.status_code), time.perf_counter() - start)
+                if method != 'GET' or response.status_code not in (502, 503, 504) or attempt >= self.max_retries:
+                    break
+            
+            if attempt:
+                await asyncio.sleep(self.backoff_factor * (2 ** attempt))
+            attempt += 1
+        
+        if limiter is not None and response.status_code == 429:
+            limiter.throttled(provider, response.headers.get('Retry-After'))
+        if breaker is not None:
+            if response.status_code >= 500 or response.status_code == 429:
+                breaker.record_failure()
+            else:
+                breaker.record_success()
+        return response
+    
+    async def _send(self, method, url, kwargs):
+        # Runs on the client's loop. Failed connects are retried for every
+        # method since nothing reached the provider, as in HTTPClient.
+        attempt = 0
+        while True:
+            try:
+                return await self._client.request(method, url, **kwargs)
+            except (httpx.ConnectError, httpx.ConnectTimeout):
+                if attempt >= self.max_retries:
+                    raise
+            
+            if attempt:
+                await asyncio.sleep(self.backoff_factor * (2 ** attempt))
+            attempt += 1
+    
+    def _ensure_loop(self):
+        # Started lazily so it is created in each worker process after fork
+        if self._loop is not None:
+            return self._loop
+        
+        with self._lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                self._client = httpx.AsyncClient(limits=self.limits, timeout=self.timeout, transport=self.transport)
+                threading.Thread(target=loop.run_forever, name='async-http', daemon=True).start()
+                self._loop = loop
+        return self._loop
+    
+    def close(self):
+        with self._lock:
+            loop, self._loop = self._loop, None
+        if loop is None:
+            return
+        
+        asyncio.run_coroutine_threadsafe(self._client.aclose(), loop).result(timeout=5)
+        loop.call_soon_threadsafe(loop.stop)
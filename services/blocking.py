@@ -0,0 +1,19 @@
+import asyncio
+from flask import current_app, has_app_context
+
+
+async def run_blocking(func, *args):
+    # Runs a blocking call (SQLite statements, a synchronous HTTP request) on
+    # the event loop's default executor so the coroutines of the same view
+    # keep running. The thread gets its own app context, and so its own
+    # database session: the view's session is not safe to share across
+    # threads. Context variables (priority, cache provenance) are copied.
+    app = current_app._get_current_object() if has_app_context() else None
+    
+    def call():
+        if app is None:
+            return func(*args)
+        with app.app_context():
+            return func(*args)
+    
+    return await asyncio.to_thread(call)
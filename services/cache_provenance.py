@@ -0,0 +1,57 @@
+import contextvars
+import threading
+from contextlib import contextmanager
+
+HIT_STATUSES = ('hit', 'stale', 'static', 'index', 'revalidated')
+
+_current = contextvars.ContextVar('cache_provenance', default=None)
+
+
+class CacheProvenance:
+    def __init__(self):
+        self.lookups = []
+        self._lock = threading.Lock()
+    
+    def record(self, cache_key, status):
+        with self._lock:
+            self.lookups.append((cache_key, status))
+    
+    @property
+    def hits(self):
+        return sum(1 for _, status in self.lookups if status in HIT_STATUSES)
+    
+    @property
+    def cache_hit(self):
+        return bool(self.lookups) and self.hits == len(self.lookups)
+    
+    @property
+    def summary(self):
+        statuses = [status for _, status in self.lookups]
+        if any(status not in HIT_STATUSES for status in statuses):
+            return 'MISS'
+        if 'stale' in statuses:
+            return 'STALE'
+        return 'HIT' if statuses else 'NONE'
+    
+    @property
+    def detail(self):
+        return ','.join(f"{cache_key}:{status}" for cache_key, status in self.lookups)
+    
+    def statuses(self):
+        return dict(self.lookups)
+
+
+@contextmanager
+def track_cache_provenance():
+    provenance = CacheProvenance()
+    token = _current.set(provenance)
+    try:
+        yield provenance
+    finally:
+        _current.reset(token)
+
+
+def record_lookup(cache_key, status):
+    provenance = _current.get()
+    if provenance is not None:
+        provenance.record(cache_key, status)
@@ -0,0 +1,129 @@
+import threading
+import time
+from services.executor import LookupExecutor
+from services.cache_provenance import track_cache_provenance
+from services.rate_limiter import background_priority
+
+
+class CacheWarmer:
+    # Prefetches what a cold cache would otherwise charge the first users
+    # for: teams per league, upcoming matches per team, match details and
+    # flight/hotel quotes for popular origin cities. Lookups run on a pool of
+    # max_workers threads. Each provider has a budget of upstream lookups
+    # (cache misses); once spent, its remaining lookups are skipped.
+    MATCH_TYPES = ('all', 'home', 'away')
+    
+    def __init__(self, app, football_service, flight_service, hotel_service, origin_cities,
+                 max_workers=4, budgets=None, progress=None):
+        self.app = app
+        self.football_service = football_service
+        self.flight_service = flight_service
+        self.hotel_service = hotel_service
+        self.origin_cities = list(origin_cities)
+        self.max_workers = max_workers
+        self.budgets = budgets or {}
+        self.progress = progress
+        
+        self._lock = threading.Lock()
+        self.spent = {}
+        self.filled = 0
+        self.hits = 0
+        self.skipped = 0
+        self.failed = 0
+    
+    def run(self):
+        start = time.perf_counter()
+        backend = self.football_service.cache_backend
+        with self.app.app_context():
+            entries_before = backend.count()
+        
+        executor = LookupExecutor(self.app, max_workers=self.max_workers)
+        try:
+            teams_by_league = self._phase(executor, 'teams', [
+                ('football', self.football_service.get_teams_by_league, league_id)
+                for league_id in self.football_service.top_leagues
+            ])
+            team_ids = sorted({team['id'] for teams in teams_by_league if teams for team in teams})
+            
+            match_lists = self._phase(executor, 'matches', [
+                ('football', self.football_service.get_upcoming_matches, team_id, match_type)
+                for team_id in team_ids
+                for match_type in self.MATCH_TYPES
+            ])
+            match_ids = sorted({match['id'] for matches in match_lists if matches for match in matches})
+            
+            details = self._phase(executor, 'match details', [
+                ('football', self.football_service.get_match_details, match_id)
+                for match_id in match_ids
+            ])
+            # Soonest matches first, so a limited budget goes to the most
+            # likely searches
+            destinations = sorted({(match['date'], match['city']) for match in details if match})
+            
+            self._phase(executor, 'quotes', [
+                ('flight', self.flight_service.get_flight_price, origin_city, city, date)
+                for date, city in destinations
+                for origin_city in self.origin_cities
+                if origin_city != city
+            ] + [
+                ('hotel', self.hotel_service.get_hotel_price, city, date)
+                for date, city in destinations
+            ])
+        finally:
+            executor.shutdown()
+        
+        with self.app.app_context():
+            entries_after = backend.count()
+        
+        return {
+            'filled': self.filled,
+            'hits': self.hits,
+            'skipped': self.skipped,
+            'failed': self.failed,
+            'upstream_lookups': dict(self.spent),
+            'cache_entries_before': entries_before,
+            'cache_entries_after': entries_after,
+            'duration_seconds': round(time.perf_counter() - start, 2)
+        }
+    
+    def _phase(self, executor, name, tasks):
+        futures = [executor.submit(self._lookup, *task) for task in tasks]
+        results = []
+        for done, future in enumerate(futures, 1):
+            results.append(future.result())
+            if self.progress:
+                self.progress(name, done, len(futures))
+        return results
+    
+    def _lookup(self, provider, fn, *args):
+        if not self._reserve(provider):
+            return None
+        
+        with track_cache_provenance() as provenance, background_priority():
+            try:
+                result = fn(*args)
+            except Exception as e:
+                print(f"Error warming cache: {e}")
+                result = None
+        
+        misses = sum(1 for _, status in provenance.lookups if status == 'miss')
+        with self._lock:
+            # One lookup was reserved up front; settle to the actual misses
+            self.spent[provider] += misses - 1
+            self.hits += len(provenance.lookups) - misses
+            # Estimated quotes mean upstream failed; they are not cached
+            if result is None or (isinstance(result, dict) and result.get('estimated')):
+                self.failed += 1
+            elif result:
+                self.filled += misses
+        return result
+    
+    def _reserve(self, provider):
+        with self._lock:
+            spent = self.spent.setdefault(provider, 0)
+            budget = self.budgets.get(provider)
+            if budget is not None and spent >= budget:
+                self.skipped += 1
+                return False
+            self.spent[provider] = spent + 1
+            return True
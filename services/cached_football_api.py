@@ -1,53 +1,92 @@
-import json
 from services.football_api import FootballAPIService
-from models.cache import APICache
+from services.cached_service import CachedServiceMixin
+from services.cache_provenance import record_lookup
 
-class CachedFootballAPIService(FootballAPIService):
-    def __init__(self, api_key):
-        super().__init__(api_key)
+# Cache lifetimes per cache type, also used for the Cache-Control max-age of
+# the read endpoints; leagues are static and revalidated daily
+TTL_HOURS = {'leagues': 24, 'teams': 168, 'fixtures': 24, 'matches': 24, 'match_details': 24}
+
+
+class FixtureIndexMixin:
+    # Optional FixtureStore answering upcoming matches and match details from
+    # league-wide fixture lists; teams or matches it does not know fall back
+    # to the per-team/per-match cached calls. Windowed league fetches (the
+    # store's incremental refreshes) are cached for fixture_window_ttl_hours
+    # so workers sharing a cache backend refetch each window once.
+    fixture_store = None
+    fixture_window_ttl_hours = 6
+    
+    def _indexed_upcoming_matches(self, cache_key, team_id, match_type):
+        if self.fixture_store is None:
+            return None
+        date_from, date_to = self.upcoming_window()
+        fixtures = self.fixture_store.team_fixtures(team_id, match_type, date_from, date_to, self.match_status)
+        if fixtures is None:
+            return None
+        
+        record_lookup(cache_key, 'index')
+        team_id = int(team_id)
+        return [{
+            'id': fixture['id'],
+            'date': fixture['date'],
+            'home_team': fixture['home_team'],
+            'away_team': fixture['away_team'],
+            'venue': fixture['venue'],
+            'city': fixture['city'],
+            'is_home': fixture['home_team_id'] == team_id
+        } for fixture in fixtures]
+    
+    def _indexed_match_details(self, cache_key, match_id):
+        if self.fixture_store is None:
+            return None
+        fixture = self.fixture_store.get_fixture(match_id)
+        if fixture is None:
+            return None
+        
+        record_lookup(cache_key, 'index')
+        return {
+            'id': fixture['id'],
+            'date': fixture['date'],
+            'home_team': fixture['home_team'],
+            'away_team': fixture['away_team'],
+            'venue': fixture['venue'],
+            'city': fixture['city'],
+            'league': fixture['league']
+        }
+
+
+class CachedFootballAPIService(FixtureIndexMixin, CachedServiceMixin, FootballAPIService):
+    def __init__(self, api_key, http_client=None, base_url=None):
+        super().__init__(api_key, http_client, base_url)
         self.cache_enabled = True
     
+    def get_top_leagues(self):
+        # Served from in-process data, never from upstream
+        record_lookup('leagues', 'static')
+        return super().get_top_leagues()
+    
     def get_teams_by_league(self, league_id):
         cache_key = f"teams_league_{league_id}"
-        
-        if self.cache_enabled:
-            cached = APICache.get_cached(cache_key)
-            if cached:
-                return json.loads(cached)
-        
-        teams = super().get_teams_by_league(league_id)
-        
-        if self.cache_enabled and teams:
-            APICache.set_cache(cache_key, 'teams', json.dumps(teams), ttl_hours=168)
-        
-        return teams
+        return self._cached_call(cache_key, 'teams', TTL_HOURS['teams'], super().get_teams_by_league, league_id)
+    
+    def get_league_fixtures(self, league_id, date_from=None, date_to=None):
+        if date_from or date_to:
+            cache_key = f"league_fixtures_{league_id}_{date_from}_{date_to}"
+            return self._cached_call(cache_key, 'fixtures', self.fixture_window_ttl_hours,
+                                     super().get_league_fixtures, league_id, date_from, date_to)
+        cache_key = f"league_fixtures_{league_id}"
+        return self._cached_call(cache_key, 'fixtures', TTL_HOURS['fixtures'], super().get_league_fixtures, league_id)
     
     def get_upcoming_matches(self, team_id, match_type='all'):
         cache_key = f"matches_{team_id}_{match_type}"
-        
-        if self.cache_enabled:
-            cached = APICache.get_cached(cache_key)
-            if cached:
-                return json.loads(cached)
-        
-        matches = super().get_upcoming_matches(team_id, match_type)
-        
-        if self.cache_enabled and matches:
-            APICache.set_cache(cache_key, 'matches', json.dumps(matches), ttl_hours=24)
-        
-        return matches
+        matches = self._indexed_upcoming_matches(cache_key, team_id, match_type)
+        if matches is not None:
+            return matches
+        return self._cached_call(cache_key, 'matches', TTL_HOURS['matches'], super().get_upcoming_matches, team_id, match_type)
     
     def get_match_details(self, match_id):
         cache_key = f"match_details_{match_id}"
-        
-        if self.cache_enabled:
-            cached = APICache.get_cached(cache_key)
-            if cached:
-                return json.loads(cached)
-        
-        match_details = super().get_match_details(match_id)
-        
-        if self.cache_enabled and match_details:
-            APICache.set_cache(cache_key, 'match_details', json.dumps(match_details), ttl_hours=24)
-        
-        return match_details
\ No newline at end of file
+        match = self._indexed_match_details(cache_key, match_id)
+        if match is not None:
+            return match
+        return self._cached_call(cache_key, 'match_details', TTL_HOURS['match_details'], super().get_match_details, match_id)
@@ -1,23 +1,35 @@
-import json
+import threading
 from services.hotel_api import HotelAPIService
-from models.cache import APICache
+from services.cached_service import CachedServiceMixin
+from models.hotel_location import HotelLocation
 
-class CachedHotelAPIService(HotelAPIService):
-    def __init__(self, api_key):
-        super().__init__(api_key)
+class CachedHotelAPIService(CachedServiceMixin, HotelAPIService):
+    def __init__(self, api_key, http_client=None, base_url=None):
+        super().__init__(api_key, http_client, base_url)
         self.cache_enabled = True
+        self.dest_ids = {}
+        self._dest_ids_lock = threading.Lock()
+    
+    def load_dest_ids(self):
+        dest_ids = HotelLocation.get_all()
+        with self._dest_ids_lock:
+            self.dest_ids.update(dest_ids)
+        return len(dest_ids)
     
     def get_hotel_price(self, city, date):
         cache_key = f"hotel_{city}_{date}"
+        return self._cached_call(cache_key, 'hotel', 6, super().get_hotel_price, city, date)
+    
+    def _resolve_dest_id(self, city, headers):
+        # City to dest_id mappings are effectively static, so they are kept
+        # for good in the hotel_location table instead of the API cache
+        dest_id = self.dest_ids.get(city)
+        if dest_id:
+            return dest_id
         
-        if self.cache_enabled:
-            cached = APICache.get_cached(cache_key)
-            if cached:
-                return json.loads(cached)
-        
-        hotel_data = super().get_hotel_price(city, date)
-        
-        if self.cache_enabled and hotel_data:
-            APICache.set_cache(cache_key, 'hotel', json.dumps(hotel_data), ttl_hours=6)
-        
-        return hotel_data
\ No newline at end of file
+        dest_id = super()._resolve_dest_id(city, headers)
+        if dest_id:
+            HotelLocation.save(city, str(dest_id))
+            with self._dest_ids_lock:
+                self.dest_ids[city] = str(dest_id)
+        return dest_id
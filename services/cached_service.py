@@ -0,0 +1,142 @@
+import threading
+from datetime import datetime
+from models.cache_backends import SQLiteCacheBackend
+from models.memory_cache import memory_cache
+from services.single_flight import single_flight
+from services.cache_provenance import record_lookup
+from services.rate_limiter import background_priority
+
+_refreshing = set()
+_refreshing_lock = threading.Lock()
+
+
+class CachedServiceMixin:
+    cache_enabled = True
+    cache_backend = SQLiteCacheBackend()
+    memory_cache = memory_cache
+    single_flight = single_flight
+    # Stale-while-revalidate: hours an expired entry may still be served, per
+    # cache_type. Only active when a refresh_executor is configured.
+    stale_grace_hours = {}
+    refresh_executor = None
+    # When the provider's rate limit or daily quota is exhausted, cached
+    # values up to this long past expiry are served instead of calling
+    # upstream; the sweeper and Redis TTLs must keep entries as long
+    # (CACHE_DEGRADED_GRACE_HOURS)
+    degraded_grace_hours = 24 * 7
+    
+    def _cached_call(self, cache_key, cache_type, ttl_hours, fetch, *args):
+        if not self.cache_enabled:
+            record_lookup(cache_key, 'bypass')
+            return fetch(*args)
+        
+        found, value = self._lookup(cache_key, cache_type, ttl_hours, fetch, args)
+        if found:
+            return value
+        
+        if not self._has_capacity():
+            return self._degraded(cache_key, fetch, args)
+        
+        record_lookup(cache_key, 'miss')
+        # Concurrent misses for the same key wait for a single upstream fetch
+        return self.single_flight.do(cache_key, self._fetch_and_store, cache_key, cache_type, ttl_hours, fetch, args)
+    
+    def _lookup(self, cache_key, cache_type, ttl_hours, fetch, args):
+        # (found, value) from the memory tier or the cache backend; stale
+        # entries are returned marked and refreshed in the background
+        
+        # Values in the memory tier are already decoded and shared between
+        # callers, so they must be treated as read-only
+        value = self.memory_cache.get(cache_key)
+        if value is not None:
+            record_lookup(cache_key, 'hit')
+            return True, value
+        
+        entry = self.cache_backend.get_entry(cache_key, self._stale_grace_hours(cache_type))
+        if not entry:
+            return False, None
+        
+        value = entry.get_value()
+        if entry.is_stale():
+            record_lookup(cache_key, 'stale')
+            self._schedule_refresh(cache_key, cache_type, ttl_hours, fetch, args)
+            return True, self._mark_stale(value)
+        
+        record_lookup(cache_key, 'hit')
+        ttl_seconds = (entry.expires_at - datetime.utcnow()).total_seconds()
+        self.memory_cache.set(cache_key, value, ttl_seconds)
+        return True, value
+    
+    def _has_capacity(self):
+        limiter = self.http.rate_limiter
+        return limiter is None or limiter.has_capacity(self.provider)
+    
+    def _fetch_and_store(self, cache_key, cache_type, ttl_hours, fetch, args):
+        # A previous leader may have stored the value after our cache check
+        value = self.memory_cache.get(cache_key)
+        if value is not None:
+            return value
+        
+        value = fetch(*args)
+        self._store(cache_key, cache_type, ttl_hours, value)
+        return value
+    
+    def _store(self, cache_key, cache_type, ttl_hours, value):
+        # Estimates (upstream failed or its circuit is open) are returned but
+        # not cached, so real prices are fetched again once upstream recovers
+        if value and not self._is_estimate(value):
+            self.cache_backend.set_value(cache_key, cache_type, value, ttl_hours=ttl_hours)
+            self.memory_cache.set(cache_key, value, ttl_hours * 3600)
+    
+    def _degraded(self, cache_key, fetch, args):
+        value = self._degraded_value(cache_key)
+        if value is not None:
+            return value
+        
+        # No cached value: the service's own fallback (an estimate or an empty
+        # result, since the limiter refuses the request) is returned uncached
+        record_lookup(cache_key, 'degraded')
+        return fetch(*args)
+    
+    def _degraded_value(self, cache_key):
+        entry = self.cache_backend.get_entry(cache_key, self.degraded_grace_hours)
+        if not entry:
+            return None
+        record_lookup(cache_key, 'stale')
+        return self._mark_stale(entry.get_value())
+    
+    def _stale_grace_hours(self, cache_type):
+        if self.refresh_executor is None:
+            return 0
+        return self.stale_grace_hours.get(cache_type, 0)
+    
+    def _schedule_refresh(self, cache_key, cache_type, ttl_hours, fetch, args):
+        with _refreshing_lock:
+            if cache_key in _refreshing:
+                return
+            _refreshing.add(cache_key)
+        
+        try:
+            self.refresh_executor.submit(self._refresh, cache_key, cache_type, ttl_hours, fetch, args)
+        except Exception as e:
+            print(f"Error scheduling cache refresh: {e}")
+            with _refreshing_lock:
+                _refreshing.discard(cache_key)
+    
+    def _refresh(self, cache_key, cache_type, ttl_hours, fetch, args):
+        try:
+            with background_priority():
+                self.single_flight.do(cache_key, self._fetch_and_store, cache_key, cache_type, ttl_hours, fetch, args)
+        except Exception as e:
+            print(f"Error refreshing cache entry {cache_key}: {e}")
+        finally:
+            with _refreshing_lock:
+                _refreshing.discard(cache_key)
+    
+    def _is_estimate(self, value):
+        return isinstance(value, dict) and value.get('estimated', False)
+    
+    def _mark_stale(self, value):
+        if isinstance(value, dict):
+            return dict(value, stale=True)
+        return value
@@ -0,0 +1,111 @@
+import threading
+import time
+
+
+class CircuitOpen(Exception):
+    pass
+
+
+class CircuitBreaker:
+    # closed: calls pass, consecutive failures are counted. After
+    # failure_threshold of them the circuit opens and calls fail at once for
+    # reset_timeout seconds, then one trial call is let through (half-open):
+    # success closes the circuit, failure opens it again.
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+    
+    def __init__(self, name, failure_threshold=5, reset_timeout=30):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+        
+        self.calls = 0
+        self.successes = 0
+        self.failures = 0
+        self.rejected = 0
+        self.opened = 0
+    
+    @property
+    def state(self):
+        with self._lock:
+            return self._current_state()
+    
+    def before_call(self):
+        with self._lock:
+            state = self._current_state()
+            if state == self.OPEN or (state == self.HALF_OPEN and self._trial_in_flight):
+                self.rejected += 1
+                raise CircuitOpen(f"Circuit {self.name} is open")
+            if state == self.HALF_OPEN:
+                self._trial_in_flight = True
+            self.calls += 1
+    
+    def cancel(self):
+        # The call was not made after all (e.g. refused by the rate limiter)
+        with self._lock:
+            self._trial_in_flight = False
+            self.calls -= 1
+    
+    def record_success(self):
+        with self._lock:
+            self.successes += 1
+            self._failures = 0
+            self._trial_in_flight = False
+            self._state = self.CLOSED
+    
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._failures += 1
+            if self._trial_in_flight or self._failures >= self.failure_threshold:
+                if self._state != self.OPEN:
+                    self.opened += 1
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+            self._trial_in_flight = False
+    
+    def stats(self):
+        with self._lock:
+            state = self._current_state()
+            return {
+                'state': state,
+                'consecutive_failures': self._failures,
+                'retry_in_seconds': round(max(0, self._opened_at + self.reset_timeout - time.monotonic()), 1) if state == self.OPEN else 0,
+                'calls': self.calls,
+                'successes': self.successes,
+                'failures': self.failures,
+                'rejected': self.rejected,
+                'opened': self.opened
+            }
+    
+    def _current_state(self):
+        if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+            self._state = self.HALF_OPEN
+        return self._state
+
+
+class CircuitBreakerRegistry:
+    # One breaker per upstream endpoint ("provider:/path"), created on first use
+    def __init__(self, failure_threshold=5, reset_timeout=30):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._breakers = {}
+        self._lock = threading.Lock()
+    
+    def get(self, name):
+        breaker = self._breakers.get(name)
+        if breaker is None:
+            with self._lock:
+                breaker = self._breakers.setdefault(
+                    name, CircuitBreaker(name, self.failure_threshold, self.reset_timeout)
+                )
+        return breaker
+    
+    def stats(self):
+        return {name: breaker.stats() for name, breaker in sorted(self._breakers.items())}
@@ -0,0 +1,31 @@
+import contextvars
+from concurrent.futures import Future, ThreadPoolExecutor
+
+
+class LookupExecutor:
+    def __init__(self, app, max_workers=8, parallel=True):
+        self.app = app
+        self.parallel = parallel
+        self.pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='lookup') if parallel else None
+    
+    def submit(self, fn, *args, **kwargs):
+        if self.pool is not None:
+            # Copy context variables (e.g. cache provenance tracking) into the worker
+            context = contextvars.copy_context()
+            return self.pool.submit(context.run, self._run, fn, args, kwargs)
+        
+        future = Future()
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+    
+    def _run(self, fn, args, kwargs):
+        # Worker threads need their own app context for db.session access
+        with self.app.app_context():
+            return fn(*args, **kwargs)
+    
+    def shutdown(self, wait=True):
+        if self.pool is not None:
+            self.pool.shutdown(wait=wait)
@@ -0,0 +1,211 @@
+import bisect
+import math
+import threading
+import time
+from services.rate_limiter import background_priority
+
+
+def fit_to_quota(league_ids, full_refresh_hours, refresh_minutes, daily_calls):
+    # (league_ids, refresh_minutes) whose upstream calls per day, one full
+    # load per league every full_refresh_hours plus one window refetch per
+    # league every refresh_minutes, stay within daily_calls. Leagues are
+    # dropped from the end when even their full loads do not fit.
+    full_per_day = 24 / full_refresh_hours
+    league_ids = list(league_ids)[:int(daily_calls // full_per_day)]
+    if not league_ids:
+        return [], refresh_minutes
+    
+    windows_per_day = daily_calls / len(league_ids) - full_per_day
+    if windows_per_day < 1:
+        # Window refetches would never be due before the next full load
+        return league_ids, max(refresh_minutes, full_refresh_hours * 60)
+    return league_ids, max(refresh_minutes, math.ceil(24 * 60 / int(windows_per_day)))
+
+
+class FixtureStore:
+    # In-memory index over whole-league fixture lists, so upcoming matches
+    # and match details cost one upstream call per league instead of one per
+    # team, match type and match. Each league is fully reloaded every
+    # full_refresh_hours; in between, only the fixtures returned by
+    # refresh_window() (a date range) are refetched every refresh_minutes
+    # and merged in. Loads run on a background thread at background
+    # priority, never in a request; until a league is loaded its teams and
+    # matches are not in the index and callers fall back.
+    def __init__(self, fetch, league_ids, refresh_window, full_refresh_hours=24, refresh_minutes=360, app=None,
+                 poll_seconds=60):
+        self.fetch = fetch
+        self.league_ids = list(league_ids)
+        self.refresh_window = refresh_window
+        self.full_refresh_seconds = full_refresh_hours * 3600
+        self.refresh_seconds = refresh_minutes * 60
+        self.app = app
+        self.poll_seconds = poll_seconds
+        
+        self._leagues = {}
+        self._loaded_at = {}
+        self._refreshed_at = {}
+        # (fixtures by id, {team_id: {'home': [...], 'away': [...]}}) where
+        # the per-side lists hold (day, date, fixture_id) sorted by date.
+        # Replaced as a whole on every refresh so readers never lock.
+        self._index = ({}, {})
+        self._lock = threading.Lock()
+        self._league_locks = {league_id: threading.Lock() for league_id in self.league_ids}
+        
+        self.full_loads = 0
+        self.incremental_loads = 0
+        self.failures = 0
+        self._thread = None
+        self._stop = threading.Event()
+        self._start_lock = threading.Lock()
+    
+    def ensure_started(self):
+        # Started from the first request so pre-forking servers get the
+        # thread in each worker
+        if self._thread is None and self.app is not None and not self.app.testing:
+            self.start()
+    
+    def start(self):
+        with self._start_lock:
+            if self._thread is not None:
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='fixture-store', daemon=True)
+            self._thread.start()
+    
+    def stop(self, timeout=5):
+        with self._start_lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._stop.set()
+            thread.join(timeout)
+    
+    def ensure_loaded(self):
+        # Loads or refreshes the leagues that are due; called by the
+        # background thread
+        with background_priority():
+            for league_id in self.league_ids:
+                self._ensure_league(league_id)
+    
+    def get_fixture(self, fixture_id):
+        try:
+            return self._index[0].get(int(fixture_id))
+        except (TypeError, ValueError):
+            return None
+    
+    def team_fixtures(self, team_id, match_type='all', date_from=None, date_to=None, status=None):
+        # None when the team is not in any loaded league, so callers can fall
+        # back to a per-team lookup
+        fixtures, by_team = self._index
+        sides = by_team.get(int(team_id))
+        if sides is None:
+            return None
+        
+        matches = []
+        for side in ((match_type,) if match_type in ('home', 'away') else ('home', 'away')):
+            entries = sides[side]
+            start = bisect.bisect_left(entries, (date_from,)) if date_from else 0
+            end = bisect.bisect_right(entries, (date_to, '\uffff')) if date_to else len(entries)
+            for _, _, fixture_id in entries[start:end]:
+                fixture = fixtures[fixture_id]
+                if status is None or fixture['status'] == status:
+                    matches.append(fixture)
+        
+        matches.sort(key=lambda fixture: (fixture['date'], fixture['id']))
+        return matches
+    
+    def stats(self):
+        fixtures, by_team = self._index
+        return {
+            'running': self._thread is not None,
+            'leagues': self.league_ids,
+            'refresh_minutes': self.refresh_seconds / 60,
+            'leagues_loaded': len(self._loaded_at),
+            'fixtures': len(fixtures),
+            'teams': len(by_team),
+            'full_loads': self.full_loads,
+            'incremental_loads': self.incremental_loads,
+            'failures': self.failures
+        }
+    
+    def _run(self):
+        while True:
+            try:
+                if self.app is not None:
+                    with self.app.app_context():
+                        self.ensure_loaded()
+                else:
+                    self.ensure_loaded()
+            except Exception as e:
+                print(f"Error refreshing fixture store: {e}")
+            if self._stop.wait(self.poll_seconds):
+                return
+    
+    def _ensure_league(self, league_id):
+        now = time.monotonic()
+        lock = self._league_locks[league_id]
+        
+        if league_id in self._loaded_at:
+            if now - self._loaded_at[league_id] >= self.full_refresh_seconds:
+                full = True
+            elif now - self._refreshed_at[league_id] >= self.refresh_seconds:
+                full = False
+            else:
+                return
+            # The league can already answer queries: refresh it unless another
+            # thread is doing so, but never wait
+            if not lock.acquire(blocking=False):
+                return
+        else:
+            # Back off after a failed first load instead of retrying per request
+            if now - self._refreshed_at.get(league_id, -self.refresh_seconds) < self.refresh_seconds:
+                return
+            full = True
+            lock.acquire()
+            if league_id in self._loaded_at:
+                lock.release()
+                return
+        
+        try:
+            self._refresh(league_id, full)
+        finally:
+            lock.release()
+    
+    def _refresh(self, league_id, full):
+        if full:
+            fixtures = self.fetch(league_id)
+        else:
+            fixtures = self.fetch(league_id, *self.refresh_window())
+        
+        with self._lock:
+            now = time.monotonic()
+            self._refreshed_at[league_id] = now
+            if fixtures is None:
+                self.failures += 1
+                return
+            
+            if full:
+                self._leagues[league_id] = {fixture['id']: fixture for fixture in fixtures}
+                self._loaded_at[league_id] = now
+                self.full_loads += 1
+            else:
+                league = dict(self._leagues[league_id])
+                league.update((fixture['id'], fixture) for fixture in fixtures)
+                self._leagues[league_id] = league
+                self.incremental_loads += 1
+            
+            self._index = self._build_index()
+    
+    def _build_index(self):
+        fixtures = {}
+        by_team = {}
+        for league in self._leagues.values():
+            for fixture in league.values():
+                fixtures[fixture['id']] = fixture
+                entry = (fixture['date'][:10], fixture['date'], fixture['id'])
+                by_team.setdefault(fixture['home_team_id'], {'home': [], 'away': []})['home'].append(entry)
+                by_team.setdefault(fixture['away_team_id'], {'home': [], 'away': []})['away'].append(entry)
+        
+        for sides in by_team.values():
+            sides['home'].sort()
+            sides['away'].sort()
+        return fixtures, by_team
@@ -1,12 +1,24 @@
-import requests
+from services.http_client import HTTPClient
+from services.token_manager import OAuthTokenManager
 from datetime import datetime, timedelta
 
 class FlightAPIService:
-    def __init__(self, api_key, api_secret):
+    provider = 'flight'
+    
+    def __init__(self, api_key, api_secret, http_client=None, base_url=None):
         self.api_key = api_key
         self.api_secret = api_secret
-        self.base_url = "https://test.api.amadeus.com/v2"
-        self.token = None
+        self.http = http_client or HTTPClient()
+        # base_url is the Amadeus host; flight offers are under /v2, OAuth under /v1
+        host = base_url or "https://test.api.amadeus.com"
+        self.base_url = f"{host}/v2"
+        self.token_manager = OAuthTokenManager(
+            self.http,
+            f"{host}/v1/security/oauth2/token",
+            api_key,
+            api_secret,
+            provider=self.provider
+        )
         
         self.city_airports = {
             'London': 'LON',
@@ -23,24 +35,28 @@ class FlightAPIService:
         }
     
     def get_access_token(self):
-        url = "https://test.api.amadeus.com/v1/security/oauth2/token"
-        data = {
-            'grant_type': 'client_credentials',
-            'client_id': self.api_key,
-            'client_secret': self.api_secret
-        }
-        
         try:
-            response = requests.post(url, data=data)
-            response.raise_for_status()
-            self.token = response.json()['access_token']
+            return self.token_manager.get_token()
         except Exception as e:
             print(f"Error getting access token: {e}")
+            return None
     
     def get_flight_price(self, origin_city, destination_city, match_date):
-        if not self.token:
-            self.get_access_token()
+        url = f"{self.base_url}/shopping/flight-offers"
+        params, link = self._flight_query(origin_city, destination_city, match_date)
         
+        try:
+            response = self._get_with_token(url, params)
+            response.raise_for_status()
+            result = self._parse_offers(response.json(), link)
+            if result:
+                return result
+        except Exception as e:
+            print(f"Error fetching flight prices: {e}")
+        
+        return self._estimated_flight(origin_city, destination_city, link)
+    
+    def _flight_query(self, origin_city, destination_city, match_date):
         origin_code = self.city_airports.get(origin_city, 'LON')
         destination_code = self.city_airports.get(destination_city, 'MAD')
 
@@ -50,8 +66,6 @@ class FlightAPIService:
         departure_date = (future_match_datetime - timedelta(days=1)).strftime('%Y-%m-%d')
         return_date = (future_match_datetime + timedelta(days=1)).strftime('%Y-%m-%d')
         
-        url = f"{self.base_url}/shopping/flight-offers"
-        headers = {'Authorization': f'Bearer {self.token}'}
         params = {
             'originLocationCode': origin_code,
             'destinationLocationCode': destination_code,
@@ -60,24 +74,32 @@ class FlightAPIService:
             'adults': 1,
             'currencyCode': 'EUR'
         }
-        
-        try:
-            response = requests.get(url, headers=headers, params=params)
-            response.raise_for_status()
-            data = response.json()
-            
-            if data.get('data'):
-                prices = [float(offer['price']['total']) for offer in data['data']]
-                price = min(prices) if prices else 200
-                link = f"https://www.google.com/travel/flights?q=Flights%20from%20{origin_code}%20to%20{destination_code}%20on%20{departure_date}%20through%20{return_date}"
-                return {'price': price, 'link': link}
-        except Exception as e:
-            print(f"Error fetching flight prices: {e}")
-        
-        price = self._estimate_flight_price(origin_city, destination_city)
         link = f"https://www.google.com/travel/flights?q=Flights%20from%20{origin_code}%20to%20{destination_code}%20on%20{departure_date}%20through%20{return_date}"
+        return params, link
+    
+    def _parse_offers(self, data, link):
+        if not data.get('data'):
+            return None
+        prices = [float(offer['price']['total']) for offer in data['data']]
+        price = min(prices) if prices else 200
         return {'price': price, 'link': link}
     
+    def _estimated_flight(self, origin_city, destination_city, link):
+        price = self._estimate_flight_price(origin_city, destination_city)
+        return {'price': price, 'link': link, 'estimated': True}
+    
+    def _get_with_token(self, url, params):
+        token = self.token_manager.get_token()
+        response = self.http.get(url, provider=self.provider, headers={'Authorization': f'Bearer {token}'}, params=params)
+        
+        if response.status_code == 401:
+            # Token revoked or expired early: retry once with a fresh one
+            self.token_manager.invalidate(token)
+            token = self.token_manager.get_token()
+            response = self.http.get(url, provider=self.provider, headers={'Authorization': f'Bearer {token}'}, params=params)
+        
+        return response
+    
     def _estimate_flight_price(self, origin, destination):
         base_prices = {
             'short': 100,
@@ -1,13 +1,17 @@
-import requests
+from services.http_client import HTTPClient
 from datetime import datetime, timedelta
 
 class FootballAPIService:
-    def __init__(self, api_key):
+    provider = 'football'
+    
+    def __init__(self, api_key, http_client=None, base_url=None):
         self.api_key = api_key
-        self.base_url = "https://v3.football.api-sports.io"
+        self.http = http_client or HTTPClient()
+        self.base_url = base_url or "https://v3.football.api-sports.io"
         self.headers = {
             'x-apisports-key': api_key
         }
+        self.match_status = 'FT'
         
         self.top_leagues = {
             39: {'name': 'Premier League', 'country': 'England'},
@@ -22,97 +26,148 @@ class FootballAPIService:
     
     def get_teams_by_league(self, league_id):
         url = f"{self.base_url}/teams"
-        params = {
-            'league': league_id,
-            'season': 2023
-        }
         
         try:
-            response = requests.get(url, headers=self.headers, params=params)
+            response = self.http.get(url, provider=self.provider, headers=self.headers, params=self._teams_params(league_id))
             response.raise_for_status()
-            data = response.json()
-            
-            teams = []
-            for team in data.get('response', []):
-                teams.append({
-                    'id': team['team']['id'],
-                    'name': team['team']['name'],
-                    'logo': team['team']['logo'],
-                    'city': team['venue']['city']
-                })
-            return teams
+            return self._parse_teams(response.json())
         except Exception as e:
             print(f"Error fetching teams: {e}")
             return []
     
+    def _teams_params(self, league_id):
+        return {
+            'league': league_id,
+            'season': 2023
+        }
+    
+    def _parse_teams(self, data):
+        teams = []
+        for team in data.get('response', []):
+            teams.append({
+                'id': team['team']['id'],
+                'name': team['team']['name'],
+                'logo': team['team']['logo'],
+                'city': team['venue']['city']
+            })
+        return teams
+    
     def get_upcoming_matches(self, team_id, match_type='all'):
         url = f"{self.base_url}/fixtures"
-        
         team_id = int(team_id)
-        today = datetime.now()
-        today_2023 = today.replace(year=2023).strftime('%Y-%m-%d')
-        future_2023 = (today.replace(year=2023) + timedelta(days=90)).strftime('%Y-%m-%d')
         
-        params = {
+        try:
+            response = self.http.get(url, provider=self.provider, headers=self.headers, params=self._upcoming_params(team_id))
+            response.raise_for_status()
+            return self._parse_upcoming(response.json(), team_id, match_type)
+        except Exception as e:
+            print(f"Error fetching matches: {e}")
+            return []
+    
+    def _upcoming_params(self, team_id):
+        today_2023, future_2023 = self.upcoming_window()
+        return {
             'team': team_id,
             'season': 2023,
             'from': today_2023,
             'to': future_2023,
-            'status': 'FT'
+            'status': self.match_status
         }
+    
+    def _parse_upcoming(self, data, team_id, match_type):
+        # print(f"API Response: {data}")
+        
+        matches = []
+        for fixture in data.get('response', []):
+            is_home = fixture['teams']['home']['id'] == team_id
+            
+            if match_type == 'home' and not is_home:
+                continue
+            if match_type == 'away' and is_home:
+                continue
+            
+            matches.append({
+                'id': fixture['fixture']['id'],
+                'date': fixture['fixture']['date'],
+                'home_team': fixture['teams']['home']['name'],
+                'away_team': fixture['teams']['away']['name'],
+                'venue': fixture['fixture']['venue']['name'],
+                'city': fixture['fixture']['venue']['city'],
+                'is_home': is_home
+            })
+        return matches
+    
+    def upcoming_window(self):
+        today = datetime.now()
+        today_2023 = today.replace(year=2023).strftime('%Y-%m-%d')
+        future_2023 = (today.replace(year=2023) + timedelta(days=90)).strftime('%Y-%m-%d')
+        return today_2023, future_2023
+    
+    def get_league_fixtures(self, league_id, date_from=None, date_to=None):
+        # Every fixture of a league's season in one call (optionally limited
+        # to a date range). Returns None on failure so callers can tell an
+        # error from an empty league.
+        url = f"{self.base_url}/fixtures"
+        params = self._league_fixtures_params(league_id, date_from, date_to)
         
         try:
-            response = requests.get(url, headers=self.headers, params=params)
+            response = self.http.get(url, provider=self.provider, headers=self.headers, params=params)
             response.raise_for_status()
-            data = response.json()
-
-            # print(f"API Response: {data}")
-
-            matches = []
-            for fixture in data.get('response', []):
-                is_home = fixture['teams']['home']['id'] == team_id
-                
-                if match_type == 'home' and not is_home:
-                    continue
-                if match_type == 'away' and is_home:
-                    continue
-                
-                matches.append({
-                    'id': fixture['fixture']['id'],
-                    'date': fixture['fixture']['date'],
-                    'home_team': fixture['teams']['home']['name'],
-                    'away_team': fixture['teams']['away']['name'],
-                    'venue': fixture['fixture']['venue']['name'],
-                    'city': fixture['fixture']['venue']['city'],
-                    'is_home': is_home
-                })
-            
-            return matches
+            return self._parse_league_fixtures(response.json())
         except Exception as e:
-            print(f"Error fetching matches: {e}")
-            return []
+            print(f"Error fetching league fixtures: {e}")
+            return None
+    
+    def _league_fixtures_params(self, league_id, date_from, date_to):
+        params = {
+            'league': league_id,
+            'season': 2023
+        }
+        if date_from and date_to:
+            params['from'] = date_from
+            params['to'] = date_to
+        return params
+    
+    def _parse_league_fixtures(self, data):
+        fixtures = []
+        for fixture in data.get('response', []):
+            fixtures.append({
+                'id': fixture['fixture']['id'],
+                'date': fixture['fixture']['date'],
+                'status': fixture['fixture']['status']['short'],
+                'home_team_id': fixture['teams']['home']['id'],
+                'home_team': fixture['teams']['home']['name'],
+                'away_team_id': fixture['teams']['away']['id'],
+                'away_team': fixture['teams']['away']['name'],
+                'venue': fixture['fixture']['venue']['name'],
+                'city': fixture['fixture']['venue']['city'],
+                'league': fixture['league']['name']
+            })
+        return fixtures
     
     def get_match_details(self, match_id):
         url = f"{self.base_url}/fixtures"
         params = {'id': match_id}
         
         try:
-            response = requests.get(url, headers=self.headers, params=params)
+            response = self.http.get(url, provider=self.provider, headers=self.headers, params=params)
             response.raise_for_status()
-            data = response.json()
-            
-            if data.get('response'):
-                fixture = data['response'][0]
-                return {
-                    'id': fixture['fixture']['id'],
-                    'date': fixture['fixture']['date'],
-                    'home_team': fixture['teams']['home']['name'],
-                    'away_team': fixture['teams']['away']['name'],
-                    'venue': fixture['fixture']['venue']['name'],
-                    'city': fixture['fixture']['venue']['city'],
-                    'league': fixture['league']['name']
-                }
+            return self._parse_match_details(response.json())
         except Exception as e:
             print(f"Error fetching match details: {e}")
         
-        return None
\ No newline at end of file
+        return None
+    
+    def _parse_match_details(self, data):
+        if not data.get('response'):
+            return None
+        fixture = data['response'][0]
+        return {
+            'id': fixture['fixture']['id'],
+            'date': fixture['fixture']['date'],
+            'home_team': fixture['teams']['home']['name'],
+            'away_team': fixture['teams']['away']['name'],
+            'venue': fixture['fixture']['venue']['name'],
+            'city': fixture['fixture']['venue']['city'],
+            'league': fixture['league']['name']
+        }
\ No newline at end of file
@@ -1,73 +1,96 @@
-import requests
+from services.http_client import HTTPClient
 from datetime import datetime, timedelta
 
 class HotelAPIService:
-    def __init__(self, api_key):
+    provider = 'hotel'
+    
+    def __init__(self, api_key, http_client=None, base_url=None):
         self.api_key = api_key
-        self.base_url = "https://booking-com.p.rapidapi.com/v1"
+        self.http = http_client or HTTPClient()
+        self.base_url = base_url or "https://booking-com.p.rapidapi.com/v1"
     
     def get_hotel_price(self, city, match_date, nights=2):
-        match_datetime = datetime.fromisoformat(match_date.replace('Z', '+00:00'))
-        current_year = datetime.now().year
-        future_match_datetime = match_datetime.replace(year=current_year)
-        checkin = (future_match_datetime - timedelta(days=1)).strftime('%Y-%m-%d')
-        checkout = (future_match_datetime + timedelta(days=1)).strftime('%Y-%m-%d')
-        
-        headers = {
-            "X-RapidAPI-Key": self.api_key,
-            "X-RapidAPI-Host": "booking-com.p.rapidapi.com"
-        }
+        checkin, checkout = self._stay_dates(match_date)
+        headers = self._headers()
         
         try:
-            locations_url = f"{self.base_url}/hotels/locations"
-            location_params = {
-                "name": city,
-                "locale": "en-gb"
-            }
-            
-            location_response = requests.get(locations_url, headers=headers, params=location_params)
-            location_response.raise_for_status()
-            location_data = location_response.json()
+            dest_id = self._resolve_dest_id(city, headers)
             
-            if not location_data:
-                price = self._estimate_hotel_price(city, nights)
-                link = f"https://www.booking.com/searchresults.html?ss={city}&checkin={checkin}&checkout={checkout}"
-                return {'price': price, 'link': link}
-            
-            dest_id = location_data[0].get('dest_id')
+            if not dest_id:
+                return self._estimated_hotel(city, nights, checkin, checkout)
             
             search_url = f"{self.base_url}/hotels/search"
-            params = {
-                "checkout_date": checkout,
-                "units": "metric",
-                "dest_id": dest_id,
-                "dest_type": "city",
-                "locale": "en-gb",
-                "adults_number": "1",
-                "order_by": "popularity",
-                "filter_by_currency": "EUR",
-                "checkin_date": checkin,
-                "room_number": "1",
-                "page_number": "0"
-            }
-            
-            response = requests.get(search_url, headers=headers, params=params)
+            params = self._search_params(dest_id, checkin, checkout)
+            response = self.http.get(search_url, provider=self.provider, headers=headers, params=params)
             response.raise_for_status()
-            data = response.json()
-            
-            if data.get('result'):
-                prices = [hotel.get('min_total_price', 0) for hotel in data['result'][:5]]
-                prices = [p for p in prices if p > 0]
-                if prices:
-                    price = min(prices)
-                    link = f"https://www.booking.com/searchresults.html?ss={city}&checkin={checkin}&checkout={checkout}"
-                    return {'price': price, 'link': link}
+            result = self._parse_search(response.json(), city, checkin, checkout)
+            if result:
+                return result
         except Exception as e:
             print(f"Error fetching hotel prices: {e}")
         
+        return self._estimated_hotel(city, nights, checkin, checkout)
+    
+    def _stay_dates(self, match_date):
+        match_datetime = datetime.fromisoformat(match_date.replace('Z', '+00:00'))
+        current_year = datetime.now().year
+        future_match_datetime = match_datetime.replace(year=current_year)
+        checkin = (future_match_datetime - timedelta(days=1)).strftime('%Y-%m-%d')
+        checkout = (future_match_datetime + timedelta(days=1)).strftime('%Y-%m-%d')
+        return checkin, checkout
+    
+    def _headers(self):
+        return {
+            "X-RapidAPI-Key": self.api_key,
+            "X-RapidAPI-Host": "booking-com.p.rapidapi.com"
+        }
+    
+    def _search_params(self, dest_id, checkin, checkout):
+        return {
+            "checkout_date": checkout,
+            "units": "metric",
+            "dest_id": dest_id,
+            "dest_type": "city",
+            "locale": "en-gb",
+            "adults_number": "1",
+            "order_by": "popularity",
+            "filter_by_currency": "EUR",
+            "checkin_date": checkin,
+            "room_number": "1",
+            "page_number": "0"
+        }
+    
+    def _parse_search(self, data, city, checkin, checkout):
+        if not data.get('result'):
+            return None
+        prices = [hotel.get('min_total_price', 0) for hotel in data['result'][:5]]
+        prices = [p for p in prices if p > 0]
+        if not prices:
+            return None
+        link = f"https://www.booking.com/searchresults.html?ss={city}&checkin={checkin}&checkout={checkout}"
+        return {'price': min(prices), 'link': link}
+    
+    def _estimated_hotel(self, city, nights, checkin, checkout):
         price = self._estimate_hotel_price(city, nights)
         link = f"https://www.booking.com/searchresults.html?ss={city}&checkin={checkin}&checkout={checkout}"
-        return {'price': price, 'link': link}
+        return {'price': price, 'link': link, 'estimated': True}
+    
+    def _resolve_dest_id(self, city, headers):
+        locations_url = f"{self.base_url}/hotels/locations"
+        location_response = self.http.get(locations_url, provider=self.provider, headers=headers, params=self._location_params(city))
+        location_response.raise_for_status()
+        return self._parse_dest_id(location_response.json())
+    
+    def _location_params(self, city):
+        return {
+            "name": city,
+            "locale": "en-gb"
+        }
+    
+    def _parse_dest_id(self, location_data):
+        if not location_data:
+            return None
+        return location_data[0].get('dest_id')
     
     def _estimate_hotel_price(self, city, nights=2):
         city_prices = {
@@ -0,0 +1,139 @@
+import threading
+import time
+from urllib.parse import urlparse
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import ProtocolError
+from urllib3.util.retry import Retry
+from models.metrics import observe_upstream
+from services.circuit_breaker import CircuitOpen
+
+
+class HTTPClient:
+    def __init__(self, pool_connections=10, pool_maxsize=20, connect_timeout=3.05, read_timeout=10,
+                 max_retries=2, backoff_factor=0.3):
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        
+        # urllib3 only retries failed connects, for every method since nothing
+        # reached the provider. Read errors and 502/503/504 responses to GETs
+        # are retried by _request(), which takes a rate limiter token for each
+        # attempt so provider quotas count every upstream request.
+        retry = Retry(
+            total=max_retries,
+            read=False,
+            backoff_factor=backoff_factor,
+            raise_on_status=False
+        )
+        self.adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize, max_retries=retry)
+        # Optional RateLimiter and CircuitBreakerRegistry applied to requests
+        # made with provider=...
+        self.rate_limiter = None
+        self.circuit_breakers = None
+        self._local = threading.local()
+        self._sessions = []
+        self._sessions_lock = threading.Lock()
+    
+    @classmethod
+    def from_config(cls, config):
+        return cls(
+            pool_connections=config['HTTP_POOL_CONNECTIONS'],
+            pool_maxsize=config['HTTP_POOL_MAXSIZE'],
+            connect_timeout=config['HTTP_CONNECT_TIMEOUT'],
+            read_timeout=config['HTTP_READ_TIMEOUT'],
+            max_retries=config['HTTP_MAX_RETRIES'],
+            backoff_factor=config['HTTP_RETRY_BACKOFF']
+        )
+    
+    @property
+    def session(self):
+        # Sessions (cookies, default headers) are per thread; the adapter and
+        # its urllib3 connection pools are shared by all of them
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = requests.Session()
+            session.mount('https://', self.adapter)
+            session.mount('http://', self.adapter)
+            self._local.session = session
+            with self._sessions_lock:
+                self._sessions.append(session)
+        return session
+    
+    def get(self, url, provider=None, **kwargs):
+        return self._request('get', url, provider, kwargs)
+    
+    def post(self, url, provider=None, **kwargs):
+        return self._request('post', url, provider, kwargs)
+    
+    def _request(self, method, url, provider, kwargs):
+        kwargs.setdefault('timeout', self.timeout)
+        endpoint = urlparse(url).path
+        limiter = self.rate_limiter if provider else None
+        breaker = None
+        if provider and self.circuit_breakers is not None:
+            breaker = self.circuit_breakers.get(f"{provider}:{endpoint}")
+            # Raises CircuitOpen before any quota is spent
+            try:
+                breaker.before_call()
+            except CircuitOpen:
+                observe_upstream(provider, endpoint, 'circuit_open')
+                raise
+        
+        attempt = 0
+        response = None
+        while True:
+            if limiter is not None:
+                try:
+                    limiter.acquire(provider)
+                except Exception:
+                    observe_upstream(provider, endpoint, 'rate_limited')
+                    if response is not None:
+                        # No token for a retry: answer with the last response
+                        break
+                    if breaker is not None:
+                        breaker.cancel()
+                    raise
+            
+            start = time.perf_counter()
+            try:
+                response = getattr(self.session, method)(url, **kwargs)
+            except Exception as e:
+                observe_upstream(provider, endpoint, 'error', time.perf_counter() - start)
+                if method != 'get' or attempt >= self.max_retries or not self._is_read_error(e):
+                    if breaker is not None:
+                        breaker.record_failure()
+                    raise
+                response = None
+            else:
+                observe_upstream(provider, endpoint, str(response.status_code), time.perf_counter() - start)
+                if method != 'get' or response.status_code not in (502, 503, 504) or attempt >= self.max_retries:
+                    break
+                response.close()
+            
+            if attempt:
+                time.sleep(self.backoff_factor * (2 ** attempt))
+            attempt += 1
+        
+        if limiter is not None and response.status_code == 429:
+            limiter.throttled(provider, response.headers.get('Retry-After'))
+        if breaker is not None:
+            if response.status_code >= 500 or response.status_code == 429:
+                breaker.record_failure()
+            else:
+                breaker.record_success()
+        return response
+    
+    def _is_read_error(self, error):
+        # Failed connects were already retried by urllib3
+        if isinstance(error, (requests.exceptions.ReadTimeout, requests.exceptions.ChunkedEncodingError)):
+            return True
+        return isinstance(error, requests.exceptions.ConnectionError) and bool(error.args) \
+            and isinstance(error.args[0], ProtocolError)
+    
+    def close(self):
+        with self._sessions_lock:
+            sessions, self._sessions = self._sessions, []
+        for session in sessions:
+            session.close()
+        self.adapter.close()
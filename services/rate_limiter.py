@@ -0,0 +1,142 @@
+import asyncio
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+from models.provider_quota import ProviderQuota
+from services.blocking import run_blocking
+
+_priority = contextvars.ContextVar('request_priority', default='interactive')
+
+
+class RateLimited(Exception):
+    pass
+
+
+@contextmanager
+def background_priority():
+    # Prefetch and background refresh work: may not use the share of each
+    # bucket and daily quota reserved for interactive requests, so users
+    # are served first
+    token = _priority.set('background')
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+class RateLimiter:
+    # Per-provider token bucket (per_minute requests, refilled continuously)
+    # and daily quota, stored in the ProviderQuota table so all threads and
+    # worker processes share them. limits: {provider: (per_minute, per_day)}
+    # with per_day None for no daily quota; providers without limits are not
+    # throttled.
+    def __init__(self, limits, background_reserve=0.2, max_wait=2.0):
+        self.limits = limits
+        self.background_reserve = background_reserve
+        self.max_wait = max_wait
+        self._ensured = set()
+        self._lock = threading.Lock()
+        self._counters = {
+            provider: {'acquired': 0, 'waited': 0, 'rejected': 0, 'throttled': 0}
+            for provider in limits
+        }
+    
+    def acquire(self, provider):
+        # Waits up to max_wait for a token, raises RateLimited when the daily
+        # quota is spent or no token would arrive in time
+        for wait in self._waits(provider):
+            time.sleep(wait)
+    
+    async def acquire_async(self, provider):
+        # acquire() for coroutines: the quota statements run on a worker
+        # thread and waits do not block the event loop
+        waits = self._waits(provider)
+        while True:
+            wait = await run_blocking(next, waits, None)
+            if wait is None:
+                return
+            await asyncio.sleep(wait)
+    
+    def _waits(self, provider):
+        # Yields how long to sleep before each retry; returns once a token
+        # has been taken
+        if provider not in self.limits:
+            return
+        
+        capacity, rate, min_tokens, daily_limit = self._params(provider)
+        self._ensure(provider, capacity)
+        deadline = time.monotonic() + self.max_wait
+        waited = False
+        while True:
+            if ProviderQuota.try_acquire(provider, capacity, rate, min_tokens, daily_limit):
+                self._count(provider, 'waited' if waited else 'acquired')
+                return
+            
+            tokens, day_count = ProviderQuota.snapshot(provider, capacity, rate)
+            if day_count >= daily_limit:
+                self._count(provider, 'rejected')
+                raise RateLimited(f"{provider} daily quota exhausted")
+            
+            wait = max((min_tokens - tokens) / rate, 0.01)
+            if time.monotonic() + wait > deadline:
+                self._count(provider, 'rejected')
+                raise RateLimited(f"{provider} rate limit reached")
+            waited = True
+            yield wait
+    
+    def has_capacity(self, provider):
+        # Whether acquire() would currently succeed within max_wait
+        if provider not in self.limits:
+            return True
+        
+        capacity, rate, min_tokens, daily_limit = self._params(provider)
+        tokens, day_count = ProviderQuota.snapshot(provider, capacity, rate)
+        return day_count < daily_limit and (min_tokens - tokens) / rate <= self.max_wait
+    
+    def throttled(self, provider, retry_after=None):
+        # The provider answered 429: stop sending until Retry-After has passed
+        if provider not in self.limits:
+            return
+        
+        try:
+            seconds = float(retry_after)
+        except (TypeError, ValueError):
+            seconds = 60
+        capacity, rate, _, _ = self._params(provider)
+        self._ensure(provider, capacity)
+        ProviderQuota.penalize(provider, seconds, rate)
+        self._count(provider, 'throttled')
+    
+    def stats(self):
+        stats = {}
+        for provider, (per_minute, per_day) in self.limits.items():
+            tokens, day_count = ProviderQuota.snapshot(provider, per_minute, per_minute / 60)
+            with self._lock:
+                stats[provider] = dict(self._counters[provider])
+            stats[provider].update({
+                'per_minute': per_minute,
+                'per_day': per_day,
+                'tokens': round(tokens, 2),
+                'used_today': day_count
+            })
+        return stats
+    
+    def _params(self, provider):
+        # (bucket capacity, tokens per second, tokens required, daily limit)
+        # for the priority of the current context
+        per_minute, per_day = self.limits[provider]
+        reserve = self.background_reserve if _priority.get() == 'background' else 0
+        daily_limit = float('inf') if per_day is None else per_day * (1 - reserve)
+        return per_minute, per_minute / 60, 1 + per_minute * reserve, daily_limit
+    
+    def _ensure(self, provider, capacity):
+        if provider in self._ensured:
+            return
+        ProviderQuota.ensure(provider, capacity)
+        with self._lock:
+            self._ensured.add(provider)
+    
+    def _count(self, provider, counter):
+        with self._lock:
+            self._counters[provider][counter] += 1
@@ -0,0 +1,71 @@
+import asyncio
+import threading
+from concurrent.futures import Future
+
+
+class SingleFlight:
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+        self.executions = 0
+        self.coalesced = 0
+    
+    def do(self, key, fn, *args):
+        call, leader = self._join(key)
+        if not leader:
+            return call.result()
+        
+        try:
+            result = fn(*args)
+        except BaseException as e:
+            self._finish(key, call, error=e)
+            raise
+        self._finish(key, call, result)
+        return result
+    
+    async def do_async(self, key, fn, *args):
+        # do() for coroutine functions: followers wait without blocking their
+        # event loop, and callers on different loops or threads (sync and
+        # async alike) share one call per key
+        call, leader = self._join(key)
+        if not leader:
+            return await asyncio.wrap_future(call)
+        
+        try:
+            result = await fn(*args)
+        except BaseException as e:
+            self._finish(key, call, error=e)
+            raise
+        self._finish(key, call, result)
+        return result
+    
+    def _join(self, key):
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                self.coalesced += 1
+                return call, False
+            
+            call = Future()
+            self._calls[key] = call
+            self.executions += 1
+            return call, True
+    
+    def _finish(self, key, call, result=None, error=None):
+        with self._lock:
+            del self._calls[key]
+        if error is not None:
+            call.set_exception(error)
+        else:
+            call.set_result(result)
+    
+    def stats(self):
+        with self._lock:
+            return {
+                'in_flight': len(self._calls),
+                'executions': self.executions,
+                'coalesced': self.coalesced
+            }
+
+
+single_flight = SingleFlight()
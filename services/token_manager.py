@@ -0,0 +1,74 @@
+import threading
+import time
+from services.blocking import run_blocking
+
+
+class OAuthTokenManager:
+    def __init__(self, http, token_url, client_id, client_secret, refresh_margin_seconds=60, provider=None):
+        self.http = http
+        self.provider = provider
+        self.token_url = token_url
+        self.client_id = client_id
+        self.client_secret = client_secret
+        self.refresh_margin_seconds = refresh_margin_seconds
+        self.refreshes = 0
+        self._token = None
+        self._expires_at = 0
+        self._lock = threading.Lock()
+    
+    def get_token(self):
+        now = time.monotonic()
+        token, expires_at = self._token, self._expires_at
+        
+        if token and now < expires_at - self.refresh_margin_seconds:
+            return token
+        
+        if token and now < expires_at:
+            # Inside the refresh margin the current token is still valid: one
+            # caller refreshes it while everyone else keeps using it
+            if not self._lock.acquire(blocking=False):
+                return token
+            try:
+                if self._token == token:
+                    self._refresh()
+                return self._token
+            except Exception as e:
+                print(f"Error refreshing access token: {e}")
+                return token
+            finally:
+                self._lock.release()
+        
+        with self._lock:
+            if self._token and time.monotonic() < self._expires_at - self.refresh_margin_seconds:
+                return self._token
+            self._refresh()
+            return self._token
+    
+    async def get_token_async(self):
+        # get_token() for coroutines: a valid token is returned directly, a
+        # refresh (a blocking POST) runs on a worker thread
+        token, expires_at = self._token, self._expires_at
+        if token and time.monotonic() < expires_at - self.refresh_margin_seconds:
+            return token
+        return await run_blocking(self.get_token)
+    
+    def invalidate(self, token=None):
+        with self._lock:
+            if token is None or token == self._token:
+                self._token = None
+                self._expires_at = 0
+    
+    def _refresh(self):
+        data = {
+            'grant_type': 'client_credentials',
+            'client_id': self.client_id,
+            'client_secret': self.client_secret
+        }
+        
+        response = self.http.post(self.token_url, provider=self.provider, data=data)
+        response.raise_for_status()
+        payload = response.json()
+        
+        self._token = payload['access_token']
+        self._expires_at = time.monotonic() + int(payload.get('expires_in', 1799))
+        self.refreshes += 1
@@ -0,0 +1,190 @@
+import asyncio
+
+
+class TripPlanner:
+    def __init__(self, football_service, flight_service, hotel_service, calculator, executor):
+        self.football_service = football_service
+        self.flight_service = flight_service
+        self.hotel_service = hotel_service
+        self.calculator = calculator
+        self.executor = executor
+    
+    def calculate_trip(self, match_details, origin_city):
+        flight_future = self.executor.submit(
+            self.flight_service.get_flight_price,
+            origin_city,
+            match_details['city'],
+            match_details['date']
+        )
+        hotel_future = self.executor.submit(
+            self.hotel_service.get_hotel_price,
+            match_details['city'],
+            match_details['date']
+        )
+        ticket_future = self.executor.submit(
+            self.calculator.estimate_ticket_price,
+            match_details['league'],
+            match_details['home_team'],
+            match_details['away_team']
+        )
+        
+        return self.build_quote(
+            match_details,
+            flight_future.result(),
+            hotel_future.result(),
+            ticket_future.result()
+        )
+    
+    async def calculate_trip_async(self, match_details, origin_city):
+        # calculate_trip() for coroutine services: flight and hotel lookups
+        # are awaited concurrently instead of occupying worker threads
+        flight_data, hotel_data = await asyncio.gather(
+            self.flight_service.get_flight_price(origin_city, match_details['city'], match_details['date']),
+            self.hotel_service.get_hotel_price(match_details['city'], match_details['date'])
+        )
+        ticket_cost = self.calculator.estimate_ticket_price(
+            match_details['league'],
+            match_details['home_team'],
+            match_details['away_team']
+        )
+        return self.build_quote(match_details, flight_data, hotel_data, ticket_cost)
+    
+    def calculate_trips(self, trips):
+        # Shared sub-lookups are deduplicated: one match lookup per match id,
+        # one flight query per route and date, one hotel query per city and date
+        match_futures = {
+            match_id: self.executor.submit(self.football_service.get_match_details, match_id)
+            for match_id in self._match_ids(trips)
+        }
+        matches = {match_id: self._result(future) for match_id, future in match_futures.items()}
+        
+        flight_keys, hotel_keys = self._price_keys(trips, matches)
+        flight_futures = {key: self.executor.submit(self.flight_service.get_flight_price, *key) for key in flight_keys}
+        hotel_futures = {key: self.executor.submit(self.hotel_service.get_hotel_price, *key) for key in hotel_keys}
+        
+        flights = {key: self._result(future) for key, future in flight_futures.items()}
+        hotels = {key: self._result(future) for key, future in hotel_futures.items()}
+        return self._batch_result(trips, matches, flights, hotels)
+    
+    async def calculate_trips_async(self, trips):
+        # calculate_trips() for coroutine services, with the same deduplication
+        match_ids = self._match_ids(trips)
+        matches = dict(zip(match_ids, await self._gather(self.football_service.get_match_details, [(match_id,) for match_id in match_ids])))
+        
+        flight_keys, hotel_keys = self._price_keys(trips, matches)
+        flight_results, hotel_results = await asyncio.gather(
+            self._gather(self.flight_service.get_flight_price, flight_keys),
+            self._gather(self.hotel_service.get_hotel_price, hotel_keys)
+        )
+        
+        flights = dict(zip(flight_keys, flight_results))
+        hotels = dict(zip(hotel_keys, hotel_results))
+        return self._batch_result(trips, matches, flights, hotels)
+    
+    def _trip_error(self, trip):
+        # Match ids and origin cities become lookup keys, so they must be
+        # hashable scalars
+        match_id = trip.get('match_id')
+        origin_city = trip.get('origin_city')
+        if match_id is None or not origin_city:
+            return 'match_id and origin_city are required'
+        if isinstance(match_id, bool) or not isinstance(match_id, (int, str)) or not isinstance(origin_city, str):
+            return 'match_id must be an integer or string and origin_city a string'
+        return None
+    
+    def _match_ids(self, trips):
+        match_ids = []
+        for trip in trips:
+            match_id = trip.get('match_id')
+            if not self._trip_error(trip) and match_id not in match_ids:
+                match_ids.append(match_id)
+        return match_ids
+    
+    def _price_keys(self, trips, matches):
+        flight_keys = []
+        hotel_keys = []
+        for trip in trips:
+            if self._trip_error(trip):
+                continue
+            match_details = matches.get(trip['match_id'])
+            origin_city = trip['origin_city']
+            if not match_details:
+                continue
+            
+            flight_key = (origin_city, match_details['city'], match_details['date'])
+            if flight_key not in flight_keys:
+                flight_keys.append(flight_key)
+            
+            hotel_key = (match_details['city'], match_details['date'])
+            if hotel_key not in hotel_keys:
+                hotel_keys.append(hotel_key)
+        return flight_keys, hotel_keys
+    
+    def _batch_result(self, trips, matches, flights, hotels):
+        quotes = []
+        for trip in trips:
+            match_id = trip.get('match_id')
+            origin_city = trip.get('origin_city')
+            quote = {'match_id': match_id, 'origin_city': origin_city}
+            error = self._trip_error(trip)
+            match_details = None if error else matches.get(match_id)
+            
+            if error:
+                quote['error'] = error
+            elif not match_details:
+                quote['error'] = 'Match not found'
+            else:
+                flight_data = flights[(origin_city, match_details['city'], match_details['date'])]
+                hotel_data = hotels[(match_details['city'], match_details['date'])]
+                if not flight_data or not hotel_data:
+                    quote['error'] = 'Price lookup failed'
+                else:
+                    ticket_cost = self.calculator.estimate_ticket_price(
+                        match_details['league'],
+                        match_details['home_team'],
+                        match_details['away_team']
+                    )
+                    quote.update(self.build_quote(match_details, flight_data, hotel_data, ticket_cost))
+            quotes.append(quote)
+        
+        return {
+            'quotes': quotes,
+            'lookups': {
+                'matches': len(matches),
+                'flights': len(flights),
+                'hotels': len(hotels)
+            }
+        }
+    
+    def build_quote(self, match_details, flight_data, hotel_data, ticket_cost):
+        total_cost = self.calculator.calculate_total(flight_data['price'], hotel_data['price'], ticket_cost)
+        
+        return {
+            'match': match_details,
+            'costs': {
+                'flight': flight_data['price'],
+                'hotel': hotel_data['price'],
+                'ticket': ticket_cost,
+                'total': total_cost
+            },
+            'links': {
+                'flight': flight_data['link'],
+                'hotel': hotel_data['link']
+            },
+            'stale': flight_data.get('stale', False) or hotel_data.get('stale', False),
+            'estimated': flight_data.get('estimated', False) or hotel_data.get('estimated', False)
+        }
+    
+    async def _gather(self, fn, keys):
+        results = await asyncio.gather(*(fn(*key) for key in keys), return_exceptions=True)
+        for result in results:
+            if isinstance(result, Exception):
+                print(f"Error in trip lookup: {result}")
+        return [None if isinstance(result, Exception) else result for result in results]
+    
+    def _result(self, future):
+        try:
+            return future.result()
+        except Exception as e:
+            print(f"Error in trip lookup: {e}")
+            return None
@@ -65,16 +65,8 @@ async function findMatches() {
     }
     
     try {
-        const response = await fetch('/api/matches', {
-            method: 'POST',
-            headers: {
-                'Content-Type': 'application/json'
-            },
-            body: JSON.stringify({
-                team_id: teamId,
-                match_type: matchType
-            })
-        });
+        const params = new URLSearchParams({team_id: teamId, match_type: matchType});
+        const response = await fetch(`/api/matches?${params}`);
         
         matches = await response.json();
         displayMatches(matches);
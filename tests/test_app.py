@@ -1,11 +1,17 @@
 import unittest
+import gzip
+import inspect
 import json
-from unittest.mock import patch, Mock
+from unittest.mock import patch, Mock, AsyncMock
 import sys
 import os
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from app import app, football_service, calculator
+from app import app, football_service, calculator, trip_views
+from models.memory_cache import encoded_responses
+from models.cache_backends import RedisCacheBackend
+from models.resp_client import RESPClient
+from services.cache_provenance import record_lookup
 from flask_login import login_user
 from auth.users import User
 
@@ -17,6 +23,7 @@ class TestApp(unittest.TestCase):
         self.app.config['WTF_CSRF_ENABLED'] = False
         self.app.config['LOGIN_DISABLED'] = False
         self.client = self.app.test_client()
+        encoded_responses.clear()
     
     def login(self, username='admin', password='admin123'):
         return self.client.post('/login', data={
@@ -78,6 +85,59 @@ class TestApp(unittest.TestCase):
         data = json.loads(response.data)
         self.assertIsInstance(data, list)
     
+    def test_get_leagues_logs_cache_provenance(self):
+        from models.cache import RequestLog
+        self.login()
+        with self.app.app_context():
+            before = RequestLog.query.filter_by(endpoint='/api/leagues').count()
+        
+        response = self.client.get('/api/leagues')
+        
+        self.assertEqual(response.headers['X-Cache'], 'HIT')
+        with self.app.app_context():
+            logs = RequestLog.query.filter_by(endpoint='/api/leagues').order_by(RequestLog.id).all()
+            self.assertEqual(len(logs), before + 1)
+            self.assertEqual(logs[-1].cache_detail, 'leagues:static')
+            self.assertTrue(logs[-1].cache_hit)
+    
+    def test_cache_stats_window_by_endpoint(self):
+        self.login()
+        self.client.get('/api/leagues')
+        
+        response = self.client.get('/api/admin/cache/stats?window=24h&group_by=endpoint')
+        
+        self.assertEqual(response.status_code, 200)
+        data = json.loads(response.data)
+        endpoints = [group['endpoint'] for group in data['request_stats']['groups']]
+        self.assertIn('/api/leagues', endpoints)
+    
+    def test_cache_admin_with_backend_down(self):
+        self.login()
+        backend = RedisCacheBackend(RESPClient('127.0.0.1', 1, timeout=0.2), 'test:')
+        
+        with patch('app.cache_backend', backend):
+            stats = self.client.get('/api/admin/cache/stats')
+            cleared = self.client.post('/api/admin/cache/clear')
+        
+        self.assertEqual(stats.status_code, 200)
+        self.assertFalse(json.loads(stats.data)['cache_backend_available'])
+        self.assertIsNone(json.loads(stats.data)['cache_entries'])
+        self.assertEqual(cleared.status_code, 503)
+    
+    def test_cache_stats_rejects_invalid_window(self):
+        self.login()
+        response = self.client.get('/api/admin/cache/stats?window=yesterday')
+        self.assertEqual(response.status_code, 400)
+    
+    def test_circuit_breakers_endpoint(self):
+        self.login()
+        response = self.client.get('/api/admin/circuit-breakers')
+        
+        self.assertEqual(response.status_code, 200)
+        data = json.loads(response.data)
+        self.assertTrue(data['enabled'])
+        self.assertIsInstance(data['breakers'], dict)
+    
     @patch('app.football_service')
     def test_get_teams_requires_login(self, mock_service):
         response = self.client.get('/api/teams/39')
@@ -118,6 +178,107 @@ class TestApp(unittest.TestCase):
         data = json.loads(response.data)
         self.assertIsInstance(data, list)
     
+    @patch('app.football_service')
+    def test_get_matches_by_query_string(self, mock_service):
+        mock_service.get_upcoming_matches.return_value = [{'id': 1}]
+        
+        self.login()
+        response = self.client.get('/api/matches?team_id=100&match_type=home')
+        
+        self.assertEqual(response.status_code, 200)
+        mock_service.get_upcoming_matches.assert_called_once_with('100', 'home')
+    
+    @patch('app.football_service')
+    def test_read_endpoint_sets_validators(self, mock_service):
+        mock_service.get_teams_by_league.return_value = [{'id': 33, 'name': 'Manchester United'}]
+        
+        self.login()
+        response = self.client.get('/api/teams/39')
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.headers['ETag'])
+        self.assertIn('private', response.headers['Cache-Control'])
+        self.assertIn('max-age=604800', response.headers['Cache-Control'])
+    
+    @patch('app.football_service')
+    def test_if_none_match_skips_service(self, mock_service):
+        mock_service.get_teams_by_league.return_value = [{'id': 33, 'name': 'Manchester United'}]
+        
+        self.login()
+        etag = self.client.get('/api/teams/39').headers['ETag']
+        response = self.client.get('/api/teams/39', headers={'If-None-Match': etag})
+        
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.data, b'')
+        self.assertEqual(response.headers['ETag'], etag)
+        self.assertEqual(response.headers['X-Cache'], 'HIT')
+        self.assertEqual(mock_service.get_teams_by_league.call_count, 1)
+        
+        response = self.client.get('/api/teams/39', headers={'If-None-Match': '"other"'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(json.loads(response.data), [{'id': 33, 'name': 'Manchester United'}])
+        self.assertEqual(response.headers['X-Cache'], 'HIT')
+        self.assertEqual(mock_service.get_teams_by_league.call_count, 1)
+    
+    @patch('app.football_service')
+    def test_passthrough_disabled_calls_service(self, mock_service):
+        mock_service.get_teams_by_league.return_value = [{'id': 33}]
+        
+        self.login()
+        etag = self.client.get('/api/teams/39').headers['ETag']
+        with patch.dict(self.app.config, {'RESPONSE_PASSTHROUGH': False}):
+            response = self.client.get('/api/teams/39')
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(mock_service.get_teams_by_league.call_count, 2)
+            
+            response = self.client.get('/api/teams/39', headers={'If-None-Match': etag})
+            self.assertEqual(response.status_code, 304)
+            self.assertEqual(mock_service.get_teams_by_league.call_count, 2)
+    
+    @patch('app.football_service')
+    def test_large_responses_gzipped(self, mock_service):
+        teams = [{'id': team_id, 'name': f"Team {team_id}"} for team_id in range(200)]
+        mock_service.get_teams_by_league.return_value = teams
+        
+        self.login()
+        for _ in range(2):
+            response = self.client.get('/api/teams/39', headers={'Accept-Encoding': 'gzip'})
+            self.assertEqual(response.headers['Content-Encoding'], 'gzip')
+            self.assertIn('Accept-Encoding', response.headers['Vary'])
+            self.assertTrue(response.headers['ETag'].startswith('W/'))
+            self.assertEqual(json.loads(gzip.decompress(response.data)), teams)
+        
+        response = self.client.get('/api/teams/39', headers={'If-None-Match': response.headers['ETag']})
+        self.assertEqual(response.status_code, 304)
+        self.assertNotIn('Content-Encoding', self.client.get('/api/teams/39').headers)
+    
+    @patch('app.football_service')
+    def test_matching_etag_without_validator_still_304(self, mock_service):
+        # e.g. the ETag came from another worker: the service runs, the body does not
+        mock_service.get_top_leagues.return_value = [{'id': 39}]
+        
+        self.login()
+        etag = self.client.get('/api/leagues').headers['ETag']
+        encoded_responses.clear()
+        response = self.client.get('/api/leagues', headers={'If-None-Match': etag})
+        
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(mock_service.get_top_leagues.call_count, 2)
+    
+    @patch('app.football_service')
+    def test_stale_result_not_validated(self, mock_service):
+        def stale_teams(league_id):
+            record_lookup(f"teams_league_{league_id}", 'stale')
+            return [{'id': 33}]
+        mock_service.get_teams_by_league.side_effect = stale_teams
+        
+        self.login()
+        response = self.client.get('/api/teams/39')
+        
+        self.assertNotIn('ETag', response.headers)
+        self.assertEqual(response.headers['Cache-Control'], 'no-cache')
+        self.assertIsNone(encoded_responses.get('teams_league_39'))
+    
     @patch('app.hotel_service')
     @patch('app.flight_service')
     @patch('app.football_service')
@@ -129,6 +290,35 @@ class TestApp(unittest.TestCase):
                                    content_type='application/json')
         self.assertEqual(response.status_code, 302)
     
+    @patch('app.async_hotel_service', new_callable=AsyncMock)
+    @patch('app.async_flight_service', new_callable=AsyncMock)
+    @patch('app.async_football_service', new_callable=AsyncMock)
+    @patch('app.calculator')
+    def test_calculate_trip_with_async_lookups(self, mock_calc, mock_football, mock_flight, mock_hotel):
+        mock_football.get_match_details.return_value = {
+            'league': 'Premier League',
+            'home_team': 'Manchester City',
+            'away_team': 'Liverpool',
+            'city': 'Manchester',
+            'date': '2023-12-01'
+        }
+        mock_flight.get_flight_price.return_value = {'price': 200, 'link': 'http://flight.com'}
+        mock_hotel.get_hotel_price.return_value = {'price': 150, 'link': 'http://hotel.com'}
+        mock_calc.estimate_ticket_price.return_value = 80
+        mock_calc.calculate_total.return_value = 430
+        
+        self.login()
+        payload = {'match_id': 1, 'origin_city': 'London'}
+        with patch.dict(self.app.view_functions, trip_views(True)):
+            response = self.client.post('/api/calculate-trip',
+                                       data=json.dumps(payload),
+                                       content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        data = json.loads(response.data)
+        self.assertIn('match', data)
+        self.assertIn('costs', data)
+        mock_flight.get_flight_price.assert_awaited_once_with('London', 'Manchester', '2023-12-01')
+    
     @patch('app.hotel_service')
     @patch('app.flight_service')
     @patch('app.football_service')
@@ -152,9 +342,75 @@ class TestApp(unittest.TestCase):
                                    data=json.dumps(payload),
                                    content_type='application/json')
         self.assertEqual(response.status_code, 200)
+        self.assertEqual(json.loads(response.data)['costs']['flight'], 200)
+        mock_flight.get_flight_price.assert_called_once_with('London', 'Manchester', '2023-12-01')
+    
+    @patch('app.async_hotel_service', new_callable=AsyncMock)
+    @patch('app.async_flight_service', new_callable=AsyncMock)
+    @patch('app.async_football_service', new_callable=AsyncMock)
+    def test_calculate_trips_batch(self, mock_football, mock_flight, mock_hotel):
+        mock_football.get_match_details.return_value = {
+            'league': 'Premier League',
+            'home_team': 'Manchester City',
+            'away_team': 'Liverpool',
+            'city': 'Manchester',
+            'date': '2023-12-01'
+        }
+        mock_flight.get_flight_price.return_value = {'price': 200, 'link': 'http://flight.com'}
+        mock_hotel.get_hotel_price.return_value = {'price': 150, 'link': 'http://hotel.com'}
+        
+        self.login()
+        payload = {'trips': [
+            {'match_id': 1, 'origin_city': 'London'},
+            {'match_id': 1, 'origin_city': 'Madrid'}
+        ]}
+        with patch.dict(self.app.view_functions, trip_views(True)):
+            response = self.client.post('/api/calculate-trips',
+                                       data=json.dumps(payload),
+                                       content_type='application/json')
+        self.assertEqual(response.status_code, 200)
         data = json.loads(response.data)
-        self.assertIn('match', data)
-        self.assertIn('costs', data)
+        self.assertEqual(len(data['quotes']), 2)
+        self.assertEqual(mock_hotel.get_hotel_price.await_count, 1)
+    
+    @patch('app.async_football_service', new_callable=AsyncMock)
+    @patch('app.football_service')
+    def test_calculate_trip_unknown_match(self, mock_football, mock_async_football):
+        mock_football.get_match_details.return_value = None
+        mock_async_football.get_match_details.return_value = None
+        
+        self.login()
+        payload = {'match_id': 404, 'origin_city': 'London'}
+        for views in (trip_views(False), trip_views(True)):
+            with patch.dict(self.app.view_functions, views):
+                response = self.client.post('/api/calculate-trip',
+                                           data=json.dumps(payload),
+                                           content_type='application/json')
+            self.assertEqual(response.status_code, 404)
+            self.assertEqual(json.loads(response.data), {'error': 'Match not found'})
+    
+    def test_trip_views_are_sync_without_async_lookups(self):
+        for endpoint in ('calculate_trip', 'calculate_trips'):
+            self.assertFalse(inspect.iscoroutinefunction(self.app.view_functions[endpoint].__wrapped__))
+            self.assertTrue(inspect.iscoroutinefunction(trip_views(True)[endpoint].__wrapped__))
+    
+    def test_calculate_trips_rejects_empty_batch(self):
+        self.login()
+        response = self.client.post('/api/calculate-trips',
+                                   data=json.dumps({'trips': []}),
+                                   content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+    
+    @patch('app.football_service')
+    def test_calculate_trips_reports_invalid_trips(self, mock_football):
+        self.login()
+        payload = {'trips': [{'match_id': [1], 'origin_city': 'London'}, {'match_id': 1, 'origin_city': ['London']}]}
+        response = self.client.post('/api/calculate-trips',
+                                   data=json.dumps(payload),
+                                   content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(all('error' in quote for quote in json.loads(response.data)['quotes']))
+        mock_football.get_match_details.assert_not_called()
 
 
 if __name__ == '__main__':
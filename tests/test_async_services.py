@@ -0,0 +1,246 @@
+import unittest
+import asyncio
+import threading
+import time
+import sys
+import os
+from unittest.mock import Mock, AsyncMock
+import httpx
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app import app
+from models.cache import db
+from models.memory_cache import memory_cache
+from services.async_http_client import AsyncHTTPClient
+from services.async_football_api import AsyncFootballAPIService
+from services.async_flight_api import AsyncFlightAPIService
+from services.async_cached_flight_api import AsyncCachedFlightAPIService
+from services.circuit_breaker import CircuitBreakerRegistry, CircuitOpen
+from services.cache_provenance import track_cache_provenance
+from services.trip_planner import TripPlanner
+from services.calculator import CostCalculator
+
+
+def client_for(handler, **kwargs):
+    return AsyncHTTPClient(transport=httpx.MockTransport(handler), backoff_factor=0, **kwargs)
+
+
+class TestAsyncHTTPClient(unittest.TestCase):
+    def setUp(self):
+        self.calls = []
+    
+    def tearDown(self):
+        self.client.close()
+    
+    def test_get_retries_server_errors(self):
+        def handler(request):
+            self.calls.append(request)
+            return httpx.Response(503 if len(self.calls) < 3 else 200, json={'ok': True})
+        
+        self.client = client_for(handler)
+        response = asyncio.run(self.client.get('https://upstream.test/teams'))
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(self.calls), 3)
+    
+    def test_each_attempt_takes_a_token(self):
+        def handler(request):
+            self.calls.append(request)
+            if len(self.calls) == 1:
+                raise httpx.ConnectError('refused', request=request)
+            return httpx.Response(503 if len(self.calls) < 4 else 200)
+        
+        self.client = client_for(handler)
+        self.client.rate_limiter = Mock(acquire_async=AsyncMock())
+        response = asyncio.run(self.client.get('https://upstream.test/teams', provider='football'))
+        
+        # The failed connect is retried without a token, the 503s with one each
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(self.calls), 4)
+        self.assertEqual(self.client.rate_limiter.acquire_async.await_count, 3)
+    
+    def test_post_is_not_retried(self):
+        def handler(request):
+            self.calls.append(request)
+            return httpx.Response(503)
+        
+        self.client = client_for(handler)
+        response = asyncio.run(self.client.post('https://upstream.test/token', data={'grant_type': 'client_credentials'}))
+        
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(len(self.calls), 1)
+    
+    def test_open_circuit_skips_upstream(self):
+        def handler(request):
+            self.calls.append(request)
+            return httpx.Response(500)
+        
+        self.client = client_for(handler, max_retries=0)
+        self.client.circuit_breakers = CircuitBreakerRegistry(failure_threshold=2, reset_timeout=60)
+        
+        async def run():
+            for _ in range(2):
+                await self.client.get('https://upstream.test/fixtures', provider='football')
+            await self.client.get('https://upstream.test/fixtures', provider='football')
+        
+        with self.assertRaises(CircuitOpen):
+            asyncio.run(run())
+        self.assertEqual(len(self.calls), 2)
+
+
+class TestAsyncServices(unittest.TestCase):
+    def setUp(self):
+        self.app = app
+        self.app.config['TESTING'] = True
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+        memory_cache.clear()
+        self.clients = []
+    
+    def tearDown(self):
+        for client in self.clients:
+            client.close()
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+    
+    def http(self, handler):
+        client = client_for(handler)
+        self.clients.append(client)
+        return client
+    
+    def test_teams_are_parsed(self):
+        def handler(request):
+            self.assertEqual(request.url.params['league'], '39')
+            return httpx.Response(200, json={'response': [
+                {'team': {'id': 33, 'name': 'Manchester United', 'logo': 'logo.png'}, 'venue': {'city': 'Manchester'}}
+            ]})
+        
+        service = AsyncFootballAPIService('key', self.http(handler))
+        teams = asyncio.run(service.get_teams_by_league(39))
+        
+        self.assertEqual(teams, [{'id': 33, 'name': 'Manchester United', 'logo': 'logo.png', 'city': 'Manchester'}])
+    
+    def test_flight_falls_back_to_estimate(self):
+        service = AsyncFlightAPIService('key', 'secret', self.http(lambda request: httpx.Response(500)))
+        service.token_manager = Mock(get_token_async=AsyncMock(return_value='token'))
+        
+        result = asyncio.run(service.get_flight_price('London', 'Madrid', '2023-12-01T20:00:00+00:00'))
+        
+        self.assertTrue(result['estimated'])
+        self.assertEqual(result['price'], 200)
+    
+    def test_cached_flight_is_fetched_once(self):
+        calls = []
+        
+        def handler(request):
+            calls.append(request)
+            return httpx.Response(200, json={'data': [{'price': {'total': '180.50'}}]})
+        
+        service = AsyncCachedFlightAPIService('key', 'secret', self.http(handler), token_manager=Mock(get_token_async=AsyncMock(return_value='token')))
+        
+        async def run():
+            first = await service.get_flight_price('London', 'Madrid', '2023-12-01T20:00:00+00:00')
+            second = await service.get_flight_price('London', 'Madrid', '2023-12-01T20:00:00+00:00')
+            return first, second
+        
+        with track_cache_provenance() as provenance:
+            first, second = asyncio.run(run())
+        
+        self.assertEqual(first['price'], 180.5)
+        self.assertEqual(second, first)
+        self.assertEqual(len(calls), 1)
+        self.assertEqual([status for _, status in provenance.lookups], ['miss', 'hit'])
+    
+    def test_cache_backend_is_used_off_the_loop(self):
+        service = AsyncCachedFlightAPIService('key', 'secret', self.http(
+            lambda request: httpx.Response(200, json={'data': [{'price': {'total': '120.00'}}]})
+        ), token_manager=Mock(get_token_async=AsyncMock(return_value='token')))
+        backend = service.cache_backend
+        threads = []
+        service.cache_backend = Mock(
+            get_entry=Mock(side_effect=lambda *args: threads.append(threading.get_ident()) or backend.get_entry(*args)),
+            set_value=Mock(side_effect=lambda *args, **kwargs: threads.append(threading.get_ident()))
+        )
+        
+        async def run():
+            await service.get_flight_price('Lisbon', 'Porto', '2023-12-01T20:00:00+00:00')
+            return threading.get_ident()
+        
+        loop_thread = asyncio.run(run())
+        
+        self.assertEqual(len(threads), 2)
+        self.assertNotIn(loop_thread, threads)
+    
+    def test_concurrent_misses_share_one_fetch(self):
+        calls = []
+        
+        def handler(request):
+            calls.append(request)
+            time.sleep(0.2)
+            return httpx.Response(200, json={'data': [{'price': {'total': '99.00'}}]})
+        
+        service = AsyncCachedFlightAPIService('key', 'secret', self.http(handler), token_manager=Mock(get_token_async=AsyncMock(return_value='token')))
+        results = []
+        
+        def request():
+            # Each thread runs its own event loop, like concurrent async views
+            with self.app.app_context():
+                results.append(asyncio.run(service.get_flight_price('Paris', 'Rome', '2023-12-01T20:00:00+00:00')))
+        
+        threads = [threading.Thread(target=request) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        self.assertEqual(len(calls), 1)
+        self.assertEqual([result['price'] for result in results], [99.0] * 4)
+
+
+class TestAsyncTripPlanner(unittest.TestCase):
+    def setUp(self):
+        self.football = AsyncMock()
+        self.flight = AsyncMock()
+        self.hotel = AsyncMock()
+        self.football.get_match_details.return_value = {
+            'league': 'Premier League',
+            'home_team': 'Arsenal',
+            'away_team': 'Chelsea',
+            'city': 'London',
+            'date': '2023-12-01'
+        }
+        self.flight.get_flight_price.return_value = {'price': 200, 'link': 'http://flight.com'}
+        self.hotel.get_hotel_price.return_value = {'price': 150, 'link': 'http://hotel.com'}
+        self.planner = TripPlanner(self.football, self.flight, self.hotel, CostCalculator(), None)
+    
+    def test_batch_deduplicates_lookups(self):
+        result = asyncio.run(self.planner.calculate_trips_async([
+            {'match_id': 1, 'origin_city': 'Madrid'},
+            {'match_id': 1, 'origin_city': 'Madrid'},
+            {'match_id': 1, 'origin_city': 'Paris'}
+        ]))
+        
+        self.assertEqual(result['lookups'], {'matches': 1, 'flights': 2, 'hotels': 1})
+        self.assertEqual(self.hotel.get_hotel_price.await_count, 1)
+        self.assertTrue(all('costs' in quote for quote in result['quotes']))
+    
+    def test_failed_lookup_only_fails_its_trips(self):
+        async def flight_price(origin, city, date):
+            if origin == 'Paris':
+                raise RuntimeError('upstream down')
+            return {'price': 200, 'link': 'http://flight.com'}
+        self.flight.get_flight_price.side_effect = flight_price
+        
+        result = asyncio.run(self.planner.calculate_trips_async([
+            {'match_id': 1, 'origin_city': 'Madrid'},
+            {'match_id': 1, 'origin_city': 'Paris'}
+        ]))
+        
+        self.assertIn('costs', result['quotes'][0])
+        self.assertEqual(result['quotes'][1]['error'], 'Price lookup failed')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,107 @@
+import unittest
+import subprocess
+import sys
+import os
+import time
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from benchmarks.stub_upstream import StubUpstream
+from benchmarks.scenarios import build_scenarios
+from benchmarks.report import summarize, upstream_delta
+from benchmarks.run import process_tree_cpu_seconds
+from services.football_api import FootballAPIService
+from services.flight_api import FlightAPIService
+from services.hotel_api import HotelAPIService
+from services.http_client import HTTPClient
+
+
+class TestStubUpstream(unittest.TestCase):
+    def setUp(self):
+        self.stub = StubUpstream().start()
+        env = self.stub.env()
+        self.football = FootballAPIService('key', base_url=env['FOOTBALL_API_URL'])
+        self.flight = FlightAPIService('key', 'secret', base_url=env['AMADEUS_API_URL'])
+        self.hotel = HotelAPIService('key', base_url=env['BOOKING_API_URL'])
+    
+    def tearDown(self):
+        self.football.http.close()
+        self.flight.http.close()
+        self.hotel.http.close()
+        self.stub.stop()
+    
+    def test_services_parse_stub_responses(self):
+        teams = self.football.get_teams_by_league(39)
+        fixtures = self.football.get_league_fixtures(39)
+        match = self.football.get_match_details(fixtures[0]['id'])
+        
+        self.assertEqual(len(teams), 20)
+        self.assertEqual(len(fixtures), 380)
+        self.assertEqual(match['league'], 'Premier League')
+        
+        flight = self.flight.get_flight_price('London', match['city'], match['date'])
+        hotel = self.hotel.get_hotel_price(match['city'], match['date'])
+        self.assertNotIn('estimated', flight)
+        self.assertNotIn('estimated', hotel)
+        self.assertEqual(self.stub.stats()['token']['requests'], 1)
+    
+    def test_upcoming_matches_follow_the_window(self):
+        matches = self.football.get_upcoming_matches(3900, 'home')
+        date_from, date_to = self.football.upcoming_window()
+        
+        self.assertTrue(all(match['is_home'] for match in matches))
+        self.assertTrue(all(date_from <= match['date'][:10] <= date_to for match in matches))
+    
+    def test_error_rate_per_endpoint(self):
+        self.stub.endpoint_error_rates['search'] = 1.0
+        self.hotel.http.close()
+        self.hotel.http = HTTPClient(max_retries=0)
+        
+        hotel = self.hotel.get_hotel_price('Madrid', '2023-12-01T20:00:00+00:00')
+        
+        self.assertTrue(hotel['estimated'])
+        self.assertEqual(self.stub.stats()['locations']['errors'], 0)
+        self.assertEqual(self.stub.stats()['search'], {'requests': 1, 'errors': 1})
+    
+    def test_upstream_delta(self):
+        before = self.stub.stats()
+        self.football.get_teams_by_league(61)
+        self.football.get_teams_by_league(61)
+        
+        self.assertEqual(upstream_delta(before, self.stub.stats()), {'teams': {'requests': 2, 'errors': 0}})
+
+
+class TestBenchmarkReport(unittest.TestCase):
+    def test_summarize(self):
+        samples = [(i / 1000, 200, 'HIT') for i in range(1, 100)] + [(1.0, 500, 'MISS')]
+        summary = summarize(samples, elapsed=2.0)
+        
+        self.assertEqual(summary['requests'], 100)
+        self.assertEqual(summary['errors'], 1)
+        self.assertEqual(summary['throughput_rps'], 50.0)
+        self.assertEqual(summary['p50_ms'], 51.0)
+        self.assertEqual(summary['p99_ms'], 1000.0)
+        self.assertEqual(summary['cache'], {'HIT': 99, 'MISS': 1})
+    
+    def test_scenarios_use_distinct_keys(self):
+        scenarios = build_scenarios(100)
+        
+        self.assertEqual(set(len(requests) for requests in scenarios.values()), {100})
+        trips = [body['match_id'] for _, _, body in scenarios['calculate-trip']]
+        self.assertEqual(len(set(trips)), 100)
+    
+    @unittest.skipUnless(os.path.exists('/proc/self/stat'), 'needs /proc')
+    def test_process_tree_cpu_seconds_includes_children(self):
+        busy = 'import time\nend = time.process_time() + 0.3\nwhile time.process_time() < end: pass\nprint(flush=True)\ntime.sleep(30)'
+        child = subprocess.Popen([sys.executable, '-c', busy], stdout=subprocess.PIPE)
+        try:
+            child.stdout.readline()
+            self.assertGreaterEqual(process_tree_cpu_seconds(os.getpid()) - time.process_time(), 0.25)
+        finally:
+            child.kill()
+            child.wait()
+            child.stdout.close()
+        self.assertIsNone(process_tree_cpu_seconds(2 ** 22 + 1))
+
+
+if __name__ == '__main__':
+    unittest.main()
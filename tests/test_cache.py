@@ -2,11 +2,26 @@ import unittest
 import json
 import sys
 import os
+import threading
+import time
 from datetime import datetime, timedelta
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from app import app
-from models.cache import db, APICache, RequestLog
+from unittest.mock import patch
+from models.cache import db, APICache, RequestLog, RequestStat
+from models.memory_cache import MemoryCache, memory_cache
+from services.cached_football_api import CachedFootballAPIService
+from services.single_flight import SingleFlight
+from services.cached_flight_api import CachedFlightAPIService
+from services.executor import LookupExecutor
+from models.request_log_writer import RequestLogWriter
+from models.schema import upgrade_schema
+from models.cache_sweeper import CacheSweeper
+from models.cache_backends import SQLiteCacheBackend
+from models.codecs import CodecRegistry
+from services.cache_provenance import CacheProvenance, track_cache_provenance, record_lookup
+from sqlalchemy import inspect, text
 
 
 class TestCache(unittest.TestCase):
@@ -17,6 +32,7 @@ class TestCache(unittest.TestCase):
         self.app_context = self.app.app_context()
         self.app_context.push()
         db.create_all()
+        memory_cache.clear()
     
     def tearDown(self):
         db.session.remove()
@@ -48,8 +64,25 @@ class TestCache(unittest.TestCase):
         result = APICache.get_cached('expired_key')
         self.assertIsNone(result)
         
+        # Expired rows are removed by the sweeper, not on the read path
         cached = APICache.query.filter_by(cache_key='expired_key').first()
-        self.assertIsNone(cached)
+        self.assertIsNotNone(cached)
+    
+    def test_get_entry_within_stale_grace(self):
+        cache_entry = APICache(
+            cache_key='stale_key',
+            cache_type='flight',
+            response_data='stale_data',
+            expires_at=datetime.utcnow() - timedelta(hours=1)
+        )
+        db.session.add(cache_entry)
+        db.session.commit()
+        
+        entry = APICache.get_entry('stale_key', stale_grace_hours=2)
+        self.assertEqual(entry.response_data, 'stale_data')
+        self.assertTrue(entry.is_stale())
+        
+        self.assertIsNone(APICache.get_entry('stale_key', stale_grace_hours=0.5))
     
     def test_get_cached_not_exists(self):
         result = APICache.get_cached('nonexistent_key')
@@ -83,6 +116,49 @@ class TestCache(unittest.TestCase):
         self.assertIsNone(APICache.query.filter_by(cache_key='expired_key').first())
         self.assertIsNotNone(APICache.query.filter_by(cache_key='valid_key').first())
     
+    def test_purge_expired_in_chunks(self):
+        now = datetime.utcnow()
+        for i in range(7):
+            db.session.add(APICache(cache_key=f'expired_{i}', cache_type='teams', response_data='[]',
+                                    expires_at=now - timedelta(hours=1)))
+        db.session.add(APICache(cache_key='valid', cache_type='teams', response_data='[]',
+                                expires_at=now + timedelta(hours=1)))
+        db.session.commit()
+        
+        count = APICache.purge_expired(chunk_size=3)
+        
+        self.assertEqual(count, 7)
+        self.assertEqual(APICache.query.count(), 1)
+    
+    def test_purge_expired_keeps_rows_in_stale_grace(self):
+        now = datetime.utcnow()
+        db.session.add(APICache(cache_key='flight_recent', cache_type='flight', response_data='{}',
+                                expires_at=now - timedelta(hours=1)))
+        db.session.add(APICache(cache_key='flight_old', cache_type='flight', response_data='{}',
+                                expires_at=now - timedelta(hours=8)))
+        db.session.add(APICache(cache_key='teams_expired', cache_type='teams', response_data='[]',
+                                expires_at=now - timedelta(hours=1)))
+        db.session.commit()
+        
+        count = APICache.purge_expired(stale_grace_hours={'flight': 6})
+        
+        self.assertEqual(count, 2)
+        self.assertEqual([entry.cache_key for entry in APICache.query.all()], ['flight_recent'])
+    
+    def test_sweeper_records_stats(self):
+        db.session.add(APICache(cache_key='expired', cache_type='teams', response_data='[]',
+                                expires_at=datetime.utcnow() - timedelta(hours=1)))
+        db.session.commit()
+        sweeper = CacheSweeper(self.app, SQLiteCacheBackend(), interval=60)
+        
+        self.assertEqual(sweeper.sweep(), 1)
+        
+        stats = sweeper.stats()
+        self.assertEqual(stats['runs'], 1)
+        self.assertEqual(stats['total_deleted'], 1)
+        self.assertIsNotNone(stats['last_run_at'])
+        self.assertFalse(stats['running'])
+    
     def test_clear_all(self):
         APICache.set_cache('key1', 'test', 'data1', ttl_hours=1)
         APICache.set_cache('key2', 'test', 'data2', ttl_hours=1)
@@ -106,6 +182,112 @@ class TestCache(unittest.TestCase):
         self.assertEqual(parsed['teams'][0]['name'], 'Team A')
 
 
+
+class TestCacheCodecs(unittest.TestCase):
+    def setUp(self):
+        self.app = app
+        self.app.config['TESTING'] = True
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+        memory_cache.clear()
+        self.teams = [
+            {'id': i, 'name': f'Team {i}', 'logo': f'https://media.api-sports.io/football/teams/{i}.png', 'city': 'London'}
+            for i in range(20)
+        ]
+    
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+    
+    def test_large_payload_is_compressed(self):
+        APICache.set_value('teams_league_39', 'teams', self.teams, ttl_hours=1)
+        entry = APICache.query.filter_by(cache_key='teams_league_39').first()
+        
+        self.assertEqual(entry.codec, 'zlib-json')
+        self.assertLess(len(entry.payload), len(json.dumps(self.teams)) / 3)
+        self.assertEqual(entry.get_value(), self.teams)
+        self.assertEqual(json.loads(APICache.get_cached('teams_league_39')), self.teams)
+    
+    def test_small_payload_stays_plain_json(self):
+        APICache.set_value('flight_London_Madrid_2023-12-01', 'flight', {'price': 200, 'link': 'x'}, ttl_hours=1)
+        entry = APICache.query.filter_by(cache_key='flight_London_Madrid_2023-12-01').first()
+        
+        self.assertIsNone(entry.codec)
+        self.assertIsNone(entry.payload)
+        self.assertEqual(json.loads(entry.response_data), {'price': 200, 'link': 'x'})
+    
+    def test_legacy_plain_rows_are_readable(self):
+        APICache.set_cache('teams_league_39', 'teams', json.dumps(self.teams), ttl_hours=1)
+        entry = APICache.get_entry('teams_league_39')
+        self.assertEqual(entry.get_value(), self.teams)
+    
+    def test_overwrite_switches_codec(self):
+        APICache.set_value('teams_league_39', 'teams', self.teams, ttl_hours=1)
+        APICache.set_cache('teams_league_39', 'teams', '["plain"]', ttl_hours=1)
+        
+        entry = APICache.get_entry('teams_league_39')
+        self.assertIsNone(entry.codec)
+        self.assertEqual(entry.get_value(), ['plain'])
+    
+    def test_codec_per_cache_type_and_stats(self):
+        registry = CodecRegistry(codecs_by_type={'teams': 'json'}, min_size=10)
+        
+        self.assertEqual(registry.encode('teams', self.teams)[0], 'json')
+        codec_name, data = registry.encode('matches', self.teams)
+        self.assertEqual(codec_name, 'zlib-json')
+        self.assertEqual(registry.decode(codec_name, data), self.teams)
+        
+        stats = registry.stats()['zlib-json']
+        self.assertEqual(stats['encodes'], 1)
+        self.assertEqual(stats['decodes'], 1)
+        self.assertGreater(stats['bytes_saved'], 0)
+    
+    def test_unknown_codec_rejected(self):
+        with self.assertRaises(ValueError):
+            CodecRegistry().configure(default_codec='brotli')
+
+
+class TestSQLiteSettings(unittest.TestCase):
+    def setUp(self):
+        self.app = app
+        self.app.config['TESTING'] = True
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+    
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+    
+    def test_connections_use_wal_and_busy_timeout(self):
+        self.assertEqual(db.session.execute(text('PRAGMA journal_mode')).scalar(), 'wal')
+        self.assertEqual(db.session.execute(text('PRAGMA busy_timeout')).scalar(), 5000)
+        self.assertEqual(db.session.execute(text('PRAGMA synchronous')).scalar(), 1)
+    
+    def test_concurrent_writers_wait_for_lock(self):
+        errors = []
+        
+        def write(worker):
+            with self.app.app_context():
+                try:
+                    for i in range(20):
+                        APICache.set_cache(f'key_{worker}_{i}', 'test', '{}', ttl_hours=1)
+                except Exception as e:
+                    errors.append(e)
+        
+        threads = [threading.Thread(target=write, args=(worker,)) for worker in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        self.assertEqual(errors, [])
+        self.assertEqual(APICache.query.count(), 80)
+
+
 class TestRequestLog(unittest.TestCase):
     def setUp(self):
         self.app = app
@@ -114,6 +296,7 @@ class TestRequestLog(unittest.TestCase):
         self.app_context = self.app.app_context()
         self.app_context.push()
         db.create_all()
+        memory_cache.clear()
     
     def tearDown(self):
         db.session.remove()
@@ -168,6 +351,40 @@ class TestRequestLog(unittest.TestCase):
         self.assertEqual(stats['cache_misses'], 0)
         self.assertEqual(stats['cache_hit_rate'], 100.0)
     
+    def test_log_request_with_provenance(self):
+        provenance = CacheProvenance()
+        provenance.record('match_details_1', 'hit')
+        provenance.record('flight_London_Madrid_2023-12-01', 'miss')
+        provenance.record('hotel_Madrid_2023-12-01', 'stale')
+        
+        RequestLog.log_request('/api/calculate-trip', 'admin', provenance=provenance)
+        log = RequestLog.query.first()
+        
+        self.assertFalse(log.cache_hit)
+        self.assertEqual(log.lookups, 3)
+        self.assertEqual(log.lookup_hits, 2)
+        self.assertIn('flight_London_Madrid_2023-12-01:miss', log.cache_detail)
+        
+        stats = RequestLog.get_stats()
+        self.assertEqual(stats['lookups'], 3)
+        self.assertEqual(stats['lookup_hit_rate'], 66.67)
+    
+    def test_upgrade_schema_adds_missing_columns(self):
+        db.session.remove()
+        with db.engine.begin() as connection:
+            connection.execute(text('DROP TABLE request_log'))
+            connection.execute(text(
+                'CREATE TABLE request_log (id INTEGER PRIMARY KEY, endpoint VARCHAR(200) NOT NULL, '
+                'username VARCHAR(100), cache_hit BOOLEAN, timestamp DATETIME)'
+            ))
+        
+        upgrade_schema(db)
+        
+        columns = {column['name'] for column in inspect(db.engine).get_columns('request_log')}
+        self.assertTrue({'cache_detail', 'lookups', 'lookup_hits'} <= columns)
+        RequestLog.log_request('/api/leagues', 'admin')
+        self.assertEqual(RequestLog.query.count(), 1)
+    
     def test_multiple_users_logging(self):
         RequestLog.log_request('/api/leagues', 'admin', cache_hit=True)
         RequestLog.log_request('/api/leagues', 'user', cache_hit=False)
@@ -180,6 +397,140 @@ class TestRequestLog(unittest.TestCase):
         self.assertEqual(admin_logs, 2)
 
 
+
+class TestRequestStat(unittest.TestCase):
+    def setUp(self):
+        self.app = app
+        self.app.config['TESTING'] = True
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+    
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+    
+    def record(self, endpoint, username, cache_hit, age):
+        RequestLog.write_batch([{
+            'endpoint': endpoint,
+            'username': username,
+            'cache_hit': cache_hit,
+            'timestamp': datetime.utcnow() - age,
+            'cache_detail': None,
+            'lookups': 1,
+            'lookup_hits': 1 if cache_hit else 0
+        }])
+    
+    def test_rollups_updated_on_write(self):
+        self.record('/api/leagues', 'admin', True, timedelta(0))
+        self.record('/api/leagues', 'admin', False, timedelta(0))
+        
+        total = RequestStat.query.filter_by(granularity='total', endpoint='/api/leagues').one()
+        self.assertEqual(total.requests, 2)
+        self.assertEqual(total.cache_hits, 1)
+        self.assertEqual(RequestStat.query.filter_by(granularity='minute').count(), 1)
+    
+    def test_windowed_stats_by_endpoint(self):
+        self.record('/api/leagues', 'admin', True, timedelta(hours=1))
+        self.record('/api/leagues', 'user', False, timedelta(hours=2))
+        self.record('/api/matches', 'admin', True, timedelta(hours=3))
+        self.record('/api/matches', 'admin', True, timedelta(days=3))
+        
+        stats = RequestLog.get_stats(timedelta(hours=24), 'endpoint')
+        
+        self.assertEqual(stats['total_requests'], 3)
+        self.assertEqual(stats['granularity'], 'hour')
+        groups = {group['endpoint']: group for group in stats['groups']}
+        self.assertEqual(groups['/api/leagues']['cache_hit_rate'], 50.0)
+        self.assertEqual(groups['/api/matches']['total_requests'], 1)
+        self.assertEqual(RequestLog.get_stats()['total_requests'], 4)
+    
+    def test_short_window_uses_minute_buckets(self):
+        self.record('/api/leagues', 'admin', True, timedelta(minutes=5))
+        self.record('/api/leagues', 'admin', True, timedelta(minutes=50))
+        
+        stats = RequestLog.get_stats(timedelta(minutes=30), 'username')
+        
+        self.assertEqual(stats['granularity'], 'minute')
+        self.assertEqual(stats['total_requests'], 1)
+        self.assertEqual(stats['groups'][0]['username'], 'admin')
+    
+    def test_prune_old_buckets(self):
+        self.record('/api/leagues', 'admin', True, timedelta(days=3))
+        self.record('/api/leagues', 'admin', True, timedelta(0))
+        
+        RequestStat.prune('minute', datetime.utcnow() - timedelta(hours=48))
+        
+        self.assertEqual(RequestStat.query.filter_by(granularity='minute').count(), 1)
+        self.assertEqual(RequestLog.get_stats()['total_requests'], 2)
+    
+    def test_backfill_from_existing_logs(self):
+        db.session.add(RequestLog(endpoint='/api/leagues', username='admin', cache_hit=True))
+        db.session.add(RequestLog(endpoint='/api/matches', username=None, cache_hit=False))
+        db.session.commit()
+        
+        self.assertEqual(RequestStat.backfill(), 2)
+        self.assertEqual(RequestStat.backfill(), 0)
+        
+        stats = RequestLog.get_stats()
+        self.assertEqual(stats['total_requests'], 2)
+        self.assertEqual(stats['cache_hits'], 1)
+
+
+class TestRequestLogWriter(unittest.TestCase):
+    def setUp(self):
+        self.app = app
+        self.app.config['TESTING'] = False
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+    
+    def tearDown(self):
+        self.app.config['TESTING'] = True
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+    
+    def test_logs_written_in_batches(self):
+        writer = RequestLogWriter(self.app, batch_size=3, flush_interval=0.05)
+        for i in range(5):
+            writer.log(f'/api/teams/{i}', 'admin', cache_hit=i % 2 == 0)
+        writer.stop()
+        
+        self.assertEqual(RequestLog.query.count(), 5)
+        self.assertEqual(RequestLog.get_stats()['cache_hits'], 3)
+        self.assertEqual(writer.stats()['written'], 5)
+        self.assertEqual(writer.stats()['queued'], 0)
+    
+    def test_logs_flushed_after_interval(self):
+        writer = RequestLogWriter(self.app, batch_size=100, flush_interval=0.05)
+        writer.log('/api/leagues', 'admin')
+        
+        deadline = time.monotonic() + 2
+        while writer.stats()['written'] == 0 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        
+        self.assertEqual(RequestLog.query.count(), 1)
+        writer.stop()
+    
+    @patch.object(RequestLogWriter, 'start')
+    def test_full_queue_drops_records(self, mock_start):
+        writer = RequestLogWriter(self.app, max_queue=2)
+        for _ in range(5):
+            writer.log('/api/leagues', 'admin')
+        
+        self.assertEqual(writer.stats()['dropped'], 3)
+        writer.flush()
+        self.assertEqual(RequestLog.query.count(), 2)
+    
+    def test_disabled_writer_logs_synchronously(self):
+        writer = RequestLogWriter(self.app, enabled=False)
+        writer.log('/api/leagues', 'admin')
+        self.assertEqual(RequestLog.query.count(), 1)
+        self.assertIsNone(writer._thread)
+
+
 class TestCachedServices(unittest.TestCase):
     def setUp(self):
         self.app = app
@@ -188,6 +539,7 @@ class TestCachedServices(unittest.TestCase):
         self.app_context = self.app.app_context()
         self.app_context.push()
         db.create_all()
+        memory_cache.clear()
     
     def tearDown(self):
         db.session.remove()
@@ -213,6 +565,211 @@ class TestCachedServices(unittest.TestCase):
         
         time_diff = (long.expires_at - short.expires_at).total_seconds() / 3600
         self.assertAlmostEqual(time_diff, 167, delta=1)
+    
+    @patch('services.football_api.FootballAPIService.get_teams_by_league')
+    def test_cached_service_uses_memory_tier(self, mock_fetch):
+        mock_fetch.return_value = [{'id': 1, 'name': 'Team A'}]
+        service = CachedFootballAPIService('test_api_key')
+        
+        first = service.get_teams_by_league(39)
+        with patch.object(APICache, 'get_entry') as mock_get_entry:
+            second = service.get_teams_by_league(39)
+            mock_get_entry.assert_not_called()
+        
+        self.assertEqual(first, second)
+        self.assertEqual(mock_fetch.call_count, 1)
+        self.assertIsNotNone(APICache.get_cached('teams_league_39'))
+    
+    @patch('services.football_api.FootballAPIService.get_teams_by_league')
+    def test_cached_service_reads_through_database_tier(self, mock_fetch):
+        APICache.set_cache('teams_league_39', 'teams', json.dumps([{'id': 2}]), ttl_hours=1)
+        service = CachedFootballAPIService('test_api_key')
+        
+        teams = service.get_teams_by_league(39)
+        
+        self.assertEqual(teams, [{'id': 2}])
+        mock_fetch.assert_not_called()
+        self.assertEqual(memory_cache.get('teams_league_39'), [{'id': 2}])
+    
+    def test_set_cache_invalidates_memory_tier(self):
+        memory_cache.set('teams_league_39', ['old'], 60)
+        APICache.set_cache('teams_league_39', 'teams', '["new"]', ttl_hours=1)
+        self.assertIsNone(memory_cache.get('teams_league_39'))
+    
+    def test_clear_all_clears_memory_tier(self):
+        memory_cache.set('teams_league_39', ['team'], 60)
+        APICache.clear_all()
+        self.assertIsNone(memory_cache.get('teams_league_39'))
+
+    
+    @patch('services.football_api.FootballAPIService.get_upcoming_matches')
+    def test_concurrent_misses_are_coalesced(self, mock_fetch):
+        def slow_fetch(team_id, match_type):
+            time.sleep(0.2)
+            return [{'id': 1}]
+        mock_fetch.side_effect = slow_fetch
+        service = CachedFootballAPIService('test_api_key')
+        results = []
+        
+        def worker():
+            with self.app.app_context():
+                results.append(service.get_upcoming_matches(100, 'all'))
+        
+        threads = [threading.Thread(target=worker) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        self.assertEqual(mock_fetch.call_count, 1)
+        self.assertEqual(results, [[{'id': 1}]] * 5)
+        self.assertEqual(APICache.query.filter_by(cache_key='matches_100_all').count(), 1)
+
+    
+    @patch('services.flight_api.FlightAPIService.get_flight_price')
+    def test_stale_entry_served_and_refreshed(self, mock_fetch):
+        mock_fetch.return_value = {'price': 180, 'link': 'http://new'}
+        cache_entry = APICache(
+            cache_key='flight_London_Madrid_2023-12-01',
+            cache_type='flight',
+            response_data=json.dumps({'price': 200, 'link': 'http://old'}),
+            expires_at=datetime.utcnow() - timedelta(hours=1)
+        )
+        db.session.add(cache_entry)
+        db.session.commit()
+        
+        service = CachedFlightAPIService('key', 'secret')
+        service.refresh_executor = LookupExecutor(self.app, parallel=False)
+        service.stale_grace_hours = {'flight': 6}
+        
+        result = service.get_flight_price('London', 'Madrid', '2023-12-01')
+        
+        self.assertEqual(result, {'price': 200, 'link': 'http://old', 'stale': True})
+        mock_fetch.assert_called_once_with('London', 'Madrid', '2023-12-01')
+        fresh = service.get_flight_price('London', 'Madrid', '2023-12-01')
+        self.assertEqual(fresh, {'price': 180, 'link': 'http://new'})
+    
+    @patch('services.flight_api.FlightAPIService.get_flight_price')
+    def test_stale_entry_ignored_without_grace(self, mock_fetch):
+        mock_fetch.return_value = {'price': 180, 'link': 'http://new'}
+        cache_entry = APICache(
+            cache_key='flight_London_Madrid_2023-12-01',
+            cache_type='flight',
+            response_data=json.dumps({'price': 200, 'link': 'http://old'}),
+            expires_at=datetime.utcnow() - timedelta(hours=1)
+        )
+        db.session.add(cache_entry)
+        db.session.commit()
+        
+        service = CachedFlightAPIService('key', 'secret')
+        result = service.get_flight_price('London', 'Madrid', '2023-12-01')
+        
+        self.assertEqual(result, {'price': 180, 'link': 'http://new'})
+
+    
+    @patch('services.football_api.FootballAPIService.get_teams_by_league')
+    def test_provenance_records_miss_then_hit(self, mock_fetch):
+        mock_fetch.return_value = [{'id': 1}]
+        service = CachedFootballAPIService('test_api_key')
+        
+        with track_cache_provenance() as first:
+            service.get_teams_by_league(39)
+        with track_cache_provenance() as second:
+            service.get_teams_by_league(39)
+        
+        self.assertEqual(first.lookups, [('teams_league_39', 'miss')])
+        self.assertEqual(first.summary, 'MISS')
+        self.assertEqual(second.lookups, [('teams_league_39', 'hit')])
+        self.assertTrue(second.cache_hit)
+    
+    def test_provenance_propagates_to_executor_threads(self):
+        executor = LookupExecutor(self.app, max_workers=2)
+        with track_cache_provenance() as provenance:
+            executor.submit(record_lookup, 'hotel_Madrid_2023-12-01', 'hit').result()
+        executor.shutdown()
+        
+        self.assertEqual(provenance.statuses(), {'hotel_Madrid_2023-12-01': 'hit'})
+
+
+class TestSingleFlight(unittest.TestCase):
+    def test_followers_share_leader_result(self):
+        flight = SingleFlight()
+        calls = []
+        results = []
+        
+        def fetch():
+            calls.append(1)
+            time.sleep(0.1)
+            return 'value'
+        
+        threads = [threading.Thread(target=lambda: results.append(flight.do('key', fetch))) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, ['value'] * 4)
+        self.assertEqual(flight.stats(), {'in_flight': 0, 'executions': 1, 'coalesced': 3})
+    
+    def test_errors_are_shared_and_key_released(self):
+        flight = SingleFlight()
+        
+        def fail():
+            raise ValueError('upstream error')
+        
+        with self.assertRaises(ValueError):
+            flight.do('key', fail)
+        self.assertEqual(flight.do('key', lambda: 'retry'), 'retry')
+
+
+class TestMemoryCache(unittest.TestCase):
+    def test_get_and_set(self):
+        cache = MemoryCache(max_entries=10)
+        cache.set('key', {'a': 1}, 60)
+        self.assertEqual(cache.get('key'), {'a': 1})
+        self.assertIsNone(cache.get('missing'))
+        
+        stats = cache.stats()
+        self.assertEqual(stats['hits'], 1)
+        self.assertEqual(stats['misses'], 1)
+        self.assertEqual(stats['hit_rate'], 50.0)
+    
+    def test_lru_eviction(self):
+        cache = MemoryCache(max_entries=2)
+        cache.set('a', 1, 60)
+        cache.set('b', 2, 60)
+        cache.get('a')
+        cache.set('c', 3, 60)
+        
+        self.assertEqual(cache.get('a'), 1)
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('c'), 3)
+        self.assertEqual(cache.stats()['evictions'], 1)
+    
+    def test_ttl_expiry(self):
+        cache = MemoryCache()
+        with patch('models.memory_cache.time.monotonic', return_value=1000):
+            cache.set('key', 'value', 10)
+        with patch('models.memory_cache.time.monotonic', return_value=1011):
+            self.assertIsNone(cache.get('key'))
+        self.assertEqual(cache.stats()['expirations'], 1)
+    
+    def test_ttl_is_capped(self):
+        cache = MemoryCache(max_ttl_seconds=5)
+        with patch('models.memory_cache.time.monotonic', return_value=1000):
+            cache.set('key', 'value', 3600)
+        with patch('models.memory_cache.time.monotonic', return_value=1006):
+            self.assertIsNone(cache.get('key'))
+    
+    def test_invalidate_and_clear(self):
+        cache = MemoryCache()
+        cache.set('a', 1, 60)
+        cache.set('b', 2, 60)
+        cache.invalidate('a')
+        self.assertIsNone(cache.get('a'))
+        self.assertEqual(cache.clear(), 1)
+        self.assertEqual(cache.stats()['entries'], 0)
 
 
 if __name__ == '__main__':
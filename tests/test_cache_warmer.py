@@ -0,0 +1,142 @@
+import unittest
+import sys
+import os
+from unittest.mock import patch
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app import app
+from models.cache import db, APICache
+from models.memory_cache import memory_cache
+from services.cache_warmer import CacheWarmer
+from services.cached_football_api import CachedFootballAPIService
+from services.cached_flight_api import CachedFlightAPIService
+from services.cached_hotel_api import CachedHotelAPIService
+from services.http_client import HTTPClient
+
+
+TEAMS = {39: [{'id': 10, 'name': 'A'}, {'id': 20, 'name': 'B'}]}
+MATCHES = {
+    10: [{'id': 1, 'city': 'London'}, {'id': 2, 'city': 'Madrid'}],
+    20: [{'id': 2, 'city': 'Madrid'}]
+}
+DETAILS = {
+    1: {'id': 1, 'city': 'London', 'date': '2023-11-04'},
+    2: {'id': 2, 'city': 'Madrid', 'date': '2023-11-11'}
+}
+
+
+@patch('services.hotel_api.HotelAPIService.get_hotel_price', side_effect=lambda city, date: {'price': 200})
+@patch('services.flight_api.FlightAPIService.get_flight_price', side_effect=lambda origin, city, date: {'price': 100})
+@patch('services.football_api.FootballAPIService.get_match_details', side_effect=lambda match_id: DETAILS[match_id])
+@patch('services.football_api.FootballAPIService.get_upcoming_matches', side_effect=lambda team_id, match_type: MATCHES[team_id])
+@patch('services.football_api.FootballAPIService.get_teams_by_league', side_effect=lambda league_id: TEAMS.get(league_id, []))
+class TestCacheWarmer(unittest.TestCase):
+    def setUp(self):
+        self.app = app
+        self.app.config['TESTING'] = True
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+        memory_cache.clear()
+        
+        self.football_service = CachedFootballAPIService('test_api_key')
+        self.flight_service = CachedFlightAPIService('key', 'secret')
+        self.hotel_service = CachedHotelAPIService('key')
+    
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+    
+    def warmer(self, **kwargs):
+        return CacheWarmer(
+            self.app, self.football_service, self.flight_service, self.hotel_service,
+            ['London', 'Paris'], max_workers=4, **kwargs
+        )
+    
+    def test_warms_every_lookup(self, mock_teams, mock_matches, mock_details, mock_flight, mock_hotel):
+        progress = []
+        
+        report = self.warmer(progress=lambda *args: progress.append(args)).run()
+        
+        # 5 leagues, 2 teams x 3 match types, 2 matches, 3 flights, 2 hotels
+        self.assertEqual(report['upstream_lookups'], {'football': 13, 'flight': 3, 'hotel': 2})
+        self.assertEqual(report['filled'], 14)
+        self.assertEqual(report['cache_entries_after'] - report['cache_entries_before'], 14)
+        self.assertEqual(mock_flight.call_count, 3)
+        self.assertIn(('quotes', 5, 5), progress)
+        self.assertIsNotNone(APICache.get_cached('hotel_Madrid_2023-11-11'))
+    
+    def test_second_run_is_served_from_cache(self, mock_teams, mock_matches, mock_details, mock_flight, mock_hotel):
+        self.warmer().run()
+        memory_cache.clear()
+        
+        report = self.warmer().run()
+        
+        # Leagues without teams are not cached and are looked up again
+        self.assertEqual(report['filled'], 0)
+        self.assertEqual(report['hits'], 14)
+        self.assertEqual(report['upstream_lookups'], {'football': 4, 'flight': 0, 'hotel': 0})
+    
+    def test_budget_limits_upstream_lookups(self, mock_teams, mock_matches, mock_details, mock_flight, mock_hotel):
+        report = self.warmer(budgets={'flight': 1, 'hotel': 0}).run()
+        
+        self.assertEqual(mock_flight.call_count, 1)
+        mock_hotel.assert_not_called()
+        self.assertEqual(report['skipped'], 4)
+        self.assertEqual(report['upstream_lookups']['flight'], 1)
+    
+    def test_cli_command(self, mock_teams, mock_matches, mock_details, mock_flight, mock_hotel):
+        with patch('app.football_service', self.football_service), \
+             patch('app.flight_service', self.flight_service), \
+             patch('app.hotel_service', self.hotel_service):
+            result = self.app.test_cli_runner().invoke(args=['warm-cache', '--origin', 'London', '--budget', 'hotel:1'])
+        
+        self.assertEqual(result.exit_code, 0, result.output)
+        self.assertIn('[teams] 5/5', result.output)
+        self.assertIn('Filled 11 cache entries', result.output)
+        self.assertIn('hotel 1/1', result.output)
+
+
+
+@patch('services.football_api.FootballAPIService.get_match_details', side_effect=lambda match_id: DETAILS[match_id])
+@patch('services.football_api.FootballAPIService.get_upcoming_matches', side_effect=lambda team_id, match_type: MATCHES[team_id])
+@patch('services.football_api.FootballAPIService.get_teams_by_league', side_effect=lambda league_id: TEAMS.get(league_id, []))
+class TestCacheWarmerUpstreamDown(unittest.TestCase):
+    def setUp(self):
+        self.app = app
+        self.app.config['TESTING'] = True
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+        memory_cache.clear()
+        # Nothing listens on port 1: every flight and hotel call fails and
+        # the services fall back to estimates
+        self.http = HTTPClient(max_retries=0, connect_timeout=1)
+        self.flight_service = CachedFlightAPIService('key', 'secret', self.http, base_url='http://127.0.0.1:1')
+        self.hotel_service = CachedHotelAPIService('key', self.http, base_url='http://127.0.0.1:1')
+    
+    def tearDown(self):
+        self.http.close()
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+    
+    def test_estimated_quotes_count_as_failed(self, mock_teams, mock_matches, mock_details):
+        warmer = CacheWarmer(
+            self.app, CachedFootballAPIService('test_api_key'), self.flight_service, self.hotel_service,
+            ['London'], max_workers=2
+        )
+        
+        report = warmer.run()
+        
+        # Football lookups: 1 league with teams, 6 match lists, 2 details;
+        # 1 flight (Madrid) and 2 hotel quotes fail
+        self.assertEqual(report['filled'], 9)
+        self.assertEqual(report['failed'], 3)
+        self.assertEqual(report['cache_entries_after'] - report['cache_entries_before'], 9)
+        self.assertIsNone(APICache.get_cached('hotel_Madrid_2023-11-11'))
+
+
+if __name__ == '__main__':
+    unittest.main()
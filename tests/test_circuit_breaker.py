@@ -0,0 +1,160 @@
+import unittest
+import time
+import sys
+import os
+from unittest.mock import Mock, patch
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app import app
+from models.cache import db, APICache
+from models.memory_cache import memory_cache
+from services.circuit_breaker import CircuitBreaker, CircuitBreakerRegistry, CircuitOpen
+from services.http_client import HTTPClient
+from services.cached_flight_api import CachedFlightAPIService
+from services.hotel_api import HotelAPIService
+
+
+def response(status_code):
+    return Mock(status_code=status_code, headers={})
+
+
+class TestCircuitBreaker(unittest.TestCase):
+    def test_opens_after_consecutive_failures(self):
+        breaker = CircuitBreaker('flight:/offers', failure_threshold=3, reset_timeout=60)
+        
+        for _ in range(2):
+            breaker.before_call()
+            breaker.record_failure()
+        breaker.before_call()
+        breaker.record_success()
+        for _ in range(3):
+            breaker.before_call()
+            breaker.record_failure()
+        
+        self.assertEqual(breaker.state, CircuitBreaker.OPEN)
+        with self.assertRaises(CircuitOpen):
+            breaker.before_call()
+        self.assertEqual(breaker.stats()['rejected'], 1)
+        self.assertEqual(breaker.stats()['opened'], 1)
+    
+    def test_half_open_allows_single_trial(self):
+        breaker = CircuitBreaker('hotel:/search', failure_threshold=1, reset_timeout=0.05)
+        breaker.before_call()
+        breaker.record_failure()
+        time.sleep(0.06)
+        
+        self.assertEqual(breaker.state, CircuitBreaker.HALF_OPEN)
+        breaker.before_call()
+        with self.assertRaises(CircuitOpen):
+            breaker.before_call()
+        
+        breaker.record_success()
+        self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
+    
+    def test_failed_trial_reopens(self):
+        breaker = CircuitBreaker('hotel:/search', failure_threshold=3, reset_timeout=0.2)
+        for _ in range(3):
+            breaker.before_call()
+            breaker.record_failure()
+        time.sleep(0.21)
+        
+        breaker.before_call()
+        breaker.record_failure()
+        
+        self.assertEqual(breaker.state, CircuitBreaker.OPEN)
+        self.assertGreater(breaker.stats()['retry_in_seconds'], 0)
+    
+    def test_cancelled_trial_frees_slot(self):
+        breaker = CircuitBreaker('hotel:/search', failure_threshold=1, reset_timeout=0)
+        breaker.before_call()
+        breaker.record_failure()
+        
+        breaker.before_call()
+        breaker.cancel()
+        breaker.before_call()
+        
+        self.assertEqual(breaker.state, CircuitBreaker.HALF_OPEN)
+
+
+class TestHTTPClientCircuitBreaker(unittest.TestCase):
+    def setUp(self):
+        self.client = HTTPClient(max_retries=0)
+        self.client.circuit_breakers = CircuitBreakerRegistry(failure_threshold=2, reset_timeout=60)
+    
+    @patch('services.http_client.requests.Session.get')
+    def test_server_errors_open_endpoint_circuit(self, mock_get):
+        mock_get.return_value = response(503)
+        
+        for _ in range(2):
+            self.client.get('https://api.example.com/v1/hotels/search', provider='hotel')
+        with self.assertRaises(CircuitOpen):
+            self.client.get('https://api.example.com/v1/hotels/search', provider='hotel')
+        
+        self.assertEqual(mock_get.call_count, 2)
+        mock_get.return_value = response(200)
+        self.client.get('https://api.example.com/v1/hotels/locations', provider='hotel')
+        states = {name: stats['state'] for name, stats in self.client.circuit_breakers.stats().items()}
+        self.assertEqual(states, {'hotel:/v1/hotels/locations': 'closed', 'hotel:/v1/hotels/search': 'open'})
+    
+    @patch('services.http_client.requests.Session.get')
+    def test_client_errors_do_not_count(self, mock_get):
+        mock_get.return_value = response(404)
+        for _ in range(3):
+            self.client.get('https://api.example.com/teams', provider='football')
+        self.assertEqual(self.client.circuit_breakers.get('football:/teams').state, 'closed')
+    
+    @patch('services.http_client.requests.Session.get')
+    def test_connection_errors_count(self, mock_get):
+        mock_get.side_effect = ConnectionError('down')
+        for _ in range(2):
+            with self.assertRaises(ConnectionError):
+                self.client.get('https://api.example.com/teams', provider='football')
+        self.assertEqual(self.client.circuit_breakers.get('football:/teams').state, 'open')
+    
+    @patch('services.http_client.requests.Session.get')
+    def test_open_circuit_returns_estimate_immediately(self, mock_get):
+        mock_get.side_effect = ConnectionError('down')
+        service = HotelAPIService('key', self.client)
+        
+        for _ in range(2):
+            service.get_hotel_price('Madrid', '2023-12-01')
+        start = time.perf_counter()
+        hotel = service.get_hotel_price('Madrid', '2023-12-01')
+        
+        self.assertLess(time.perf_counter() - start, 0.05)
+        self.assertEqual(hotel['price'], 200)
+        self.assertTrue(hotel['estimated'])
+        self.assertEqual(mock_get.call_count, 2)
+
+
+class TestEstimatesNotCached(unittest.TestCase):
+    def setUp(self):
+        self.app = app
+        self.app.config['TESTING'] = True
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+        memory_cache.clear()
+    
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+    
+    @patch('services.flight_api.FlightAPIService.get_flight_price')
+    def test_estimate_is_returned_but_not_cached(self, mock_fetch):
+        mock_fetch.return_value = {'price': 200, 'link': 'x', 'estimated': True}
+        service = CachedFlightAPIService('key', 'secret')
+        
+        first = service.get_flight_price('London', 'Madrid', '2023-12-01')
+        mock_fetch.return_value = {'price': 180, 'link': 'x'}
+        second = service.get_flight_price('London', 'Madrid', '2023-12-01')
+        
+        self.assertTrue(first['estimated'])
+        self.assertEqual(second, {'price': 180, 'link': 'x'})
+        self.assertEqual(mock_fetch.call_count, 2)
+        self.assertIsNotNone(APICache.get_cached('flight_London_Madrid_2023-12-01'))
+
+
+if __name__ == '__main__':
+    unittest.main()
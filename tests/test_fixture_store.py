@@ -0,0 +1,235 @@
+import unittest
+import sys
+import os
+import time
+from unittest.mock import Mock, patch
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app import app
+from models.cache import db
+from models.memory_cache import memory_cache
+from services.fixture_store import FixtureStore, fit_to_quota
+from services.rate_limiter import _priority
+from services.cached_football_api import CachedFootballAPIService
+from services.cache_provenance import track_cache_provenance
+
+
+def fixture(fixture_id, date, home_id, away_id, status='FT', league='Premier League'):
+    return {
+        'id': fixture_id,
+        'date': f'{date}T15:00:00+00:00',
+        'status': status,
+        'home_team_id': home_id,
+        'home_team': f'Team {home_id}',
+        'away_team_id': away_id,
+        'away_team': f'Team {away_id}',
+        'venue': f'Stadium {home_id}',
+        'city': f'City {home_id}',
+        'league': league
+    }
+
+
+LEAGUE_FIXTURES = {
+    39: [
+        fixture(1, '2023-11-04', 10, 20),
+        fixture(2, '2023-11-11', 20, 10),
+        fixture(3, '2023-12-02', 10, 30),
+        fixture(4, '2023-11-18', 30, 10, status='PST')
+    ],
+    140: [
+        fixture(5, '2023-11-05', 50, 60, league='La Liga')
+    ]
+}
+
+
+class TestFixtureStore(unittest.TestCase):
+    def setUp(self):
+        self.fetch = Mock(side_effect=lambda league_id, *window: list(LEAGUE_FIXTURES[league_id]))
+        self.store = FixtureStore(self.fetch, [39, 140], lambda: ('2023-11-01', '2023-11-30'))
+    
+    def test_loads_each_league_once(self):
+        self.store.ensure_loaded()
+        self.store.ensure_loaded()
+        
+        self.assertEqual(self.fetch.call_count, 2)
+        self.assertEqual(self.store.stats()['fixtures'], 5)
+        self.assertEqual(self.store.stats()['teams'], 5)
+        self.assertEqual(self.store.get_fixture('5')['league'], 'La Liga')
+        self.assertIsNone(self.store.get_fixture(99))
+    
+    def test_team_fixtures_filters(self):
+        self.store.ensure_loaded()
+        
+        all_matches = self.store.team_fixtures(10)
+        home = self.store.team_fixtures(10, 'home')
+        in_window = self.store.team_fixtures('10', 'all', '2023-11-04', '2023-11-30', 'FT')
+        
+        self.assertEqual([f['id'] for f in all_matches], [1, 2, 4, 3])
+        self.assertEqual([f['id'] for f in home], [1, 3])
+        self.assertEqual([f['id'] for f in in_window], [1, 2])
+        self.assertIsNone(self.store.team_fixtures(999))
+    
+    def test_incremental_refresh_merges_window(self):
+        self.store.ensure_loaded()
+        self.store.refresh_seconds = 0
+        rescheduled = fixture(2, '2023-11-12', 20, 10)
+        self.fetch.side_effect = lambda league_id, *window: [rescheduled] if league_id == 39 else []
+        
+        self.store.ensure_loaded()
+        
+        self.fetch.assert_any_call(39, '2023-11-01', '2023-11-30')
+        self.assertEqual(self.store.get_fixture(2)['date'], '2023-11-12T15:00:00+00:00')
+        self.assertEqual(self.store.stats()['fixtures'], 5)
+        self.assertEqual(self.store.stats()['incremental_loads'], 2)
+    
+    def test_full_refresh_replaces_league(self):
+        self.store.ensure_loaded()
+        self.store.full_refresh_seconds = 0
+        self.fetch.side_effect = lambda league_id, *window: LEAGUE_FIXTURES[league_id][:1]
+        
+        self.store.ensure_loaded()
+        
+        self.assertEqual(self.store.stats()['fixtures'], 2)
+        self.assertEqual(self.store.stats()['full_loads'], 4)
+    
+    def test_failed_first_load_backs_off(self):
+        self.fetch.side_effect = lambda league_id, *window: None
+        
+        self.store.ensure_loaded()
+        self.store.ensure_loaded()
+        
+        self.assertEqual(self.fetch.call_count, 2)
+        self.assertEqual(self.store.stats()['failures'], 2)
+        self.assertIsNone(self.store.team_fixtures(10))
+    
+    def test_loads_at_background_priority(self):
+        priorities = []
+        self.fetch.side_effect = lambda league_id, *window: priorities.append(_priority.get()) or []
+        
+        self.store.ensure_loaded()
+        
+        self.assertEqual(priorities, ['background', 'background'])
+    
+    def test_background_thread_loads_leagues(self):
+        self.store.poll_seconds = 0.01
+        self.store.start()
+        try:
+            for _ in range(100):
+                if self.store.stats()['leagues_loaded'] == 2:
+                    break
+                time.sleep(0.01)
+        finally:
+            self.store.stop()
+        
+        self.assertEqual(self.store.stats()['leagues_loaded'], 2)
+        self.assertFalse(self.store.stats()['running'])
+    
+    def test_fit_to_quota(self):
+        # 5 full loads a day plus 4 window refetches per league fit in 25 calls
+        self.assertEqual(fit_to_quota([39, 140, 135, 78, 61], 24, 30, 25), ([39, 140, 135, 78, 61], 360))
+        self.assertEqual(fit_to_quota([39, 140, 135, 78, 61], 24, 720, 25), ([39, 140, 135, 78, 61], 720))
+        self.assertEqual(fit_to_quota([39, 140, 135, 78, 61], 24, 30, 7), ([39, 140, 135, 78, 61], 1440))
+        self.assertEqual(fit_to_quota([39, 140, 135, 78, 61], 24, 30, 3), ([39, 140, 135], 1440))
+        self.assertEqual(fit_to_quota([39], 12, 30, 1), ([], 30))
+
+
+class TestCachedFootballFixtureStore(unittest.TestCase):
+    def setUp(self):
+        self.app = app
+        self.app.config['TESTING'] = True
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+        memory_cache.clear()
+        
+        self.service = CachedFootballAPIService('test_api_key')
+        self.service.upcoming_window = lambda: ('2023-11-01', '2023-11-30')
+        self.service.fixture_store = FixtureStore(
+            self.service.get_league_fixtures, [39, 140], self.service.upcoming_window
+        )
+    
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+    
+    @patch('services.football_api.FootballAPIService.get_upcoming_matches')
+    @patch('services.football_api.FootballAPIService.get_league_fixtures')
+    def test_upcoming_matches_from_index(self, mock_league, mock_team):
+        mock_league.side_effect = lambda league_id: LEAGUE_FIXTURES[league_id]
+        
+        with track_cache_provenance() as provenance:
+            self.service.fixture_store.ensure_loaded()
+            for team_id in (10, 20, 30):
+                for match_type in ('all', 'home', 'away'):
+                    self.service.get_upcoming_matches(team_id, match_type)
+            matches = self.service.get_upcoming_matches(10, 'away')
+        
+        self.assertEqual(matches, [{
+            'id': 2,
+            'date': '2023-11-11T15:00:00+00:00',
+            'home_team': 'Team 20',
+            'away_team': 'Team 10',
+            'venue': 'Stadium 20',
+            'city': 'City 20',
+            'is_home': False
+        }])
+        self.assertEqual(mock_league.call_count, 2)
+        mock_team.assert_not_called()
+        self.assertEqual(provenance.statuses()['matches_10_away'], 'index')
+        self.assertEqual(provenance.statuses()['league_fixtures_39'], 'miss')
+    
+    @patch('services.football_api.FootballAPIService.get_match_details')
+    @patch('services.football_api.FootballAPIService.get_league_fixtures')
+    def test_match_details_from_index(self, mock_league, mock_details):
+        mock_league.side_effect = lambda league_id: LEAGUE_FIXTURES[league_id]
+        self.service.fixture_store.ensure_loaded()
+        
+        details = self.service.get_match_details('5')
+        
+        self.assertEqual(details['league'], 'La Liga')
+        self.assertEqual(details['city'], 'City 50')
+        mock_details.assert_not_called()
+    
+    @patch('services.football_api.FootballAPIService.get_upcoming_matches')
+    @patch('services.football_api.FootballAPIService.get_league_fixtures')
+    def test_unknown_team_falls_back_to_team_lookup(self, mock_league, mock_team):
+        mock_league.side_effect = lambda league_id: LEAGUE_FIXTURES[league_id]
+        mock_team.return_value = [{'id': 7}]
+        self.service.fixture_store.ensure_loaded()
+        
+        matches = self.service.get_upcoming_matches(999)
+        
+        self.assertEqual(matches, [{'id': 7}])
+        mock_team.assert_called_once_with(999, 'all')
+    
+    @patch('services.football_api.FootballAPIService.get_upcoming_matches')
+    @patch('services.football_api.FootballAPIService.get_league_fixtures')
+    def test_requests_never_load_the_store(self, mock_league, mock_team):
+        mock_team.return_value = [{'id': 7}]
+        
+        self.assertEqual(self.service.get_upcoming_matches(10), [{'id': 7}])
+        mock_league.assert_not_called()
+    
+    @patch('services.football_api.FootballAPIService.get_league_fixtures')
+    def test_league_fixtures_are_cached(self, mock_league):
+        mock_league.side_effect = lambda league_id, *window: LEAGUE_FIXTURES[league_id]
+        self.service.fixture_store.ensure_loaded()
+        self.service.get_league_fixtures(39, '2023-11-01', '2023-11-30')
+        
+        # Another worker sharing the cache backend
+        memory_cache.clear()
+        service = CachedFootballAPIService('test_api_key')
+        service.fixture_store = FixtureStore(service.get_league_fixtures, [39, 140], self.service.upcoming_window)
+        service.fixture_store.ensure_loaded()
+        service.fixture_store.refresh_seconds = 0
+        service.fixture_store.ensure_loaded()
+        details = service.get_match_details(1)
+        
+        self.assertEqual(details['id'], 1)
+        self.assertEqual(service.fixture_store.stats()['incremental_loads'], 2)
+        self.assertEqual(mock_league.call_count, 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
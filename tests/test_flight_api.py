@@ -0,0 +1,137 @@
+import unittest
+import asyncio
+import threading
+import time
+from unittest.mock import Mock, patch
+from services.flight_api import FlightAPIService
+from services.token_manager import OAuthTokenManager
+
+
+def token_response(token, expires_in=1799):
+    response = Mock()
+    response.json.return_value = {'access_token': token, 'expires_in': expires_in}
+    response.raise_for_status = Mock()
+    return response
+
+
+def offers_response(status_code=200, prices=(250.0, 199.5)):
+    response = Mock()
+    response.status_code = status_code
+    response.json.return_value = {'data': [{'price': {'total': str(p)}} for p in prices]}
+    response.raise_for_status = Mock()
+    return response
+
+
+class TestOAuthTokenManager(unittest.TestCase):
+    def setUp(self):
+        self.http = Mock()
+        self.manager = OAuthTokenManager(self.http, 'https://auth/token', 'id', 'secret', refresh_margin_seconds=60)
+    
+    def test_token_reused_until_refresh_margin(self):
+        self.http.post.return_value = token_response('token-1', expires_in=1799)
+        
+        with patch('services.token_manager.time.monotonic', return_value=1000):
+            self.assertEqual(self.manager.get_token(), 'token-1')
+        with patch('services.token_manager.time.monotonic', return_value=2700):
+            self.assertEqual(self.manager.get_token(), 'token-1')
+        
+        self.assertEqual(self.http.post.call_count, 1)
+    
+    def test_token_refreshed_before_expiry(self):
+        self.http.post.side_effect = [token_response('token-1', 1799), token_response('token-2', 1799)]
+        
+        with patch('services.token_manager.time.monotonic', return_value=1000):
+            self.manager.get_token()
+        with patch('services.token_manager.time.monotonic', return_value=2760):
+            self.assertEqual(self.manager.get_token(), 'token-2')
+        
+        self.assertEqual(self.manager.refreshes, 2)
+    
+    def test_expired_token_refreshed(self):
+        self.http.post.side_effect = [token_response('token-1', 10), token_response('token-2', 1799)]
+        
+        with patch('services.token_manager.time.monotonic', return_value=1000):
+            self.manager.get_token()
+        with patch('services.token_manager.time.monotonic', return_value=1020):
+            self.assertEqual(self.manager.get_token(), 'token-2')
+    
+    def test_concurrent_callers_share_one_refresh(self):
+        def slow_post(*args, **kwargs):
+            time.sleep(0.1)
+            return token_response('token-1')
+        self.http.post.side_effect = slow_post
+        tokens = []
+        
+        threads = [threading.Thread(target=lambda: tokens.append(self.manager.get_token())) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        self.assertEqual(tokens, ['token-1'] * 5)
+        self.assertEqual(self.http.post.call_count, 1)
+    
+    def test_async_refresh_runs_off_the_loop(self):
+        threads = []
+        self.http.post.side_effect = lambda *args, **kwargs: threads.append(threading.get_ident()) or token_response('token-1')
+        
+        async def get_twice():
+            tokens = [await self.manager.get_token_async(), await self.manager.get_token_async()]
+            return tokens, threading.get_ident()
+        
+        tokens, loop_thread = asyncio.run(get_twice())
+        
+        self.assertEqual(tokens, ['token-1', 'token-1'])
+        self.assertEqual(len(threads), 1)
+        self.assertNotEqual(threads[0], loop_thread)
+    
+    def test_invalidate_only_matching_token(self):
+        self.http.post.return_value = token_response('token-1')
+        self.manager.get_token()
+        
+        self.manager.invalidate('other-token')
+        self.manager.get_token()
+        self.assertEqual(self.http.post.call_count, 1)
+        
+        self.manager.invalidate('token-1')
+        self.manager.get_token()
+        self.assertEqual(self.http.post.call_count, 2)
+
+
+class TestFlightAPIService(unittest.TestCase):
+    def setUp(self):
+        self.http = Mock()
+        self.api_service = FlightAPIService('key', 'secret', self.http)
+    
+    def test_get_flight_price_success(self):
+        self.http.post.return_value = token_response('token-1')
+        self.http.get.return_value = offers_response()
+        
+        result = self.api_service.get_flight_price('London', 'Madrid', '2023-12-01T15:00:00+00:00')
+        
+        self.assertEqual(result['price'], 199.5)
+        headers = self.http.get.call_args.kwargs['headers']
+        self.assertEqual(headers['Authorization'], 'Bearer token-1')
+    
+    def test_retries_once_after_401(self):
+        self.http.post.side_effect = [token_response('token-1'), token_response('token-2')]
+        self.http.get.side_effect = [offers_response(status_code=401), offers_response()]
+        
+        result = self.api_service.get_flight_price('London', 'Madrid', '2023-12-01T15:00:00+00:00')
+        
+        self.assertEqual(result['price'], 199.5)
+        self.assertEqual(self.http.post.call_count, 2)
+        headers = self.http.get.call_args.kwargs['headers']
+        self.assertEqual(headers['Authorization'], 'Bearer token-2')
+    
+    def test_token_error_falls_back_to_estimate(self):
+        self.http.post.side_effect = Exception('auth down')
+        
+        result = self.api_service.get_flight_price('London', 'Madrid', '2023-12-01T15:00:00+00:00')
+        
+        self.assertEqual(result['price'], 200)
+        self.http.get.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
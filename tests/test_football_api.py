@@ -13,7 +13,7 @@ class TestFootballAPIService(unittest.TestCase):
         self.assertIn('name', leagues[0])
         self.assertIn('country', leagues[0])
     
-    @patch('services.football_api.requests.get')
+    @patch('services.http_client.requests.Session.get')
     def test_get_teams_by_league_success(self, mock_get):
         mock_response = Mock()
         mock_response.json.return_value = {
@@ -31,13 +31,13 @@ class TestFootballAPIService(unittest.TestCase):
         self.assertEqual(len(teams), 1)
         self.assertEqual(teams[0]['name'], 'Test Team')
     
-    @patch('services.football_api.requests.get')
+    @patch('services.http_client.requests.Session.get')
     def test_get_teams_by_league_error(self, mock_get):
         mock_get.side_effect = Exception('API Error')
         teams = self.api_service.get_teams_by_league(39)
         self.assertEqual(teams, [])
     
-    @patch('services.football_api.requests.get')
+    @patch('services.http_client.requests.Session.get')
     def test_get_upcoming_matches_success(self, mock_get):
         mock_response = Mock()
         mock_response.json.return_value = {
@@ -63,7 +63,7 @@ class TestFootballAPIService(unittest.TestCase):
         self.assertEqual(matches[0]['home_team'], 'Home Team')
         self.assertTrue(matches[0]['is_home'])
     
-    @patch('services.football_api.requests.get')
+    @patch('services.http_client.requests.Session.get')
     def test_get_upcoming_matches_filter_home(self, mock_get):
         mock_response = Mock()
         mock_response.json.return_value = {
@@ -87,6 +87,41 @@ class TestFootballAPIService(unittest.TestCase):
         matches = self.api_service.get_upcoming_matches(200, match_type='home')
         self.assertEqual(len(matches), 0)
 
+    
+    @patch('services.http_client.requests.Session.get')
+    def test_get_league_fixtures(self, mock_get):
+        mock_response = Mock()
+        mock_response.json.return_value = {
+            'response': [
+                {
+                    'fixture': {
+                        'id': 1,
+                        'date': '2023-12-01T15:00:00+00:00',
+                        'status': {'short': 'FT'},
+                        'venue': {'name': 'Stadium', 'city': 'City'}
+                    },
+                    'league': {'name': 'Premier League'},
+                    'teams': {
+                        'home': {'id': 100, 'name': 'Home Team'},
+                        'away': {'id': 200, 'name': 'Away Team'}
+                    }
+                }
+            ]
+        }
+        mock_response.raise_for_status = Mock()
+        mock_get.return_value = mock_response
+        
+        fixtures = self.api_service.get_league_fixtures(39, '2023-12-01', '2023-12-31')
+        
+        self.assertEqual(fixtures[0]['home_team_id'], 100)
+        self.assertEqual(fixtures[0]['status'], 'FT')
+        params = mock_get.call_args[1]['params']
+        self.assertEqual(params, {'league': 39, 'season': 2023, 'from': '2023-12-01', 'to': '2023-12-31'})
+    
+    @patch('services.http_client.requests.Session.get')
+    def test_get_league_fixtures_error(self, mock_get):
+        mock_get.side_effect = Exception('API Error')
+        self.assertIsNone(self.api_service.get_league_fixtures(39))
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
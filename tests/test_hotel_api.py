@@ -0,0 +1,90 @@
+import unittest
+import sys
+import os
+from unittest.mock import Mock
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app import app
+from models.cache import db
+from models.hotel_location import HotelLocation
+from models.memory_cache import memory_cache
+from services.hotel_api import HotelAPIService
+from services.cached_hotel_api import CachedHotelAPIService
+
+
+def json_response(payload):
+    response = Mock()
+    response.json.return_value = payload
+    response.raise_for_status = Mock()
+    return response
+
+
+LOCATIONS = [{'dest_id': '-372490', 'dest_type': 'city'}]
+SEARCH = {'result': [{'min_total_price': 180}, {'min_total_price': 140}]}
+
+
+class TestHotelAPIService(unittest.TestCase):
+    def test_get_hotel_price_resolves_location_then_searches(self):
+        http = Mock()
+        http.get.side_effect = [json_response(LOCATIONS), json_response(SEARCH)]
+        service = HotelAPIService('key', http)
+        
+        result = service.get_hotel_price('Barcelona', '2023-12-01T15:00:00+00:00')
+        
+        self.assertEqual(result['price'], 140)
+        self.assertEqual(http.get.call_count, 2)
+        self.assertEqual(http.get.call_args.kwargs['params']['dest_id'], '-372490')
+    
+    def test_unknown_location_falls_back_to_estimate(self):
+        http = Mock()
+        http.get.return_value = json_response([])
+        service = HotelAPIService('key', http)
+        
+        result = service.get_hotel_price('Barcelona', '2023-12-01T15:00:00+00:00')
+        
+        self.assertEqual(result['price'], 240)
+        self.assertEqual(http.get.call_count, 1)
+
+
+class TestCachedHotelAPIService(unittest.TestCase):
+    def setUp(self):
+        self.app_context = app.app_context()
+        self.app_context.push()
+        db.create_all()
+        memory_cache.clear()
+        HotelLocation.query.delete()
+        db.session.commit()
+    
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+    
+    def test_dest_id_resolved_once_per_city(self):
+        http = Mock()
+        http.get.side_effect = [json_response(LOCATIONS), json_response(SEARCH), json_response(SEARCH)]
+        service = CachedHotelAPIService('key', http)
+        service.cache_enabled = False
+        
+        service.get_hotel_price('Barcelona', '2023-12-01T15:00:00+00:00')
+        service.get_hotel_price('Barcelona', '2023-12-08T15:00:00+00:00')
+        
+        self.assertEqual(http.get.call_count, 3)
+        self.assertEqual(HotelLocation.get_all(), {'Barcelona': '-372490'})
+    
+    def test_dest_ids_loaded_from_database(self):
+        HotelLocation.save('Barcelona', '-372490')
+        http = Mock()
+        http.get.return_value = json_response(SEARCH)
+        service = CachedHotelAPIService('key', http)
+        service.cache_enabled = False
+        
+        self.assertEqual(service.load_dest_ids(), 1)
+        result = service.get_hotel_price('Barcelona', '2023-12-01T15:00:00+00:00')
+        
+        self.assertEqual(result['price'], 140)
+        self.assertEqual(http.get.call_count, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,154 @@
+import unittest
+import json
+import threading
+import sys
+import os
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import Mock, patch
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from services.http_client import HTTPClient
+from services.rate_limiter import RateLimited
+
+
+class FlakyHandler(BaseHTTPRequestHandler):
+    failures_left = 0
+    requests_seen = 0
+    
+    def do_GET(self):
+        FlakyHandler.requests_seen += 1
+        if FlakyHandler.failures_left > 0:
+            FlakyHandler.failures_left -= 1
+            self.send_response(503)
+            self.end_headers()
+            return
+        
+        body = json.dumps({'ok': True}).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def do_POST(self):
+        FlakyHandler.requests_seen += 1
+        self.send_response(503)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+    
+    def log_message(self, format, *args):
+        pass
+
+
+class TestHTTPClient(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(('127.0.0.1', 0), FlakyHandler)
+        cls.base_url = f"http://127.0.0.1:{cls.server.server_address[1]}"
+        cls.thread = threading.Thread(target=cls.server.serve_forever, daemon=True)
+        cls.thread.start()
+    
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+    
+    def setUp(self):
+        FlakyHandler.failures_left = 0
+        FlakyHandler.requests_seen = 0
+    
+    def test_get_retries_transient_errors(self):
+        FlakyHandler.failures_left = 2
+        client = HTTPClient(max_retries=2, backoff_factor=0)
+        
+        response = client.get(f"{self.base_url}/teams")
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {'ok': True})
+        self.assertEqual(FlakyHandler.requests_seen, 3)
+        client.close()
+    
+    def test_each_attempt_takes_a_token(self):
+        FlakyHandler.failures_left = 2
+        client = HTTPClient(max_retries=2, backoff_factor=0)
+        client.rate_limiter = Mock()
+        
+        response = client.get(f"{self.base_url}/teams", provider='football')
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(client.rate_limiter.acquire.call_count, 3)
+        self.assertEqual(FlakyHandler.requests_seen, 3)
+        client.close()
+    
+    def test_retry_without_token_returns_last_response(self):
+        FlakyHandler.failures_left = 2
+        client = HTTPClient(max_retries=2, backoff_factor=0)
+        client.rate_limiter = Mock()
+        client.rate_limiter.acquire.side_effect = [None, RateLimited('football daily quota exhausted')]
+        
+        response = client.get(f"{self.base_url}/teams", provider='football')
+        
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(FlakyHandler.requests_seen, 1)
+        client.close()
+    
+    def test_post_is_not_retried(self):
+        client = HTTPClient(max_retries=2, backoff_factor=0)
+        
+        response = client.post(f"{self.base_url}/token")
+        
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(FlakyHandler.requests_seen, 1)
+        client.close()
+    
+    def test_connections_are_reused(self):
+        client = HTTPClient()
+        for _ in range(3):
+            client.get(f"{self.base_url}/teams")
+        
+        pool = client.session.get_adapter(self.base_url).poolmanager.connection_from_url(self.base_url)
+        self.assertEqual(pool.num_connections, 1)
+        client.close()
+    
+    def test_threads_share_connection_pool(self):
+        client = HTTPClient()
+        sessions = []
+        
+        def fetch():
+            client.get(f"{self.base_url}/teams")
+            sessions.append(client.session)
+        
+        for _ in range(3):
+            thread = threading.Thread(target=fetch)
+            thread.start()
+            thread.join()
+        
+        self.assertEqual(len(set(map(id, sessions))), 3)
+        pool = client.adapter.poolmanager.connection_from_url(self.base_url)
+        self.assertEqual(pool.num_connections, 1)
+        client.close()
+    
+    @patch('services.http_client.requests.Session.get')
+    def test_default_timeout_applied(self, mock_get):
+        client = HTTPClient(connect_timeout=1, read_timeout=5)
+        client.get('https://example.com', params={'a': 1})
+        mock_get.assert_called_once_with('https://example.com', params={'a': 1}, timeout=(1, 5))
+    
+    def test_from_config(self):
+        client = HTTPClient.from_config({
+            'HTTP_POOL_CONNECTIONS': 4,
+            'HTTP_POOL_MAXSIZE': 8,
+            'HTTP_CONNECT_TIMEOUT': 2,
+            'HTTP_READ_TIMEOUT': 7,
+            'HTTP_MAX_RETRIES': 1,
+            'HTTP_RETRY_BACKOFF': 0.1
+        })
+        adapter = client.session.get_adapter('https://example.com')
+        
+        self.assertEqual(client.timeout, (2, 7))
+        self.assertEqual(adapter.max_retries.total, 1)
+        self.assertEqual(adapter._pool_maxsize, 8)
+
+
+if __name__ == '__main__':
+    unittest.main()
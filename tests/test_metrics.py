@@ -0,0 +1,149 @@
+import unittest
+import asyncio
+import sys
+import os
+from unittest.mock import patch, Mock
+import httpx
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from models.metrics import MetricsRegistry, metrics, cache_duration, cache_reads, json_duration, upstream_duration, upstream_requests
+from models.cache_backends import MemoryCacheBackend
+from models.codecs import codec_registry
+from services.http_client import HTTPClient
+from services.async_http_client import AsyncHTTPClient
+from services.circuit_breaker import CircuitBreakerRegistry, CircuitOpen
+from app import app
+
+
+class TestMetricsRegistry(unittest.TestCase):
+    def setUp(self):
+        self.registry = MetricsRegistry()
+    
+    def test_histogram_buckets_are_cumulative_and_inclusive(self):
+        histogram = self.registry.histogram('lookup_seconds', 'Lookups', ('kind',), buckets=(0.1, 1))
+        histogram.observe(0.1, 'a')
+        histogram.observe(0.5, 'a')
+        histogram.observe(3, 'a')
+        
+        snapshot = histogram.snapshot('a')
+        self.assertEqual(snapshot['count'], 3)
+        self.assertAlmostEqual(snapshot['sum'], 3.6)
+        self.assertEqual(snapshot['buckets'], {0.1: 1, 1: 2, float('inf'): 3})
+        
+        text = self.registry.render()
+        self.assertIn('# TYPE lookup_seconds histogram', text)
+        self.assertIn('lookup_seconds_bucket{kind="a",le="0.1"} 1', text)
+        self.assertIn('lookup_seconds_bucket{kind="a",le="1"} 2', text)
+        self.assertIn('lookup_seconds_bucket{kind="a",le="+Inf"} 3', text)
+        self.assertIn('lookup_seconds_count{kind="a"} 3', text)
+    
+    def test_counter_and_label_escaping(self):
+        counter = self.registry.counter('calls_total', 'Calls', ('path',))
+        counter.inc('/a"b')
+        counter.inc('/a"b', amount=2)
+        
+        self.assertEqual(counter.value('/a"b'), 3)
+        self.assertIn('calls_total{path="/a\\"b"} 3', self.registry.render())
+    
+    def test_registering_twice_returns_same_metric(self):
+        first = self.registry.counter('calls_total', 'Calls')
+        self.assertIs(self.registry.counter('calls_total', 'Calls'), first)
+    
+    def test_disabled_registry_records_nothing(self):
+        histogram = self.registry.histogram('lookup_seconds', 'Lookups')
+        self.registry.configure(enabled=False)
+        histogram.observe(0.2)
+        self.assertEqual(histogram.snapshot()['count'], 0)
+
+
+class TestInstrumentation(unittest.TestCase):
+    def setUp(self):
+        metrics.reset()
+    
+    @patch('requests.Session.get')
+    def test_upstream_calls_timed_by_provider_and_endpoint(self, mock_get):
+        mock_get.return_value = Mock(status_code=200, headers={})
+        client = HTTPClient()
+        
+        client.get('https://example.com/v2/shopping/flight-offers?origin=LON', provider='flight')
+        
+        self.assertEqual(upstream_duration.snapshot('flight', '/v2/shopping/flight-offers')['count'], 1)
+        self.assertEqual(upstream_requests.value('flight', '/v2/shopping/flight-offers', '200'), 1)
+    
+    def test_async_upstream_calls_timed(self):
+        client = AsyncHTTPClient(transport=httpx.MockTransport(lambda request: httpx.Response(503)), max_retries=0)
+        try:
+            asyncio.run(client.get('https://example.com/v1/hotels/search', provider='hotel'))
+        finally:
+            client.close()
+        
+        self.assertEqual(upstream_duration.snapshot('hotel', '/v1/hotels/search')['count'], 1)
+        self.assertEqual(upstream_requests.value('hotel', '/v1/hotels/search', '503'), 1)
+    
+    def test_rejected_calls_counted_without_duration(self):
+        client = HTTPClient()
+        client.circuit_breakers = CircuitBreakerRegistry(failure_threshold=1, reset_timeout=60)
+        client.circuit_breakers.get('hotel:/v1/hotels/search').record_failure()
+        
+        with self.assertRaises(CircuitOpen):
+            client.get('https://example.com/v1/hotels/search', provider='hotel')
+        
+        self.assertEqual(upstream_requests.value('hotel', '/v1/hotels/search', 'circuit_open'), 1)
+        self.assertEqual(upstream_duration.snapshot('hotel', '/v1/hotels/search')['count'], 0)
+    
+    def test_cache_backend_reads_and_writes(self):
+        backend = MemoryCacheBackend()
+        backend.set_value('teams_39', 'teams', [{'id': 1}], ttl_hours=1)
+        backend.get_entry('teams_39').get_value()
+        backend.get_entry('teams_40')
+        
+        self.assertEqual(cache_duration.snapshot('memory', 'set')['count'], 1)
+        self.assertEqual(cache_duration.snapshot('memory', 'get')['count'], 2)
+        self.assertEqual(cache_reads.value('memory', 'hit'), 1)
+        self.assertEqual(cache_reads.value('memory', 'miss'), 1)
+        self.assertEqual(json_duration.snapshot('cache', 'encode')['count'], 1)
+        self.assertEqual(json_duration.snapshot('cache', 'decode')['count'], 1)
+    
+    def test_codec_round_trip_timed(self):
+        codec_name, data = codec_registry.encode('teams', {'id': 1})
+        codec_registry.decode(codec_name, data)
+        
+        self.assertEqual(json_duration.snapshot('cache', 'encode')['count'], 1)
+        self.assertEqual(json_duration.snapshot('cache', 'decode')['count'], 1)
+
+
+class TestMetricsEndpoint(unittest.TestCase):
+    def setUp(self):
+        app.config['TESTING'] = True
+        self.client = app.test_client()
+        metrics.reset()
+    
+    def login(self, username, password):
+        return self.client.post('/login', data={'username': username, 'password': password})
+    
+    def test_routes_timed(self):
+        self.login('admin', 'admin123')
+        self.client.get('/api/admin/circuit-breakers')
+        
+        response = self.client.get('/api/admin/metrics')
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.content_type.startswith('text/plain; version=0.0.4'))
+        text = response.get_data(as_text=True)
+        self.assertIn('http_request_duration_seconds_count{route="/api/admin/circuit-breakers",method="GET"} 1', text)
+        self.assertIn('http_requests_total{route="/api/admin/circuit-breakers",method="GET",status="200"} 1', text)
+        self.assertIn('json_duration_seconds_count{source="response",operation="encode"}', text)
+    
+    def test_routes_labelled_with_url_rule(self):
+        self.client.get('/api/teams/39')
+        text = metrics.render()
+        self.assertIn('http_requests_total{route="/api/teams/<int:league_id>",method="GET",status="302"} 1', text)
+    
+    def test_requires_admin(self):
+        self.login('user', 'password123')
+        response = self.client.get('/api/admin/metrics')
+        self.assertEqual(response.status_code, 403)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,126 @@
+import unittest
+import json
+import marshal
+import sys
+import os
+import time
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from flask import Flask, jsonify
+from models.profiler import RequestProfiler, profile_requests
+from app import app, request_profiler
+
+
+def busy_wait(seconds):
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+
+class TestRequestProfiler(unittest.TestCase):
+    def setUp(self):
+        self.profiler = RequestProfiler(enabled=True, sample_rate=1.0, max_profiles=2, stack_interval=0.001)
+        self.app = Flask(__name__)
+        profile_requests(self.app, self.profiler)
+        
+        @self.app.route('/sync/<float:seconds>')
+        def sync_view(seconds):
+            busy_wait(seconds)
+            return jsonify({'ok': True})
+        
+        @self.app.route('/async')
+        async def async_view():
+            busy_wait(0.02)
+            return jsonify({'ok': True})
+        
+        self.client = self.app.test_client()
+    
+    def test_profiles_sampled_request(self):
+        self.client.get('/sync/0.02')
+        
+        profiles = self.profiler.profiles()
+        self.assertEqual(len(profiles), 1)
+        profile = profiles[0]
+        self.assertEqual(profile.route, '/sync/<float:seconds>')
+        self.assertEqual(profile.reason, 'sampled')
+        self.assertGreaterEqual(profile.duration, 0.02)
+        self.assertIn('busy_wait', profile.format_stats('cumulative', 20))
+        self.assertRegex(profile.collapsed(), r'test_profiler:sync_view;[\w.]*test_profiler:busy_wait \d+')
+        self.assertIn('busy_wait', {name for _, _, name in marshal.loads(profile.dump())})
+    
+    def test_async_view_profiled_on_loop_thread(self):
+        self.client.get('/async')
+        
+        profile = self.profiler.profiles()[0]
+        self.assertEqual(profile.threads, 2)
+        self.assertIn('busy_wait', profile.format_stats('tottime', 20))
+        self.assertRegex(profile.collapsed(), r'asgiref.sync:_run_event_loop;.*test_profiler:async_view;[\w.]*test_profiler:busy_wait')
+    
+    def test_keeps_slowest_profiles(self):
+        for seconds in ('0.03', '0.001', '0.02', '0.002'):
+            self.client.get(f"/sync/{seconds}")
+        
+        paths = [profile.path for profile in self.profiler.profiles()]
+        self.assertEqual(paths, ['/sync/0.03', '/sync/0.02'])
+        self.assertEqual(self.profiler.stats()['profiled'], 4)
+        self.assertEqual(self.profiler.stats()['discarded'], 2)
+    
+    def test_disabled_or_unsampled_requests_not_profiled(self):
+        self.profiler.configure(enabled=False)
+        self.client.get('/sync/0.001')
+        self.profiler.configure(enabled=True, sample_rate=0)
+        self.client.get('/sync/0.001')
+        
+        self.assertEqual(self.profiler.profiles(), [])
+    
+    def test_rejects_invalid_sample_rate(self):
+        with self.assertRaises(ValueError):
+            self.profiler.configure(sample_rate=1.5)
+
+
+class TestProfilerEndpoints(unittest.TestCase):
+    def setUp(self):
+        app.config['TESTING'] = True
+        self.client = app.test_client()
+        self.client.post('/login', data={'username': 'admin', 'password': 'admin123'})
+    
+    def tearDown(self):
+        request_profiler.configure(enabled=False, sample_rate=0)
+        request_profiler.clear()
+    
+    def test_header_profiles_admin_request(self):
+        self.client.post('/api/admin/profiler', json={'enabled': True})
+        self.client.get('/api/admin/circuit-breakers', headers={'X-Profile': '1'})
+        
+        data = json.loads(self.client.get('/api/admin/profiler').data)
+        self.assertTrue(data['enabled'])
+        self.assertEqual(len(data['profiles']), 1)
+        profile = data['profiles'][0]
+        self.assertEqual(profile['reason'], 'header')
+        self.assertEqual(profile['route'], '/api/admin/circuit-breakers')
+        
+        response = self.client.get(f"/api/admin/profiles/{profile['id']}?sort=tottime&limit=10")
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b'Ordered by: internal time', response.data)
+        
+        response = self.client.get(f"/api/admin/profiles/{profile['id']}?format=pstats")
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(marshal.loads(response.data))
+        
+        response = self.client.get(f"/api/admin/profiles/{profile['id']}?format=yaml")
+        self.assertEqual(response.status_code, 400)
+    
+    def test_settings_validation(self):
+        response = self.client.post('/api/admin/profiler', json={'sample_rate': 2})
+        self.assertEqual(response.status_code, 400)
+        response = self.client.get('/api/admin/profiles/unknown')
+        self.assertEqual(response.status_code, 404)
+    
+    def test_requires_admin(self):
+        self.client.get('/logout')
+        self.client.post('/login', data={'username': 'user', 'password': 'password123'})
+        self.assertEqual(self.client.get('/api/admin/profiler').status_code, 403)
+
+
+if __name__ == '__main__':
+    unittest.main()
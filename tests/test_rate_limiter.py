@@ -0,0 +1,207 @@
+import unittest
+import asyncio
+import threading
+import time
+import sys
+import os
+from datetime import datetime, timedelta
+from unittest.mock import Mock, patch
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app import app, cache_sweeper
+from models.cache import db, APICache
+from models.memory_cache import memory_cache
+from models.provider_quota import ProviderQuota
+from services.rate_limiter import RateLimiter, RateLimited, background_priority
+from services.http_client import HTTPClient
+from services.cached_flight_api import CachedFlightAPIService
+from services.cache_provenance import track_cache_provenance
+
+
+class TestRateLimiter(unittest.TestCase):
+    def setUp(self):
+        self.app = app
+        self.app.config['TESTING'] = True
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+    
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+    
+    def test_bucket_capacity(self):
+        limiter = RateLimiter({'football': (2, None)}, max_wait=0)
+        
+        limiter.acquire('football')
+        limiter.acquire('football')
+        with self.assertRaisesRegex(RateLimited, 'rate limit'):
+            limiter.acquire('football')
+        
+        self.assertFalse(limiter.has_capacity('football'))
+        self.assertEqual(limiter.stats()['football']['rejected'], 1)
+    
+    def test_waits_for_refill(self):
+        limiter = RateLimiter({'flight': (120, None)}, max_wait=1)
+        limiter.throttled('flight', retry_after='0.3')
+        
+        start = time.monotonic()
+        limiter.acquire('flight')
+        
+        self.assertGreater(time.monotonic() - start, 0.25)
+        self.assertEqual(limiter.stats()['flight']['waited'], 1)
+    
+    def test_acquire_async_runs_quota_statements_off_the_loop(self):
+        limiter = RateLimiter({'football': (2, None)}, max_wait=0)
+        try_acquire = ProviderQuota.try_acquire
+        threads = []
+        
+        async def acquire_twice():
+            await limiter.acquire_async('football')
+            await limiter.acquire_async('football')
+            return threading.get_ident()
+        
+        with patch.object(ProviderQuota, 'try_acquire',
+                          side_effect=lambda *args: threads.append(threading.get_ident()) or try_acquire(*args)):
+            loop_thread = asyncio.run(acquire_twice())
+            with self.assertRaisesRegex(RateLimited, 'rate limit'):
+                asyncio.run(limiter.acquire_async('football'))
+        
+        self.assertEqual(len(threads), 3)
+        self.assertNotIn(loop_thread, threads)
+        self.assertEqual(limiter.stats()['football']['rejected'], 1)
+    
+    def test_daily_quota(self):
+        limiter = RateLimiter({'football': (100, 3)}, max_wait=5)
+        for _ in range(3):
+            limiter.acquire('football')
+        
+        start = time.monotonic()
+        with self.assertRaisesRegex(RateLimited, 'daily quota'):
+            limiter.acquire('football')
+        
+        self.assertLess(time.monotonic() - start, 1)
+        self.assertEqual(limiter.stats()['football']['used_today'], 3)
+    
+    def test_background_leaves_reserve_for_interactive(self):
+        limiter = RateLimiter({'hotel': (10, None)}, background_reserve=0.2, max_wait=0)
+        
+        background = 0
+        with background_priority():
+            while limiter.has_capacity('hotel'):
+                limiter.acquire('hotel')
+                background += 1
+        limiter.acquire('hotel')
+        limiter.acquire('hotel')
+        
+        self.assertEqual(background, 8)
+    
+    def test_unlimited_provider(self):
+        limiter = RateLimiter({}, max_wait=0)
+        limiter.acquire('other')
+        self.assertTrue(limiter.has_capacity('other'))
+    
+    def test_shared_between_limiters(self):
+        # Separate limiters stand in for worker processes sharing the table
+        results = []
+        
+        def worker():
+            limiter = RateLimiter({'football': (30, None)}, max_wait=0)
+            with self.app.app_context():
+                for _ in range(10):
+                    try:
+                        limiter.acquire('football')
+                        results.append(True)
+                    except RateLimited:
+                        results.append(False)
+        
+        threads = [threading.Thread(target=worker) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        self.assertEqual(results.count(True), 30)
+    
+    @patch('services.http_client.requests.Session.get')
+    def test_http_client_backs_off_after_429(self, mock_get):
+        mock_get.return_value = Mock(status_code=429, headers={'Retry-After': '120'})
+        client = HTTPClient()
+        client.rate_limiter = RateLimiter({'hotel': (60, None)}, max_wait=1)
+        
+        client.get('https://example.com', provider='hotel')
+        
+        self.assertNotIn('provider', mock_get.call_args.kwargs)
+        self.assertFalse(client.rate_limiter.has_capacity('hotel'))
+        with self.assertRaises(RateLimited):
+            client.get('https://example.com', provider='hotel')
+        self.assertEqual(mock_get.call_count, 1)
+        self.assertEqual(client.rate_limiter.stats()['hotel']['throttled'], 1)
+
+
+class TestDegradedLookups(unittest.TestCase):
+    def setUp(self):
+        self.app = app
+        self.app.config['TESTING'] = True
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+        memory_cache.clear()
+        
+        http_client = HTTPClient()
+        http_client.rate_limiter = RateLimiter({'flight': (60, 1)}, max_wait=0)
+        http_client.rate_limiter.acquire('flight')
+        self.service = CachedFlightAPIService('key', 'secret', http_client)
+    
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+    
+    @patch('services.http_client.requests.Session.get')
+    def test_serves_expired_entry_when_quota_exhausted(self, mock_get):
+        APICache.set_value('flight_London_Madrid_2023-12-01', 'flight', {'price': 150, 'link': 'l'}, ttl_hours=1)
+        APICache.query.update({'expires_at': datetime.utcnow() - timedelta(days=2)})
+        db.session.commit()
+        
+        with track_cache_provenance() as provenance:
+            flight = self.service.get_flight_price('London', 'Madrid', '2023-12-01')
+        
+        self.assertEqual(flight, {'price': 150, 'link': 'l', 'stale': True})
+        self.assertEqual(provenance.summary, 'STALE')
+        mock_get.assert_not_called()
+    
+    @patch('services.http_client.requests.Session.get')
+    def test_sweeper_keeps_entries_for_degraded_lookups(self, mock_get):
+        APICache.set_value('flight_London_Madrid_2023-12-01', 'flight', {'price': 150, 'link': 'l'}, ttl_hours=1)
+        APICache.set_value('flight_London_Rome_2023-12-01', 'flight', {'price': 90, 'link': 'l'}, ttl_hours=1)
+        APICache.query.filter_by(cache_key='flight_London_Madrid_2023-12-01') \
+            .update({'expires_at': datetime.utcnow() - timedelta(days=2)})
+        APICache.query.filter_by(cache_key='flight_London_Rome_2023-12-01') \
+            .update({'expires_at': datetime.utcnow() - timedelta(days=8)})
+        db.session.commit()
+        memory_cache.clear()
+        
+        self.assertEqual(cache_sweeper.degraded_grace_hours, self.app.config['CACHE_DEGRADED_GRACE_HOURS'])
+        self.assertEqual(cache_sweeper.sweep(), 1)
+        
+        flight = self.service.get_flight_price('London', 'Madrid', '2023-12-01')
+        self.assertEqual(flight, {'price': 150, 'link': 'l', 'stale': True})
+        mock_get.assert_not_called()
+    
+    @patch('services.http_client.requests.Session.get')
+    @patch('services.http_client.requests.Session.post')
+    def test_falls_back_to_uncached_estimate(self, mock_post, mock_get):
+        with track_cache_provenance() as provenance:
+            flight = self.service.get_flight_price('London', 'Madrid', '2023-12-01')
+        
+        self.assertEqual(flight['price'], 200)
+        self.assertEqual(provenance.statuses(), {'flight_London_Madrid_2023-12-01': 'degraded'})
+        mock_post.assert_not_called()
+        mock_get.assert_not_called()
+        self.assertIsNone(APICache.get_cached('flight_London_Madrid_2023-12-01'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,115 @@
+import unittest
+import gzip
+import json
+import sys
+import os
+from datetime import datetime
+from decimal import Decimal
+from unittest.mock import patch
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from flask import Flask, jsonify, request
+from werkzeug.datastructures import Accept
+from werkzeug.http import parse_accept_header
+from models.codecs import JSONSerializer, orjson
+from models.metrics import metrics, json_duration
+from models.responses import JSONProvider, ResponseCompressor, EncodedResponse, compress_responses
+
+
+def accept(value):
+    return parse_accept_header(value, Accept)
+
+
+class TestJSONSerializer(unittest.TestCase):
+    def test_libraries_agree(self):
+        value = {'teams': [{'id': 33, 'name': 'Málaga'}], 1: None}
+        
+        plain = JSONSerializer('json').dumps(value)
+        self.assertEqual(plain, '{"teams":[{"id":33,"name":"Málaga"}],"1":null}'.encode('utf-8'))
+        if orjson is not None:
+            self.assertEqual(JSONSerializer('orjson').dumps(value), plain)
+            self.assertEqual(JSONSerializer('orjson').loads(plain), JSONSerializer('json').loads(plain))
+    
+    def test_datetimes_use_default(self):
+        serializer = JSONSerializer()
+        data = serializer.dumps({'at': datetime(2024, 1, 2)}, default=lambda value: value.isoformat())
+        self.assertEqual(serializer.loads(data), {'at': '2024-01-02T00:00:00'})
+    
+    def test_rejects_unknown_library(self):
+        with self.assertRaises(ValueError):
+            JSONSerializer('simplejson')
+
+
+class TestJSONProvider(unittest.TestCase):
+    def setUp(self):
+        self.app = Flask(__name__)
+        self.app.json = JSONProvider(self.app)
+        
+        @self.app.route('/echo', methods=['POST'])
+        def echo():
+            return jsonify({'args': request.get_json(), 'at': datetime(2024, 1, 2), 'price': Decimal('9.50')})
+        
+        self.client = self.app.test_client()
+        metrics.reset()
+    
+    def test_response_matches_default_provider(self):
+        response = self.client.post('/echo', data='{"b":1,"a":[1,2]}', content_type='application/json')
+        
+        self.assertEqual(response.mimetype, 'application/json')
+        self.assertEqual(json.loads(response.data), {
+            'args': {'b': 1, 'a': [1, 2]},
+            'at': 'Tue, 02 Jan 2024 00:00:00 GMT',
+            'price': '9.50'
+        })
+        self.assertLess(response.data.index(b'"a"'), response.data.index(b'"b"'))
+        self.assertEqual(json_duration.snapshot('response', 'encode')['count'], 1)
+        self.assertEqual(json_duration.snapshot('request', 'decode')['count'], 1)
+    
+    def test_debug_mode_indents(self):
+        self.app.debug = True
+        self.assertIn(b'\n  "at"', self.client.post('/echo', json={}).data)
+
+
+class TestResponseCompressor(unittest.TestCase):
+    def setUp(self):
+        self.compressor = ResponseCompressor(min_size=100)
+    
+    def test_negotiation(self):
+        self.assertEqual(self.compressor.negotiate(accept('gzip, deflate'), 100), 'gzip')
+        self.assertIsNone(self.compressor.negotiate(accept('gzip'), 99))
+        self.assertIsNone(self.compressor.negotiate(accept('gzip;q=0, identity'), 100))
+        with patch('models.responses.brotli', None):
+            self.assertEqual(self.compressor.negotiate(accept('br, gzip'), 100), 'gzip')
+        self.compressor.configure(enabled=False)
+        self.assertIsNone(self.compressor.negotiate(accept('gzip'), 100))
+    
+    def test_hook_skips_small_and_binary_responses(self):
+        app = Flask(__name__)
+        compress_responses(app, self.compressor)
+        app.add_url_rule('/text/<int:size>', 'text', lambda size: 'x' * size)
+        app.add_url_rule('/binary', 'binary', lambda: app.response_class(b'x' * 500, mimetype='image/png'))
+        client = app.test_client()
+        
+        response = client.get('/text/500', headers={'Accept-Encoding': 'gzip'})
+        self.assertEqual(response.headers['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(response.data), b'x' * 500)
+        self.assertNotIn('Content-Encoding', client.get('/text/50', headers={'Accept-Encoding': 'gzip'}).headers)
+        self.assertNotIn('Content-Encoding', client.get('/binary', headers={'Accept-Encoding': 'gzip'}).headers)
+    
+    def test_encoded_response_keeps_variants(self):
+        stored = EncodedResponse(b'[' + b'1,' * 100 + b'1]', 'abc')
+        
+        with patch.object(self.compressor, 'compress', wraps=self.compressor.compress) as compress:
+            first = stored.make_response(Flask.response_class, self.compressor, accept('gzip'))
+            second = stored.make_response(Flask.response_class, self.compressor, accept('gzip'))
+        plain = stored.make_response(Flask.response_class, self.compressor, accept(''))
+        
+        self.assertEqual(compress.call_count, 1)
+        self.assertEqual(first.get_data(), second.get_data())
+        self.assertEqual(first.headers['ETag'], 'W/"abc"')
+        self.assertEqual(plain.headers['ETag'], '"abc"')
+        self.assertEqual(plain.get_data(), stored.body)
+
+
+if __name__ == '__main__':
+    unittest.main()
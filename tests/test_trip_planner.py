@@ -0,0 +1,153 @@
+import unittest
+import time
+import sys
+import os
+from unittest.mock import Mock
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app import app
+from services.calculator import CostCalculator
+from services.executor import LookupExecutor
+from services.trip_planner import TripPlanner
+
+
+MATCH_DETAILS = {
+    'id': 1,
+    'league': 'Premier League',
+    'home_team': 'Manchester City',
+    'away_team': 'Brighton',
+    'city': 'Manchester',
+    'date': '2023-12-01T15:00:00+00:00'
+}
+
+
+def slow(result, delay=0.2):
+    def call(*args):
+        time.sleep(delay)
+        return result
+    return call
+
+
+class TestTripPlanner(unittest.TestCase):
+    def setUp(self):
+        self.football_service = Mock()
+        self.football_service.get_match_details.side_effect = lambda match_id: dict(MATCH_DETAILS, id=match_id)
+        self.flight_service = Mock()
+        self.hotel_service = Mock()
+        self.flight_service.get_flight_price.side_effect = slow({'price': 200, 'link': 'http://flight.com'})
+        self.hotel_service.get_hotel_price.side_effect = slow({'price': 150, 'link': 'http://hotel.com'})
+    
+    def test_calculate_trip_quote(self):
+        executor = LookupExecutor(app, max_workers=4)
+        planner = TripPlanner(self.football_service, self.flight_service, self.hotel_service, CostCalculator(), executor)
+        
+        quote = planner.calculate_trip(MATCH_DETAILS, 'London')
+        
+        self.assertEqual(quote['costs'], {'flight': 200, 'hotel': 150, 'ticket': 80, 'total': 430})
+        self.assertEqual(quote['links']['hotel'], 'http://hotel.com')
+        self.assertFalse(quote['estimated'])
+        self.flight_service.get_flight_price.assert_called_once_with('London', 'Manchester', MATCH_DETAILS['date'])
+        self.hotel_service.get_hotel_price.assert_called_once_with('Manchester', MATCH_DETAILS['date'])
+        executor.shutdown()
+    
+    def test_quote_marks_estimates(self):
+        self.hotel_service.get_hotel_price.side_effect = None
+        self.hotel_service.get_hotel_price.return_value = {'price': 180, 'link': 'http://hotel.com', 'estimated': True}
+        executor = LookupExecutor(app, parallel=False)
+        planner = TripPlanner(self.football_service, self.flight_service, self.hotel_service, CostCalculator(), executor)
+        
+        quote = planner.calculate_trip(MATCH_DETAILS, 'London')
+        
+        self.assertTrue(quote['estimated'])
+        self.assertEqual(quote['costs']['hotel'], 180)
+    
+    def test_lookups_run_concurrently(self):
+        executor = LookupExecutor(app, max_workers=4)
+        planner = TripPlanner(self.football_service, self.flight_service, self.hotel_service, CostCalculator(), executor)
+        
+        start = time.perf_counter()
+        planner.calculate_trip(MATCH_DETAILS, 'London')
+        elapsed = time.perf_counter() - start
+        
+        self.assertLess(elapsed, 0.35)
+        executor.shutdown()
+    
+    def test_sequential_mode(self):
+        executor = LookupExecutor(app, parallel=False)
+        planner = TripPlanner(self.football_service, self.flight_service, self.hotel_service, CostCalculator(), executor)
+        
+        start = time.perf_counter()
+        quote = planner.calculate_trip(MATCH_DETAILS, 'London')
+        elapsed = time.perf_counter() - start
+        
+        self.assertEqual(quote['costs']['total'], 430)
+        self.assertGreaterEqual(elapsed, 0.4)
+    
+    def test_lookup_error_is_raised(self):
+        executor = LookupExecutor(app, max_workers=2)
+        self.hotel_service.get_hotel_price.side_effect = Exception('upstream down')
+        planner = TripPlanner(self.football_service, self.flight_service, self.hotel_service, CostCalculator(), executor)
+        
+        with self.assertRaises(Exception):
+            planner.calculate_trip(MATCH_DETAILS, 'London')
+        executor.shutdown()
+
+    
+    def test_calculate_trips_dedupes_shared_lookups(self):
+        executor = LookupExecutor(app, max_workers=4)
+        planner = TripPlanner(self.football_service, self.flight_service, self.hotel_service, CostCalculator(), executor)
+        trips = [
+            {'match_id': 1, 'origin_city': 'London'},
+            {'match_id': 1, 'origin_city': 'Madrid'},
+            {'match_id': 2, 'origin_city': 'London'},
+            {'match_id': 1, 'origin_city': 'London'}
+        ]
+        
+        result = planner.calculate_trips(trips)
+        
+        self.assertEqual(len(result['quotes']), 4)
+        self.assertEqual(result['lookups'], {'matches': 2, 'flights': 2, 'hotels': 1})
+        self.assertEqual(self.football_service.get_match_details.call_count, 2)
+        self.assertEqual(self.flight_service.get_flight_price.call_count, 2)
+        self.assertEqual(self.hotel_service.get_hotel_price.call_count, 1)
+        self.assertEqual(result['quotes'][1]['origin_city'], 'Madrid')
+        self.assertEqual(result['quotes'][2]['match']['id'], 2)
+        self.assertEqual(result['quotes'][3]['costs']['total'], 430)
+        executor.shutdown()
+    
+    def test_calculate_trips_reports_item_errors(self):
+        executor = LookupExecutor(app, max_workers=4)
+        self.football_service.get_match_details.side_effect = lambda match_id: None if match_id == 404 else dict(MATCH_DETAILS)
+        planner = TripPlanner(self.football_service, self.flight_service, self.hotel_service, CostCalculator(), executor)
+        
+        result = planner.calculate_trips([
+            {'match_id': 404, 'origin_city': 'London'},
+            {'match_id': 1},
+            {'match_id': 1, 'origin_city': 'London'}
+        ])
+        
+        self.assertEqual(result['quotes'][0]['error'], 'Match not found')
+        self.assertIn('error', result['quotes'][1])
+        self.assertNotIn('error', result['quotes'][2])
+        executor.shutdown()
+    
+    def test_calculate_trips_rejects_unhashable_fields(self):
+        executor = LookupExecutor(app, max_workers=4)
+        planner = TripPlanner(self.football_service, self.flight_service, self.hotel_service, CostCalculator(), executor)
+        
+        result = planner.calculate_trips([
+            {'match_id': [1], 'origin_city': 'London'},
+            {'match_id': 1, 'origin_city': ['London']},
+            {'match_id': True, 'origin_city': 'London'},
+            {'match_id': '1', 'origin_city': 'London'}
+        ])
+        
+        for quote in result['quotes'][:3]:
+            self.assertEqual(quote['error'], 'match_id must be an integer or string and origin_city a string')
+        self.assertNotIn('error', result['quotes'][3])
+        self.assertEqual(result['lookups'], {'matches': 1, 'flights': 1, 'hotels': 1})
+        executor.shutdown()
+
+
+if __name__ == '__main__':
+    unittest.main()